@@ -271,11 +271,11 @@ async def get_active_workflows():
         for workflow_id, workflow_data in coordinator.active_workflows.items():
             workflows.append({
                 "workflow_id": workflow_id,
-                "workflow_type": workflow_data["workflow_type"],
-                "status": workflow_data["status"],
-                "created_at": workflow_data["created_at"].isoformat(),
-                "tasks_count": len(workflow_data.get("tasks", {})),
-                "progress": workflow_data.get("progress", 0)
+                "workflow_type": workflow_data.workflow_type,
+                "status": workflow_data.status,
+                "created_at": workflow_data.created_at.isoformat(),
+                "tasks_count": len(workflow_data.tasks),
+                "progress": workflow_data.progress
             })
         
         return {
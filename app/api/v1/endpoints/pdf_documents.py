@@ -19,7 +19,7 @@ from app.schemas.pdf_document import (
     PDFStatsResponse, PDFChunkResponse
 )
 from app.services.pdf_processor import pdf_processor
-from app.services.rag_engine import RAGEmbeddingEngine
+from app.services.rag_engine import get_rag_engine
 from app.core.database import get_db
 from sqlalchemy.orm import Session
 
@@ -338,7 +338,7 @@ async def embed_pdf_to_vector_db(
             raise HTTPException(status_code=400, detail="PDF önce işlenmeli")
         
         # RAG Engine ile embed et
-        rag_engine = RAGEmbeddingEngine()
+        rag_engine = get_rag_engine()
         result = await rag_engine.embed_pdf_chunks(current_user.id, pdf_id)
         
         return {
@@ -360,7 +360,7 @@ async def embed_all_pdfs(
 ):
     """Kullanıcının tüm PDF'lerini vector database'e embed et"""
     try:
-        rag_engine = RAGEmbeddingEngine()
+        rag_engine = get_rag_engine()
         result = await rag_engine.embed_pdf_chunks(current_user.id)
         
         return {
@@ -383,7 +383,7 @@ async def search_pdf_by_category(
 ):
     """Kategori bazlı PDF arama"""
     try:
-        rag_engine = RAGEmbeddingEngine()
+        rag_engine = get_rag_engine()
         results = await rag_engine.search_pdf_by_category(category, query, top_k)
         
         return {
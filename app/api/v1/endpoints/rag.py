@@ -12,12 +12,12 @@ from app.models.strategy import Strategy
 from app.models.product import Product
 from app.services.auth_service import AuthService
 from app.models.user import User
-from app.services.rag_engine import RAGEmbeddingEngine
+from app.services.rag_engine import get_rag_engine
 
 router = APIRouter()
 
-# RAG Engine instance
-rag_engine = RAGEmbeddingEngine()
+# RAG Engine instance (strateji servisleri ve agent'larla paylaşılan)
+rag_engine = get_rag_engine()
 
 
 class VectorSearchRequest(BaseModel):
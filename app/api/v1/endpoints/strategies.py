@@ -12,21 +12,13 @@ from app.models.product import Product
 from app.schemas.strategy import StrategyCreate, StrategyResponse
 from app.services.auth_service import AuthService
 from app.models.user import User
-from app.services.ai_services import StrategyBuilder
+from app.services.ai_services import get_strategy_builder
+from app.services.rag_engine import get_rag_engine
 
 router = APIRouter()
 
-# AI Strateji Builder instance
-strategy_builder = StrategyBuilder()
-
-# RAG Engine import (lazy loading için)
-def get_rag_engine():
-    try:
-        from app.services.rag_engine import RAGEmbeddingEngine
-        return RAGEmbeddingEngine()
-    except ImportError:
-        print("⚠️ RAG Engine import edilemedi")
-        return None
+# AI Strateji Builder instance (agent'larla paylaşılan)
+strategy_builder = get_strategy_builder()
 
 
 async def add_strategy_to_vector_db_background(strategy_id: int, product_id: int):
@@ -104,17 +96,17 @@ async def create_strategy(
             # Veritabanına kaydet
             db_strategy = Strategy(
                 title=strategy_data.title or f"{product.name} Satış Stratejisi",
-                content=ai_strategy_result.get("strategy_content", ""),
+                content=ai_strategy_result.strategy_content,
                 product_id=product.id,
                 user_id=current_user.id,
-                confidence_score=ai_strategy_result.get("confidence_score", 0.8),
-                expected_roi=ai_strategy_result.get("expected_roi", 0.2),
-                implementation_difficulty=ai_strategy_result.get("implementation_difficulty", "medium"),
+                confidence_score=ai_strategy_result.confidence_score,
+                expected_roi=ai_strategy_result.expected_roi,
+                implementation_difficulty=ai_strategy_result.implementation_difficulty,
                 analysis_data={
-                    "market_analysis": ai_strategy_result.get("market_analysis", {}),
-                    "audience_analysis": ai_strategy_result.get("audience_analysis", {}),
-                    "pricing_analysis": ai_strategy_result.get("pricing_analysis", {}),
-                    "messaging_analysis": ai_strategy_result.get("messaging_analysis", {})
+                    "market_analysis": ai_strategy_result.market_analysis,
+                    "audience_analysis": ai_strategy_result.audience_analysis,
+                    "pricing_analysis": ai_strategy_result.pricing_analysis,
+                    "messaging_analysis": ai_strategy_result.messaging_analysis
                 }
             )
         
@@ -2,6 +2,7 @@
 Users API endpoints
 """
 
+import asyncio
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
@@ -50,7 +51,7 @@ async def update_user(
     # Şifre değişikliği
     if user_data.password:
         auth_service = AuthService(db)
-        current_user.hashed_password = auth_service.get_password_hash(user_data.password)
+        current_user.hashed_password = await asyncio.to_thread(auth_service.get_password_hash, user_data.password)
     
     # Diğer alanları güncelle
     if user_data.email:
@@ -76,7 +77,7 @@ async def change_password(
     auth_service = AuthService(db)
     
     # Mevcut şifreyi doğrula
-    if not auth_service.verify_password(request.current_password, current_user.hashed_password):
+    if not await asyncio.to_thread(auth_service.verify_password, request.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Mevcut şifre yanlış"
@@ -90,7 +91,7 @@ async def change_password(
         )
     
     # Yeni şifreyi hashle ve kaydet
-    current_user.hashed_password = auth_service.get_password_hash(request.new_password)
+    current_user.hashed_password = await asyncio.to_thread(auth_service.get_password_hash, request.new_password)
     db.commit()
     
     return {"message": "Şifre başarıyla değiştirildi"}
@@ -27,6 +27,15 @@ class Settings(BaseSettings):
     EXCHANGERATE_API_KEY: str = os.getenv("EXCHANGERATE_API_KEY", "")
     PINECONE_API_KEY: str = os.getenv("PINECONE_API_KEY", "")
     
+    # Gemini yanıt önbelleği süresi (saniye)
+    GEMINI_CACHE_TTL: int = int(os.getenv("GEMINI_CACHE_TTL", str(6 * 60 * 60)))
+    # Aynı anda yapılabilecek Gemini çağrısı sayısı ve çağrı başına süre sınırı (saniye)
+    GEMINI_MAX_CONCURRENCY: int = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+    GEMINI_TIMEOUT: float = float(os.getenv("GEMINI_TIMEOUT", "20"))
+    # Gemini dakikalık istek kotası ve geçici hatalarda toplam deneme sayısı
+    GEMINI_RATE_LIMIT_PER_MINUTE: int = int(os.getenv("GEMINI_RATE_LIMIT_PER_MINUTE", "60"))
+    GEMINI_MAX_RETRIES: int = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+    
     # App Settings
     APP_NAME: str = "AI Satış Stratejisi Projesi"
     VERSION: str = "1.0.0"
@@ -6,6 +6,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 import redis
+import redis.asyncio as aioredis
 from typing import Generator
 
 from app.core.config import settings
@@ -33,6 +34,9 @@ Base = declarative_base()
 # Redis connection
 redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
 
+# Async Redis connection (event loop'u bloklamaması gereken önbellek yolları için)
+async_redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+
 
 def get_db() -> Generator[Session, None, None]:
     """Veritabanı session dependency"""
@@ -51,6 +55,11 @@ def get_redis():
     return redis_client
 
 
+def get_async_redis():
+    """Async Redis client dependency"""
+    return async_redis_client
+
+
 async def init_db():
     """Veritabanı başlatma"""
     try:
@@ -0,0 +1,36 @@
+"""
+Paylaşılan HTTP istemcisi
+Harici API servisleri tek bir async istemci üzerinden keep-alive bağlantılarını yeniden kullanır
+"""
+
+import httpx
+
+# HTTP/2 isteğe bağlı (h2 paketi kuruluysa bağlantılar çoklanır)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def create_async_client(max_connections: int = 64, max_keepalive_connections: int = 32,
+                        retries: int = 2, timeout: float = 10.0) -> httpx.AsyncClient:
+    """Bağlantı havuzlu ve bağlantı hatalarında yeniden denemeli async HTTP istemcisi oluştur"""
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        ),
+        transport=httpx.AsyncHTTPTransport(http2=HTTP2_AVAILABLE, retries=retries)
+    )
+
+
+# Global async HTTP client (SerpAPI, Exchange Rate API vb. paylaşır)
+async_http_client = create_async_client()
+
+
+async def close_async_client():
+    """Paylaşılan istemciyi kapat (uygulama kapanışında)"""
+    await async_http_client.aclose()
@@ -0,0 +1,36 @@
+"""
+Kuyruk tabanlı loglama
+Log kayıtları event loop thread'inde yalnızca kuyruğa atılır; çıktıya yazma ayrı bir thread'de yapılır
+"""
+
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+_listener: Optional[QueueListener] = None
+
+
+def start_queue_logging() -> None:
+    """Kök logger'ın handler'larını bir QueueListener arkasına taşı"""
+    global _listener
+    if _listener is not None:
+        return
+
+    root = logging.getLogger()
+    handlers = root.handlers[:] or [logging.StreamHandler()]
+    for handler in handlers:
+        root.removeHandler(handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_queue_logging() -> None:
+    """Kuyrukta kalan kayıtları yazıp dinleyiciyi durdur"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
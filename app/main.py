@@ -5,7 +5,7 @@ FastAPI tabanlı backend servisi
 
 from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from contextlib import asynccontextmanager
@@ -13,13 +13,16 @@ from contextlib import asynccontextmanager
 from app.core.config import settings
 from app.api.v1 import api_router
 from app.core.database import init_db
+from app.core.http_session import close_async_client
+from app.core.log_queue import start_queue_logging, stop_queue_logging
 from app.services.agent_orchestrator import agent_orchestrator
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Uygulama başlangıç ve kapanış olayları"""
-    # Başlangıç
+    # Başlangıç (loglar event loop'u bloklamadan ayrı thread'de yazılır)
+    start_queue_logging()
     print("🚀 AI Satış Stratejisi Projesi başlatılıyor...")
     await init_db()
     print("✅ Veritabanı bağlantısı kuruldu")
@@ -42,6 +45,11 @@ async def lifespan(app: FastAPI):
         print("🛑 Agent Orchestrator durduruldu")
     except Exception as e:
         print(f"⚠️ Agent Orchestrator durdurulamadı: {e}")
+    
+    # Paylaşılan HTTP istemcisini kapat
+    await close_async_client()
+    
+    stop_queue_logging()
 
 
 # FastAPI uygulaması
@@ -51,7 +59,9 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Analiz sonuçları büyük iç içe dict'ler; yanıtlar orjson ile serileştirilir
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
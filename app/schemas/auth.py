@@ -47,6 +47,7 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     """Token veri şeması"""
     username: Optional[str] = None
+    user_id: Optional[int] = None
 
 
 class ChangePasswordRequest(BaseModel):
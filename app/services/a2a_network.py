@@ -5,22 +5,58 @@ Agent'lar arası doğrudan iletişim ve koordinasyon ağı
 
 import asyncio
 import json
+import sys
+import time
 import uuid
+from collections import Counter, OrderedDict, defaultdict
 from typing import Dict, List, Any, Optional, Set, Callable
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import logging
-import weakref
 
 from app.services.mcp_service import mcp_service, MCPMessage, MCPMessageType
 
 logger = logging.getLogger(__name__)
 
+# Bellekte tutulacak en fazla tamamlanmış/başarısız görev sayısı
+COMPLETED_TASK_HISTORY_LIMIT = 10_000
+
+# Monotonic zaman damgalarını görüntüleme için duvar saatine çevirme farkı
+_WALL_CLOCK_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+def _ns_to_datetime(timestamp_ns: Optional[int]) -> Optional[datetime]:
+    """Monotonic ns zaman damgasını datetime'a çevir"""
+    if timestamp_ns is None:
+        return None
+    return datetime.fromtimestamp((timestamp_ns + _WALL_CLOCK_OFFSET_NS) / 1e9)
+
+class _TimeCache:
+    """Kısa süre (10ms) önbelleğe alınan ISO zaman damgası"""
+    __slots__ = ("iso", "_expires_ns")
+    
+    REFRESH_NS = 10_000_000
+    
+    def __init__(self):
+        self.iso = ""
+        self._expires_ns = 0
+    
+    def now_iso(self) -> str:
+        """Güncel ISO zaman damgası (en fazla 10ms eski)"""
+        now_ns = time.monotonic_ns()
+        if now_ns >= self._expires_ns:
+            self.iso = datetime.now().isoformat()
+            self._expires_ns = now_ns + self.REFRESH_NS
+        return self.iso
+
+# Agent sonuçlarındaki "..._at" alanları için ortak zaman önbelleği
+time_cache = _TimeCache()
+
 class A2ATaskType(Enum):
     """A2A görev türleri"""
     MARKET_ANALYSIS = "market_analysis"
     STRATEGY_GENERATION = "strategy_generation"
+    STRATEGY_STREAM = "strategy_stream"  # Ara sonuçlar MCP üzerinden parça parça gönderilir
     PERFORMANCE_ANALYSIS = "performance_analysis"
     COMPETITOR_RESEARCH = "competitor_research"
     PRICE_OPTIMIZATION = "price_optimization"
@@ -47,22 +83,36 @@ class A2ATask:
     status: A2ATaskStatus = A2ATaskStatus.PENDING
     input_data: Dict[str, Any] = None
     output_data: Dict[str, Any] = None
-    created_at: datetime = None
-    assigned_at: Optional[datetime] = None
-    completed_at: Optional[datetime] = None
+    created_at_ns: int = field(default_factory=time.monotonic_ns)
+    assigned_at_ns: Optional[int] = None
+    completed_at_ns: Optional[int] = None
     deadline: Optional[datetime] = None
     dependencies: List[str] = None  # Bağımlı görev ID'leri
     metadata: Dict[str, Any] = None
+    _task_type_value: Optional[str] = field(default=None, init=False, repr=False)  # submit_task'ta önbelleğe alınır
     
     def __post_init__(self):
-        if self.created_at is None:
-            self.created_at = datetime.now()
         if self.input_data is None:
             self.input_data = {}
         if self.dependencies is None:
             self.dependencies = []
         if self.metadata is None:
             self.metadata = {}
+    
+    @property
+    def created_at(self) -> datetime:
+        """Oluşturulma zamanı (görüntüleme için)"""
+        return _ns_to_datetime(self.created_at_ns)
+    
+    @property
+    def assigned_at(self) -> Optional[datetime]:
+        """Atanma zamanı (görüntüleme için)"""
+        return _ns_to_datetime(self.assigned_at_ns)
+    
+    @property
+    def completed_at(self) -> Optional[datetime]:
+        """Tamamlanma zamanı (görüntüleme için)"""
+        return _ns_to_datetime(self.completed_at_ns)
 
 class A2AAgent:
     """A2A Agent base class"""
@@ -71,15 +121,29 @@ class A2AAgent:
         self.agent_id = agent_id
         self.agent_type = agent_type
         self.capabilities = capabilities
+        self._capability_set = frozenset(sys.intern(cap.lower()) for cap in capabilities)
+        self.network: Optional['A2ANetwork'] = None
         self.status = "idle"
         self.current_tasks: Set[str] = set()
         self.max_concurrent_tasks = 3
-        self.network: Optional['A2ANetwork'] = None
         self._message_handlers: Dict[MCPMessageType, Callable] = {}
         
         # MCP message handler'larını kaydet
         self._register_message_handlers()
     
+    @property
+    def status(self) -> str:
+        """Agent durumu"""
+        return self._status
+    
+    @status.setter
+    def status(self, value: str):
+        old_status = getattr(self, "_status", None)
+        self._status = value
+        # Ağdaki aktif agent sayacını güncel tut
+        if self.network and old_status != value:
+            self.network._on_agent_status_change(old_status, value)
+    
     def _register_message_handlers(self):
         """MCP mesaj handler'larını kaydet"""
         self._message_handlers = {
@@ -99,7 +163,7 @@ class A2AAgent:
         # MCP mesajlarına abone ol
         await mcp_service.context_store.subscribe(self.agent_id, self._handle_mcp_message)
         
-        logger.info(f"🤖 Agent {self.agent_id} A2A ağına katıldı")
+        logger.info("🤖 Agent %s A2A ağına katıldı", self.agent_id)
     
     async def _handle_mcp_message(self, message: MCPMessage):
         """MCP mesajını işle"""
@@ -107,7 +171,7 @@ class A2AAgent:
             try:
                 await self._message_handlers[message.type](message)
             except Exception as e:
-                logger.error(f"❌ {self.agent_id} mesaj işleme hatası: {e}")
+                logger.error("❌ %s mesaj işleme hatası: %s", self.agent_id, e)
     
     async def _handle_task_assignment(self, message: MCPMessage):
         """Görev atama mesajını işle"""
@@ -124,12 +188,12 @@ class A2AAgent:
     async def _handle_context_share(self, message: MCPMessage):
         """Context paylaşım mesajını işle"""
         context_key = message.payload.get("context_key")
-        logger.info(f"📡 {self.agent_id} yeni context aldı: {context_key}")
+        logger.info("📡 %s yeni context aldı: %s", self.agent_id, context_key)
     
     async def _handle_coordination(self, message: MCPMessage):
         """Koordinasyon mesajını işle"""
         coordination_type = message.payload.get("type")
-        logger.info(f"🎯 {self.agent_id} koordinasyon mesajı: {coordination_type}")
+        logger.info("🎯 %s koordinasyon mesajı: %s", self.agent_id, coordination_type)
     
     async def _accept_task(self, task_id: str):
         """Görevi kabul et"""
@@ -147,7 +211,7 @@ class A2AAgent:
     
     async def _reject_task(self, task_id: str, reason: str):
         """Görevi reddet"""
-        logger.info(f"❌ {self.agent_id} görevi reddetti: {task_id} - {reason}")
+        logger.info("❌ %s görevi reddetti: %s - %s", self.agent_id, task_id, reason)
     
     async def _execute_task(self, task: A2ATask):
         """Görevi çalıştır (alt sınıflar override etmeli)"""
@@ -203,15 +267,19 @@ class A2AAgent:
     
     def can_handle_task(self, task_type: A2ATaskType) -> bool:
         """Bu görevi işleyebilir mi?"""
-        return task_type.value in [cap.lower() for cap in self.capabilities]
+        return task_type.value in self._capability_set
 
 class A2ANetwork:
     """A2A Network - Agent'lar arası koordinasyon ağı"""
     
     def __init__(self):
         self.agents: Dict[str, A2AAgent] = {}
-        self.tasks: Dict[str, A2ATask] = {}
+        self.tasks: Dict[str, A2ATask] = {}  # Aktif görevler
+        self.completed_tasks: "OrderedDict[str, A2ATask]" = OrderedDict()  # Son biten görevler (sınırlı)
         self.task_queue: List[str] = []  # Bekleyen görevler
+        self.status_counts: Counter = Counter({s: 0 for s in A2ATaskStatus})
+        self._active_agents = 0
+        self._completion_callbacks: Dict[str, List[Callable[[A2ATask], Any]]] = defaultdict(list)  # Görev bitiş bildirimleri
         self._lock = asyncio.Lock()
         self.is_running = False
         self._scheduler_task = None
@@ -244,36 +312,70 @@ class A2ANetwork:
     async def register_agent(self, agent: A2AAgent):
         """Agent'ı ağa kaydet"""
         async with self._lock:
+            previous = self.agents.get(agent.agent_id)
+            if previous is not None and previous.status != "offline":
+                self._active_agents -= 1
             self.agents[agent.agent_id] = agent
-            logger.info(f"🤖 Agent kaydedildi: {agent.agent_id} ({agent.agent_type})")
+            if agent.status != "offline":
+                self._active_agents += 1
+            logger.info("🤖 Agent kaydedildi: %s (%s)", agent.agent_id, agent.agent_type)
     
     async def submit_task(self, task: A2ATask) -> str:
         """Yeni görev gönder"""
+        task_ids = await self.submit_tasks([task])
+        return task_ids[0]
+    
+    async def submit_tasks(self, tasks: List[A2ATask]) -> List[str]:
+        """Birden fazla görevi tek kilit ve tek sıralamayla gönder"""
         async with self._lock:
-            self.tasks[task.task_id] = task
-            self.task_queue.append(task.task_id)
+            accepted: List[str] = []
+            for task in tasks:
+                if task.task_id in self.tasks:
+                    # Aynı ID ile aktif görev var; sayaçlar ve kuyruk çift kayıt almasın
+                    logger.warning("⚠️ Görev zaten mevcut, yeniden eklenmedi: %s", task.task_id)
+                    continue
+                task._task_type_value = task.task_type.value
+                self.tasks[task.task_id] = task
+                self.status_counts[task.status] += 1
+                accepted.append(task.task_id)
+                logger.info("📋 Yeni görev eklendi: %s (%s)", task.task_id, task._task_type_value)
+            self.task_queue.extend(accepted)
             
-            # Önceliğe göre sırala
-            self.task_queue.sort(key=lambda tid: self.tasks[tid].priority, reverse=True)
+            # Önceliğe göre sırala (eşit öncelikte önce gelen önce)
+            self.task_queue.sort(key=lambda tid: (-self.tasks[tid].priority, self.tasks[tid].created_at_ns))
             
-            logger.info(f"📋 Yeni görev eklendi: {task.task_id} ({task.task_type.value})")
-            
-            return task.task_id
+            return [task.task_id for task in tasks]
     
     async def get_task(self, task_id: str) -> Optional[A2ATask]:
         """Görev bilgisi al"""
-        return self.tasks.get(task_id)
+        task = self.tasks.get(task_id)
+        if task is None:
+            task = self.completed_tasks.get(task_id)
+        return task
+    
+    def register_completion_callback(self, task_id: str, callback: Callable[[A2ATask], Any]) -> bool:
+        """Görev bittiğinde (tamamlandı/başarısız) çağrılacak senkron callback kaydet"""
+        if task_id not in self.tasks:
+            return False  # Görev zaten bitmiş ya da hiç gönderilmemiş
+        self._completion_callbacks[task_id].append(callback)
+        return True
+    
+    async def wait_for_task(self, task_id: str):
+        """Görev bitene (tamamlanana ya da başarısız olana) kadar bekle"""
+        event = asyncio.Event()
+        if self.register_completion_callback(task_id, lambda task: event.set()):
+            await event.wait()
     
     async def update_task_status(self, task_id: str, status: A2ATaskStatus, assignee_id: str = None):
         """Görev durumunu güncelle"""
         async with self._lock:
             if task_id in self.tasks:
                 task = self.tasks[task_id]
-                task.status = status
+                self._set_task_status(task, status)
                 
                 if assignee_id:
                     task.assignee_id = assignee_id
-                    task.assigned_at = datetime.now()
+                    task.assigned_at_ns = time.monotonic_ns()
                 
                 if status == A2ATaskStatus.IN_PROGRESS:
                     # Kuyruktan çıkar
@@ -285,11 +387,12 @@ class A2ANetwork:
         async with self._lock:
             if task_id in self.tasks:
                 task = self.tasks[task_id]
-                task.status = A2ATaskStatus.COMPLETED
+                self._set_task_status(task, A2ATaskStatus.COMPLETED)
                 task.output_data = result
-                task.completed_at = datetime.now()
+                task.completed_at_ns = time.monotonic_ns()
+                self._archive_task(task_id)
                 
-                logger.info(f"✅ Görev tamamlandı: {task_id}")
+                logger.info("✅ Görev tamamlandı: %s", task_id)
                 
                 # Context'i paylaş
                 await mcp_service.context_store.share_context(
@@ -304,11 +407,45 @@ class A2ANetwork:
         async with self._lock:
             if task_id in self.tasks:
                 task = self.tasks[task_id]
-                task.status = A2ATaskStatus.FAILED
+                self._set_task_status(task, A2ATaskStatus.FAILED)
                 task.metadata["error"] = error
-                task.completed_at = datetime.now()
+                task.completed_at_ns = time.monotonic_ns()
+                self._archive_task(task_id)
                 
-                logger.error(f"❌ Görev başarısız: {task_id} - {error}")
+                logger.error("❌ Görev başarısız: %s - %s", task_id, error)
+    
+    def _archive_task(self, task_id: str):
+        """Biten görevi aktif görevlerden sınırlı geçmişe taşı"""
+        task = self.tasks.pop(task_id)
+        if task_id in self.task_queue:
+            self.task_queue.remove(task_id)
+        
+        # Aynı ID ile arşivlenmiş eski görev varsa sayacını düş (yeni görev en sona eklenir)
+        old = self.completed_tasks.pop(task_id, None)
+        if old is not None:
+            self.status_counts[old.status] -= 1
+        self.completed_tasks[task_id] = task
+        for callback in self._completion_callbacks.pop(task_id, ()):
+            try:
+                callback(task)
+            except Exception as e:
+                logger.error("❌ Görev bitiş callback hatası: %s - %s", task_id, e)
+        if len(self.completed_tasks) > COMPLETED_TASK_HISTORY_LIMIT:
+            _, evicted = self.completed_tasks.popitem(last=False)
+            self.status_counts[evicted.status] -= 1
+    
+    def _set_task_status(self, task: A2ATask, status: A2ATaskStatus):
+        """Görev durumunu değiştir ve durum sayaçlarını güncelle"""
+        self.status_counts[task.status] -= 1
+        self.status_counts[status] += 1
+        task.status = status
+    
+    def _on_agent_status_change(self, old_status: Optional[str], new_status: str):
+        """Agent durum değişikliğinde aktif agent sayacını güncelle"""
+        if old_status == "offline" and new_status != "offline":
+            self._active_agents += 1
+        elif old_status != "offline" and new_status == "offline":
+            self._active_agents -= 1
     
     async def _task_scheduler(self):
         """Görev zamanlayıcısı"""
@@ -319,40 +456,49 @@ class A2ANetwork:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"❌ Scheduler hatası: {e}")
+                logger.error("❌ Scheduler hatası: %s", e)
                 await asyncio.sleep(10)
     
     async def _assign_pending_tasks(self):
         """Bekleyen görevleri ata"""
         async with self._lock:
-            if not self.task_queue:
-                return
-            
-            # En yüksek öncelikli görevi al
-            task_id = self.task_queue[0]
-            task = self.tasks[task_id]
-            
-            # Uygun agent bul
-            suitable_agents = [
-                agent for agent in self.agents.values()
-                if (agent.can_handle_task(task.task_type) and 
-                    len(agent.current_tasks) < agent.max_concurrent_tasks and
-                    agent.status != "offline")
-            ]
-            
-            if suitable_agents:
-                # En az meşgul olan agent'ı seç
-                selected_agent = min(suitable_agents, key=lambda a: len(a.current_tasks))
+            # Uygun agent'ı olan en yüksek öncelikli görevi bul; agent'ı olmayan
+            # görev türleri bu tur için engellenir ve sıradaki görevlere geçilir
+            blocked_types = set()
+            selected_agent = None
+            for task_id in self.task_queue:
+                task = self.tasks[task_id]
+                task_type_value = task._task_type_value
+                if task_type_value in blocked_types:
+                    continue
+                
+                # Uygun ve en az meşgul agent'ı tek geçişte bul
+                selected_load = None
+                for agent in self.agents.values():
+                    load = len(agent.current_tasks)
+                    if (load < agent.max_concurrent_tasks and
+                            task_type_value in agent._capability_set and
+                            agent.status != "offline" and
+                            (selected_load is None or load < selected_load)):
+                        selected_agent = agent
+                        selected_load = load
+                        if load == 0:
+                            break  # Boştaki agent'tan daha iyisi yok
                 
+                if selected_agent is not None:
+                    break
+                blocked_types.add(task_type_value)
+            
+            if selected_agent is not None:
                 # Görev atama mesajı gönder
                 message = MCPMessage(
-                    id=str(uuid.uuid4()),
+                    id=uuid.uuid4().hex,
                     type=MCPMessageType.TASK_ASSIGN,
                     sender_id="a2a_network",
                     receiver_id=selected_agent.agent_id,
                     payload={
                         "task_id": task_id,
-                        "task_type": task.task_type.value,
+                        "task_type": task_type_value,
                         "input_data": task.input_data,
                         "priority": task.priority,
                         "deadline": task.deadline.isoformat() if task.deadline else None
@@ -364,16 +510,12 @@ class A2ANetwork:
     
     async def get_network_stats(self) -> Dict[str, Any]:
         """Ağ istatistikleri"""
-        active_agents = len([a for a in self.agents.values() if a.status != "offline"])
-        
-        task_stats = {}
-        for status in A2ATaskStatus:
-            task_stats[status.value] = len([t for t in self.tasks.values() if t.status == status])
+        task_stats = {status.value: count for status, count in self.status_counts.items()}
         
         return {
             "total_agents": len(self.agents),
-            "active_agents": active_agents,
-            "total_tasks": len(self.tasks),
+            "active_agents": self._active_agents,
+            "total_tasks": len(self.tasks) + len(self.completed_tasks),
             "pending_tasks": len(self.task_queue),
             "task_stats": task_stats,
             "network_status": "running" if self.is_running else "stopped"
@@ -9,6 +9,13 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 from contextlib import asynccontextmanager
 
+try:
+    # uvloop kuruluysa agent sisteminin event loop'u libuv tabanlı olsun
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 from app.services.mcp_service import mcp_service
 from app.services.a2a_network import a2a_network
 from app.services.agents.strategy_agent import StrategyAgent
@@ -56,10 +63,10 @@ class AgentOrchestrator:
             self.system_stats["system_health"] = "healthy"
             
             logger.info("🎉 Agent Orchestrator başarıyla başlatıldı!")
-            logger.info(f"📊 Aktif Agent Sayısı: {len(self.agents)}")
+            logger.info("📊 Aktif Agent Sayısı: %s", len(self.agents))
             
         except Exception as e:
-            logger.error(f"❌ Agent Orchestrator başlatma hatası: {e}")
+            logger.error("❌ Agent Orchestrator başlatma hatası: %s", e)
             await self.stop()
             raise
     
@@ -74,12 +81,9 @@ class AgentOrchestrator:
             # Agent'ları temizle
             self.agents.clear()
             
-            # A2A Network'ü durdur
-            await a2a_network.stop()
+            # A2A Network ve MCP Service'i birlikte durdur
+            await asyncio.gather(a2a_network.stop(), mcp_service.stop())
             logger.info("✅ A2A Network durduruldu")
-            
-            # MCP Service'i durdur
-            await mcp_service.stop()
             logger.info("✅ MCP Service durduruldu")
             
             # Sistem durumunu güncelle
@@ -89,21 +93,21 @@ class AgentOrchestrator:
             logger.info("🏁 Agent Orchestrator başarıyla durduruldu")
             
         except Exception as e:
-            logger.error(f"❌ Agent Orchestrator durdurma hatası: {e}")
+            logger.error("❌ Agent Orchestrator durdurma hatası: %s", e)
     
     async def _initialize_agents(self):
         """Agent'ları başlat"""
         try:
-            # 1. Strategy Agent
             strategy_agent = StrategyAgent("strategy_agent_001")
-            await strategy_agent.join_network(a2a_network)
-            self.agents["strategy_agent_001"] = strategy_agent
-            logger.info("🎯 Strategy Agent başlatıldı")
-            
-            # 2. Coordinator Agent
             coordinator_agent = CoordinatorAgent("coordinator_agent_001")
-            await coordinator_agent.join_network(a2a_network)
-            self.agents["coordinator_agent_001"] = coordinator_agent
+            agents = [strategy_agent, coordinator_agent]
+            
+            # Agent'ları ağa eşzamanlı olarak kat
+            await asyncio.gather(*(agent.join_network(a2a_network) for agent in agents))
+            
+            for agent in agents:
+                self.agents[agent.agent_id] = agent
+            logger.info("🎯 Strategy Agent başlatıldı")
             logger.info("🎼 Coordinator Agent başlatıldı")
             
             # Gelecekte daha fazla agent eklenebilir:
@@ -115,7 +119,7 @@ class AgentOrchestrator:
             self.system_stats["active_agents"] = len(self.agents)
             
         except Exception as e:
-            logger.error(f"❌ Agent başlatma hatası: {e}")
+            logger.error("❌ Agent başlatma hatası: %s", e)
             raise
     
     async def orchestrate_comprehensive_strategy(self, product_id: int, user_id: int) -> Dict[str, Any]:
@@ -127,7 +131,7 @@ class AgentOrchestrator:
         if not coordinator:
             raise RuntimeError("Coordinator Agent bulunamadı")
         
-        logger.info(f"🎼 Kapsamlı strateji orkestrasyon başlıyor: Product {product_id}")
+        logger.info("🎼 Kapsamlı strateji orkestrasyon başlıyor: Product %s", product_id)
         
         # Coordinator Agent'a orkestrasyon görevi ver
         result = await coordinator.orchestrate_comprehensive_strategy(product_id, user_id)
@@ -147,7 +151,7 @@ class AgentOrchestrator:
         if not strategy_agent:
             raise RuntimeError("Strategy Agent bulunamadı")
         
-        logger.info(f"🎯 Strategy Agent ile strateji oluşturuluyor: Product {product_id}")
+        logger.info("🎯 Strategy Agent ile strateji oluşturuluyor: Product %s", product_id)
         
         if analysis_data:
             # Mevcut analiz verilerini kullan
@@ -3,16 +3,208 @@ Coordinator Agent - Tüm agent'ları koordine eden ana agent
 """
 
 import asyncio
+import functools
 import json
-from typing import Dict, List, Any, Optional
+import sys
+import time
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional
 from datetime import datetime, timedelta
+from dataclasses import dataclass, field
 import logging
 
-from app.services.a2a_network import A2AAgent, A2ATask, A2ATaskType, A2ATaskStatus, a2a_network
+from app.services.a2a_network import A2AAgent, A2ATask, A2ATaskType, A2ATaskStatus, a2a_network, time_cache
 from app.services.mcp_service import mcp_service, MCPMessage, MCPMessageType
 
 logger = logging.getLogger(__name__)
 
+# Aynı anda çalışabilecek en fazla workflow sayısı (fazlası sırada bekler)
+MAX_CONCURRENT_WORKFLOWS = 4
+# Workflow görevlerinin A2A network'e gönderim hızı (görev/saniye)
+WORKFLOW_SUBMIT_RATE = 20
+# Takılan bir workflow'un eşzamanlılık slotunu en fazla tutabileceği süre
+WORKFLOW_TIMEOUT_SECONDS = 15 * 60
+
+def _freeze(node: Any) -> Any:
+    """Şablonu salt okunur hale getir (dict -> MappingProxyType, list -> tuple)"""
+    if isinstance(node, dict):
+        return MappingProxyType({key: _freeze(value) for key, value in node.items()})
+    if isinstance(node, list):
+        return tuple(_freeze(item) for item in node)
+    return node
+
+# Workflow plan şablonları (salt okunur) - "{alan}" yer tutucuları plan oluşturulurken doldurulur
+_COMPREHENSIVE_STRATEGY_TEMPLATE: Mapping[str, Any] = _freeze({
+    "tasks": [
+        {
+            "task_id": "market_analysis_{product_id}",
+            "task_type": A2ATaskType.MARKET_ANALYSIS,
+            "agent_type": "MarketResearchAgent",
+            "priority": 3,
+            "input_data": {
+                "product_id": "{product_id}",
+                "analysis_depth": "comprehensive"
+            },
+            "dependencies": []
+        },
+        {
+            "task_id": "customer_segmentation_{product_id}",
+            "task_type": A2ATaskType.CUSTOMER_SEGMENTATION,
+            "agent_type": "StrategyAgent",
+            "priority": 3,
+            "input_data": {
+                "product_id": "{product_id}",
+                "segmentation_method": "ai_driven"
+            },
+            "dependencies": []
+        },
+        {
+            "task_id": "price_optimization_{product_id}",
+            "task_type": A2ATaskType.PRICE_OPTIMIZATION,
+            "agent_type": "StrategyAgent",
+            "priority": 2,
+            "input_data": {
+                "product_id": "{product_id}",
+                "optimization_goal": "roi_maximization"
+            },
+            "dependencies": ["market_analysis_{product_id}"]
+        },
+        {
+            "task_id": "strategy_generation_{product_id}",
+            "task_type": A2ATaskType.STRATEGY_GENERATION,
+            "agent_type": "StrategyAgent",
+            "priority": 1,
+            "input_data": {
+                "product_id": "{product_id}",
+                "user_id": "{user_id}",
+                "use_workflow_results": True
+            },
+            "dependencies": [
+                "market_analysis_{product_id}",
+                "customer_segmentation_{product_id}",
+                "price_optimization_{product_id}"
+            ]
+        }
+    ],
+    "estimated_duration": "5-10 minutes",
+    "workflow_type": "comprehensive_strategy_generation"
+})
+
+_MARKET_RESEARCH_TEMPLATE: Mapping[str, Any] = _freeze({
+    "tasks": [
+        {
+            "task_id": "competitor_research_{product_id}",
+            "task_type": A2ATaskType.COMPETITOR_RESEARCH,
+            "agent_type": "MarketResearchAgent",
+            "priority": 3,
+            "input_data": "{workflow_data}",
+            "dependencies": []
+        }
+    ],
+    "estimated_duration": "3-5 minutes",
+    "workflow_type": "market_research"
+})
+
+_PERFORMANCE_OPTIMIZATION_TEMPLATE: Mapping[str, Any] = _freeze({
+    "tasks": [
+        {
+            "task_id": "performance_analysis_{product_id}",
+            "task_type": A2ATaskType.PERFORMANCE_ANALYSIS,
+            "agent_type": "PerformanceAnalysisAgent",
+            "priority": 3,
+            "input_data": "{workflow_data}",
+            "dependencies": []
+        }
+    ],
+    "estimated_duration": "2-4 minutes",
+    "workflow_type": "performance_optimization"
+})
+
+_DEFAULT_TEMPLATE: Mapping[str, Any] = _freeze({
+    "tasks": [
+        {
+            "task_id": "default_task_{timestamp}",
+            "task_type": A2ATaskType.COORDINATION,
+            "agent_type": "CoordinatorAgent",
+            "priority": 1,
+            "input_data": "{workflow_data}",
+            "dependencies": []
+        }
+    ],
+    "estimated_duration": "1-2 minutes",
+    "workflow_type": "default"
+})
+
+@dataclass(slots=True)
+class TaskRecord:
+    """Workflow içinde gönderilen görevin kaydı"""
+    task_config: Dict[str, Any]
+    status: str
+    submitted_at: datetime
+
+@dataclass(slots=True)
+class WorkflowRecord:
+    """Coordinator'ın takip ettiği workflow kaydı"""
+    workflow_id: str
+    workflow_type: str
+    workflow_plan: Mapping[str, Any]
+    status: str
+    created_at: datetime
+    tasks: Dict[str, TaskRecord] = field(default_factory=dict)
+    dependencies: Dict[str, List[str]] = field(default_factory=dict)
+    progress: int = 0
+
+def _ttl_cached(ttl_seconds: float):
+    """Argümansız async fonksiyonun sonucunu kısa süre önbellekte tut"""
+    def decorator(func):
+        cache: Dict[str, Any] = {"value": None, "expires_at": 0.0}
+        
+        @functools.wraps(func)
+        async def wrapper():
+            now = time.monotonic()
+            if now >= cache["expires_at"]:
+                cache["value"] = await func()
+                cache["expires_at"] = now + ttl_seconds
+            return cache["value"]
+        return wrapper
+    return decorator
+
+# Aynı koordinasyon turunda tekrarlanan sorgular için kısa ömürlü önbellekli görünümler
+@_ttl_cached(0.5)
+async def _get_active_agents() -> List[Any]:
+    """Aktif agent listesi (önbellekli)"""
+    return await mcp_service.context_store.get_active_agents()
+
+@_ttl_cached(0.5)
+async def _get_mcp_stats() -> Dict[str, Any]:
+    """MCP servis istatistikleri (önbellekli)"""
+    return await mcp_service.get_service_stats()
+
+@_ttl_cached(0.5)
+async def _get_a2a_stats() -> Dict[str, Any]:
+    """A2A network istatistikleri (önbellekli)"""
+    return await a2a_network.get_network_stats()
+
+def _fill_workflow_template(node: Any, values: Dict[str, Any]) -> Any:
+    """Yer tutucuları doldur; yer tutucu içermeyen alt ağaçlar şablondan paylaşılır"""
+    if isinstance(node, MappingProxyType):
+        filled = {key: _fill_workflow_template(value, values) for key, value in node.items()}
+        if all(filled[key] is value for key, value in node.items()):
+            return node
+        return MappingProxyType(filled)
+    if isinstance(node, tuple):
+        filled = tuple(_fill_workflow_template(item, values) for item in node)
+        if all(new is old for new, old in zip(filled, node)):
+            return node
+        return filled
+    if isinstance(node, str) and "{" in node:
+        # Tek başına yer tutucu ise değerin tipini koru (ör. int product_id)
+        if node[0] == "{" and node[-1] == "}" and node[1:-1] in values:
+            return values[node[1:-1]]
+        # Üretilen ID'ler intern edilir; task_id ile dependencies aynı nesneyi paylaşır
+        return sys.intern(node.format_map(values))
+    return node
+
 class CoordinatorAgent(A2AAgent):
     """Coordinator Agent - Multi-agent koordinasyon sistemi"""
     
@@ -28,43 +220,52 @@ class CoordinatorAgent(A2AAgent):
         super().__init__(agent_id, "CoordinatorAgent", capabilities)
         
         # Koordinasyon verileri
-        self.active_workflows: Dict[str, Dict[str, Any]] = {}
+        self.active_workflows: Dict[str, WorkflowRecord] = {}
+        self._workflow_ids_view: Optional[tuple] = None  # active_workflows anahtarlarının önbelleği
         self.agent_performance: Dict[str, Dict[str, Any]] = {}
         self.task_dependencies: Dict[str, List[str]] = {}
+        self._workflow_runners: set = set()  # Çalışan/sırada bekleyen workflow'lar
+        self._workflow_semaphore = asyncio.Semaphore(MAX_CONCURRENT_WORKFLOWS)
+        self._submit_lock = asyncio.Lock()
+        self._last_submit_at = 0.0
         
         self.max_concurrent_tasks = 10  # Coordinator çok görev alabilir
+        
+        # Görev/koordinasyon/workflow türüne göre işleyici tabloları
+        self._task_dispatch = {
+            A2ATaskType.COORDINATION: self._handle_coordination_task
+        }
+        self._coord_dispatch = {
+            "workflow_orchestration": self._orchestrate_workflow,
+            "resource_allocation": self._allocate_resources,
+            "system_monitoring": self._monitor_system,
+            "agent_performance_analysis": self._analyze_agent_performance
+        }
+        self._workflow_builders = {
+            "comprehensive_strategy_generation": self._create_comprehensive_strategy_workflow,
+            "market_research_workflow": self._create_market_research_workflow,
+            "performance_optimization_workflow": self._create_performance_optimization_workflow
+        }
     
     async def _execute_task(self, task: A2ATask):
         """Koordinasyon görevi çalıştır"""
         try:
-            logger.info(f"🎯 Coordinator Agent görevi başlıyor: {task.task_type.value}")
+            logger.info("🎯 Coordinator Agent görevi başlıyor: %s", task.task_type.value)
             
-            if task.task_type == A2ATaskType.COORDINATION:
-                result = await self._handle_coordination_task(task.input_data)
-            else:
-                result = await self._default_coordination_task(task.input_data)
+            handler = self._task_dispatch.get(task.task_type, self._default_coordination_task)
+            result = await handler(task.input_data)
             
             await self._complete_task(task.task_id, result)
-            logger.info(f"✅ Coordinator Agent görevi tamamlandı: {task.task_id}")
+            logger.info("✅ Coordinator Agent görevi tamamlandı: %s", task.task_id)
             
         except Exception as e:
-            logger.error(f"❌ Coordinator Agent görev hatası: {e}")
+            logger.error("❌ Coordinator Agent görev hatası: %s", e)
             await self._fail_task(task.task_id, str(e))
     
     async def _handle_coordination_task(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Koordinasyon görevini işle"""
-        coordination_type = input_data.get("type")
-        
-        if coordination_type == "workflow_orchestration":
-            return await self._orchestrate_workflow(input_data)
-        elif coordination_type == "resource_allocation":
-            return await self._allocate_resources(input_data)
-        elif coordination_type == "system_monitoring":
-            return await self._monitor_system(input_data)
-        elif coordination_type == "agent_performance_analysis":
-            return await self._analyze_agent_performance(input_data)
-        else:
-            return await self._default_coordination_task(input_data)
+        handler = self._coord_dispatch.get(input_data.get("type"), self._default_coordination_task)
+        return await handler(input_data)
     
     async def _orchestrate_workflow(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """İş akışı orkestrasyon"""
@@ -72,29 +273,21 @@ class CoordinatorAgent(A2AAgent):
         workflow_type = input_data.get("workflow_type", "strategy_generation")
         workflow_data = input_data.get("workflow_data", {})
         
-        logger.info(f"🎼 Workflow orkestrasyon başlıyor: {workflow_id} ({workflow_type})")
+        logger.info("🎼 Workflow orkestrasyon başlıyor: %s (%s)", workflow_id, workflow_type)
         
         # Workflow planı oluştur
-        if workflow_type == "comprehensive_strategy_generation":
-            workflow_plan = await self._create_comprehensive_strategy_workflow(workflow_data)
-        elif workflow_type == "market_research_workflow":
-            workflow_plan = await self._create_market_research_workflow(workflow_data)
-        elif workflow_type == "performance_optimization_workflow":
-            workflow_plan = await self._create_performance_optimization_workflow(workflow_data)
-        else:
-            workflow_plan = await self._create_default_workflow(workflow_data)
+        build_plan = self._workflow_builders.get(workflow_type, self._create_default_workflow)
+        workflow_plan = build_plan(workflow_data)
         
         # Workflow'u kaydet
-        self.active_workflows[workflow_id] = {
-            "workflow_id": workflow_id,
-            "workflow_type": workflow_type,
-            "workflow_plan": workflow_plan,
-            "status": "active",
-            "created_at": datetime.now(),
-            "tasks": {},
-            "dependencies": {},
-            "progress": 0
-        }
+        self._workflow_ids_view = None
+        self.active_workflows[workflow_id] = WorkflowRecord(
+            workflow_id=workflow_id,
+            workflow_type=workflow_type,
+            workflow_plan=workflow_plan,
+            status="queued",
+            created_at=datetime.now()
+        )
         
         # Workflow görevlerini başlat
         await self._execute_workflow(workflow_id)
@@ -105,123 +298,37 @@ class CoordinatorAgent(A2AAgent):
             "status": "orchestrated",
             "tasks_count": len(workflow_plan.get("tasks", [])),
             "estimated_duration": workflow_plan.get("estimated_duration", "unknown"),
-            "orchestrated_at": datetime.now().isoformat(),
+            "orchestrated_at": time_cache.now_iso(),
             "agent_id": self.agent_id
         }
     
-    async def _create_comprehensive_strategy_workflow(self, workflow_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_comprehensive_strategy_workflow(self, workflow_data: Dict[str, Any]) -> Mapping[str, Any]:
         """Kapsamlı strateji oluşturma workflow'u"""
-        product_id = workflow_data.get("product_id")
-        user_id = workflow_data.get("user_id")
-        
-        workflow_plan = {
-            "tasks": [
-                {
-                    "task_id": f"market_analysis_{product_id}",
-                    "task_type": A2ATaskType.MARKET_ANALYSIS,
-                    "agent_type": "MarketResearchAgent",
-                    "priority": 3,
-                    "input_data": {
-                        "product_id": product_id,
-                        "analysis_depth": "comprehensive"
-                    },
-                    "dependencies": []
-                },
-                {
-                    "task_id": f"customer_segmentation_{product_id}",
-                    "task_type": A2ATaskType.CUSTOMER_SEGMENTATION,
-                    "agent_type": "StrategyAgent",
-                    "priority": 3,
-                    "input_data": {
-                        "product_id": product_id,
-                        "segmentation_method": "ai_driven"
-                    },
-                    "dependencies": []
-                },
-                {
-                    "task_id": f"price_optimization_{product_id}",
-                    "task_type": A2ATaskType.PRICE_OPTIMIZATION,
-                    "agent_type": "StrategyAgent",
-                    "priority": 2,
-                    "input_data": {
-                        "product_id": product_id,
-                        "optimization_goal": "roi_maximization"
-                    },
-                    "dependencies": [f"market_analysis_{product_id}"]
-                },
-                {
-                    "task_id": f"strategy_generation_{product_id}",
-                    "task_type": A2ATaskType.STRATEGY_GENERATION,
-                    "agent_type": "StrategyAgent",
-                    "priority": 1,
-                    "input_data": {
-                        "product_id": product_id,
-                        "user_id": user_id,
-                        "use_workflow_results": True
-                    },
-                    "dependencies": [
-                        f"market_analysis_{product_id}",
-                        f"customer_segmentation_{product_id}",
-                        f"price_optimization_{product_id}"
-                    ]
-                }
-            ],
-            "estimated_duration": "5-10 minutes",
-            "workflow_type": "comprehensive_strategy_generation"
-        }
-        
-        return workflow_plan
+        return _fill_workflow_template(_COMPREHENSIVE_STRATEGY_TEMPLATE, {
+            "product_id": workflow_data.get("product_id"),
+            "user_id": workflow_data.get("user_id")
+        })
     
-    async def _create_market_research_workflow(self, workflow_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_market_research_workflow(self, workflow_data: Dict[str, Any]) -> Mapping[str, Any]:
         """Pazar araştırması workflow'u"""
-        return {
-            "tasks": [
-                {
-                    "task_id": f"competitor_research_{workflow_data.get('product_id')}",
-                    "task_type": A2ATaskType.COMPETITOR_RESEARCH,
-                    "agent_type": "MarketResearchAgent",
-                    "priority": 3,
-                    "input_data": workflow_data,
-                    "dependencies": []
-                }
-            ],
-            "estimated_duration": "3-5 minutes",
-            "workflow_type": "market_research"
-        }
+        return _fill_workflow_template(_MARKET_RESEARCH_TEMPLATE, {
+            "product_id": workflow_data.get("product_id"),
+            "workflow_data": workflow_data
+        })
     
-    async def _create_performance_optimization_workflow(self, workflow_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_performance_optimization_workflow(self, workflow_data: Dict[str, Any]) -> Mapping[str, Any]:
         """Performans optimizasyon workflow'u"""
-        return {
-            "tasks": [
-                {
-                    "task_id": f"performance_analysis_{workflow_data.get('product_id')}",
-                    "task_type": A2ATaskType.PERFORMANCE_ANALYSIS,
-                    "agent_type": "PerformanceAnalysisAgent",
-                    "priority": 3,
-                    "input_data": workflow_data,
-                    "dependencies": []
-                }
-            ],
-            "estimated_duration": "2-4 minutes",
-            "workflow_type": "performance_optimization"
-        }
+        return _fill_workflow_template(_PERFORMANCE_OPTIMIZATION_TEMPLATE, {
+            "product_id": workflow_data.get("product_id"),
+            "workflow_data": workflow_data
+        })
     
-    async def _create_default_workflow(self, workflow_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _create_default_workflow(self, workflow_data: Dict[str, Any]) -> Mapping[str, Any]:
         """Varsayılan workflow"""
-        return {
-            "tasks": [
-                {
-                    "task_id": f"default_task_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                    "task_type": A2ATaskType.COORDINATION,
-                    "agent_type": "CoordinatorAgent",
-                    "priority": 1,
-                    "input_data": workflow_data,
-                    "dependencies": []
-                }
-            ],
-            "estimated_duration": "1-2 minutes",
-            "workflow_type": "default"
-        }
+        return _fill_workflow_template(_DEFAULT_TEMPLATE, {
+            "timestamp": datetime.now().strftime('%Y%m%d_%H%M%S'),
+            "workflow_data": workflow_data
+        })
     
     async def _execute_workflow(self, workflow_id: str):
         """Workflow'u çalıştır"""
@@ -229,36 +336,108 @@ class CoordinatorAgent(A2AAgent):
             return
         
         workflow = self.active_workflows[workflow_id]
-        workflow_plan = workflow["workflow_plan"]
         
-        # Görevleri dependency sırasına göre başlat
-        for task_config in workflow_plan["tasks"]:
-            # Dependency kontrolü
-            dependencies = task_config.get("dependencies", [])
-            if dependencies:
-                # Bağımlılıkları bekle (basit implementasyon)
-                await asyncio.sleep(1)
+        # Workflow eşzamanlılık sınırı içinde arka planda çalışır; sınır doluysa sırada bekler
+        runner = asyncio.create_task(self._run_workflow(workflow))
+        self._workflow_runners.add(runner)
+        runner.add_done_callback(self._workflow_runners.discard)
+        
+        logger.info("🎼 Workflow görevleri başlatıldı: %s", workflow_id)
+    
+    def _workflow_ids(self) -> tuple:
+        """Workflow ID'leri (yalnızca workflow eklendiğinde yeniden oluşturulur)"""
+        if self._workflow_ids_view is None:
+            self._workflow_ids_view = tuple(self.active_workflows)
+        return self._workflow_ids_view
+    
+    async def _run_workflow(self, workflow: WorkflowRecord):
+        """Workflow görevlerini bağımlılık sırasına göre gönder"""
+        async with self._workflow_semaphore:
+            workflow.status = "active"
             
-            # Görevi oluştur ve gönder
-            task = A2ATask(
-                task_id=task_config["task_id"],
-                task_type=task_config["task_type"],
-                requester_id=self.agent_id,
-                priority=task_config["priority"],
-                input_data=task_config["input_data"]
-            )
+            # Bağımlılığı olmayan görevler tek seferde toplu gönderilir; diğerleri için
+            # öncülleri biter bitmez görevi gönderen bir başlatıcı çalışır
+            tasks = workflow.workflow_plan["tasks"]
+            submitted = {task_config["task_id"]: asyncio.Event() for task_config in tasks}
+            initial = []
+            dependent = []
+            for task_config in tasks:
+                if any(dep in submitted for dep in task_config.get("dependencies", ())):
+                    dependent.append(task_config)
+                else:
+                    initial.append(task_config)
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        self._submit_workflow_tasks(workflow, initial, submitted),
+                        *(self._run_workflow_task(workflow, task_config, submitted)
+                          for task_config in dependent)
+                    ),
+                    timeout=WORKFLOW_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                workflow.status = "timeout"
+                logger.warning("⏰ Workflow zaman aşımına uğradı: %s", workflow.workflow_id)
+    
+    async def _submit_rate_limited(self, tasks: List[A2ATask]) -> List[str]:
+        """Görevleri gönderim hızı sınırına uyarak A2A network'e toplu gönder"""
+        async with self._submit_lock:
+            wait = self._last_submit_at + 1 / WORKFLOW_SUBMIT_RATE - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_submit_at = time.monotonic()
+        return await a2a_network.submit_tasks(tasks)
+    
+    async def _run_workflow_task(self, workflow: WorkflowRecord, task_config: Mapping[str, Any],
+                                 submitted: Dict[str, asyncio.Event]):
+        """Bağımlılıklar bitince workflow görevini A2A network'e gönder"""
+        try:
+            dependencies = [dep for dep in task_config.get("dependencies", ()) if dep in submitted]
+            for dep in dependencies:
+                await submitted[dep].wait()
+            await asyncio.gather(*(a2a_network.wait_for_task(dep) for dep in dependencies))
+        except Exception as e:
+            logger.error("❌ Workflow görevi bağımlılık beklerken hata: %s - %s", task_config.get("task_id"), e)
+            submitted[task_config["task_id"]].set()
+            return
+        
+        await self._submit_workflow_tasks(workflow, [task_config], submitted)
+    
+    async def _submit_workflow_tasks(self, workflow: WorkflowRecord, task_configs: List[Mapping[str, Any]],
+                                     submitted: Dict[str, asyncio.Event]):
+        """Workflow görevlerini oluştur, toplu gönder ve workflow'da takip et"""
+        if not task_configs:
+            return
+        try:
+            tasks = [
+                A2ATask(
+                    task_id=task_config["task_id"],
+                    task_type=task_config["task_type"],
+                    requester_id=self.agent_id,
+                    priority=task_config["priority"],
+                    input_data=dict(task_config["input_data"])  # Şablon parçası salt okunur
+                )
+                for task_config in task_configs
+            ]
             
             # A2A network'e gönder
-            task_id = await a2a_network.submit_task(task)
+            task_ids = await self._submit_rate_limited(tasks)
             
             # Workflow'da takip et
-            workflow["tasks"][task_id] = {
-                "task_config": task_config,
-                "status": "submitted",
-                "submitted_at": datetime.now()
-            }
-        
-        logger.info(f"🎼 Workflow görevleri gönderildi: {workflow_id}")
+            submitted_at = datetime.now()
+            for task_id, task_config in zip(task_ids, task_configs):
+                workflow.tasks[task_id] = TaskRecord(
+                    task_config=task_config,
+                    status="submitted",
+                    submitted_at=submitted_at
+                )
+        except Exception as e:
+            logger.error("❌ Workflow görevleri gönderilemedi: %s - %s",
+                         [task_config.get("task_id") for task_config in task_configs], e)
+        finally:
+            # Bekleyen bağımlı görevleri serbest bırak
+            for task_config in task_configs:
+                submitted[task_config["task_id"]].set()
     
     async def _allocate_resources(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Kaynak tahsisi"""
@@ -266,7 +445,7 @@ class CoordinatorAgent(A2AAgent):
         allocation_strategy = input_data.get("strategy", "load_balanced")
         
         # Agent'ların mevcut durumunu al
-        active_agents = await mcp_service.context_store.get_active_agents()
+        active_agents = await _get_active_agents()
         
         # Kaynak tahsis stratejisi uygula
         if allocation_strategy == "load_balanced":
@@ -281,7 +460,7 @@ class CoordinatorAgent(A2AAgent):
             "allocation_strategy": allocation_strategy,
             "active_agents": len(active_agents),
             "allocation_result": allocation_result,
-            "allocated_at": datetime.now().isoformat(),
+            "allocated_at": time_cache.now_iso(),
             "agent_id": self.agent_id
         }
     
@@ -313,16 +492,13 @@ class CoordinatorAgent(A2AAgent):
         """Sistem izleme"""
         monitoring_scope = input_data.get("scope", "all")
         
-        # MCP istatistikleri
-        mcp_stats = await mcp_service.get_service_stats()
-        
-        # A2A network istatistikleri
-        a2a_stats = await a2a_network.get_network_stats()
+        # MCP ve A2A network istatistikleri (birbirinden bağımsız, birlikte alınır)
+        mcp_stats, a2a_stats = await asyncio.gather(_get_mcp_stats(), _get_a2a_stats())
         
         # Workflow durumları
         workflow_stats = {
             "active_workflows": len(self.active_workflows),
-            "workflows": list(self.active_workflows.keys())
+            "workflows": self._workflow_ids()
         }
         
         system_health = {
@@ -337,7 +513,7 @@ class CoordinatorAgent(A2AAgent):
             "mcp_stats": mcp_stats,
             "a2a_stats": a2a_stats,
             "workflow_stats": workflow_stats,
-            "monitored_at": datetime.now().isoformat(),
+            "monitored_at": time_cache.now_iso(),
             "agent_id": self.agent_id
         }
     
@@ -345,9 +521,11 @@ class CoordinatorAgent(A2AAgent):
         """Agent performans analizi"""
         analysis_period = input_data.get("period", "last_hour")
         
+        active_agents = await _get_active_agents()
+        
         # Basit performans analizi
         performance_summary = {
-            "total_agents": len(await mcp_service.context_store.get_active_agents()),
+            "total_agents": len(active_agents),
             "analysis_period": analysis_period,
             "performance_metrics": {
                 "task_completion_rate": "85%",
@@ -360,7 +538,7 @@ class CoordinatorAgent(A2AAgent):
             "analysis_type": "agent_performance",
             "analysis_period": analysis_period,
             "performance_summary": performance_summary,
-            "analyzed_at": datetime.now().isoformat(),
+            "analyzed_at": time_cache.now_iso(),
             "agent_id": self.agent_id
         }
     
@@ -370,7 +548,7 @@ class CoordinatorAgent(A2AAgent):
             "status": "completed",
             "message": "Coordinator Agent tarafından işlendi",
             "input_data": input_data,
-            "processed_at": datetime.now().isoformat(),
+            "processed_at": time_cache.now_iso(),
             "agent_id": self.agent_id
         }
     
@@ -406,5 +584,5 @@ class CoordinatorAgent(A2AAgent):
             "active_workflows": len(self.active_workflows),
             "current_tasks": len(self.current_tasks),
             "max_concurrent_tasks": self.max_concurrent_tasks,
-            "workflows": list(self.active_workflows.keys())
+            "workflows": self._workflow_ids()
         } 
\ No newline at end of file
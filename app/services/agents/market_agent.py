@@ -2,21 +2,29 @@
 Market Research Agent - Pazar araştırması agent'ı
 """
 
-import asyncio
-from typing import Dict, List, Any
-from datetime import datetime
+from typing import Dict, List, Any, Optional, TYPE_CHECKING
 import logging
 
-from app.services.a2a_network import A2AAgent, A2ATask, A2ATaskType
-from app.services.ai_services import MarketAnalyzer
-from app.services.serp_service import SerpApiService
+from cachetools import TTLCache
+
+from app.services.a2a_network import A2AAgent, A2ATask, A2ATaskType, time_cache
+from app.services.serp_service import SerpApiService, serp_service as shared_serp_service
+
+if TYPE_CHECKING:
+    from app.services.ai_services import MarketAnalyzer
 
 logger = logging.getLogger(__name__)
 
+# Pazar/rakip analizi sonuç önbelleği ayarları
+ANALYSIS_CACHE_TTL_SECONDS = 300
+ANALYSIS_CACHE_MAX_SIZE = 128
+
 class MarketResearchAgent(A2AAgent):
     """Market Research Agent - Pazar araştırması ve rakip analizi"""
     
-    def __init__(self, agent_id: str = "market_research_agent_001"):
+    def __init__(self, agent_id: str = "market_research_agent_001",
+                 market_analyzer: Optional['MarketAnalyzer'] = None,
+                 serp_service: Optional[SerpApiService] = None):
         capabilities = [
             "market_analysis",
             "competitor_research",
@@ -26,29 +34,39 @@ class MarketResearchAgent(A2AAgent):
         
         super().__init__(agent_id, "MarketResearchAgent", capabilities)
         
-        # Servisler
-        self.market_analyzer = MarketAnalyzer()
-        self.serp_service = SerpApiService()
+        # Servisler (verilmezse süreç genelindeki paylaşılan örnekler kullanılır)
+        if market_analyzer is None:
+            # Ağır AI bağımlılıkları (pandas, pytrends, Gemini) yalnızca agent oluşturulunca yüklenir
+            from app.services.ai_services import get_market_analyzer
+            market_analyzer = get_market_analyzer()
+        self.market_analyzer = market_analyzer
+        self.serp_service = serp_service or shared_serp_service
+        
+        # Aynı ürün için tekrarlanan analizlerin önbelleği: (ürün adı, kategori) -> sonuç
+        self._analysis_cache: TTLCache = TTLCache(maxsize=ANALYSIS_CACHE_MAX_SIZE, ttl=ANALYSIS_CACHE_TTL_SECONDS)
+        self._competitor_cache: TTLCache = TTLCache(maxsize=ANALYSIS_CACHE_MAX_SIZE, ttl=ANALYSIS_CACHE_TTL_SECONDS)
+        
+        # Görev türüne göre işleyici tablosu
+        self._task_dispatch = {
+            A2ATaskType.MARKET_ANALYSIS: self._perform_market_analysis,
+            A2ATaskType.COMPETITOR_RESEARCH: self._research_competitors
+        }
         
         self.max_concurrent_tasks = 3
     
     async def _execute_task(self, task: A2ATask):
         """Görevi çalıştır"""
         try:
-            logger.info(f"🔍 Market Research Agent görevi başlıyor: {task.task_type.value}")
+            logger.info("🔍 Market Research Agent görevi başlıyor: %s", task.task_type.value)
             
-            if task.task_type == A2ATaskType.MARKET_ANALYSIS:
-                result = await self._perform_market_analysis(task.input_data)
-            elif task.task_type == A2ATaskType.COMPETITOR_RESEARCH:
-                result = await self._research_competitors(task.input_data)
-            else:
-                result = await self._default_research_task(task.input_data)
+            handler = self._task_dispatch.get(task.task_type, self._default_research_task)
+            result = await handler(task.input_data)
             
             await self._complete_task(task.task_id, result)
-            logger.info(f"✅ Market Research Agent görevi tamamlandı: {task.task_id}")
+            logger.info("✅ Market Research Agent görevi tamamlandı: %s", task.task_id)
             
         except Exception as e:
-            logger.error(f"❌ Market Research Agent görev hatası: {e}")
+            logger.error("❌ Market Research Agent görev hatası: %s", e)
             await self._fail_task(task.task_id, str(e))
     
     async def _perform_market_analysis(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -56,32 +74,54 @@ class MarketResearchAgent(A2AAgent):
         product_name = input_data.get("product_name", "")
         product_category = input_data.get("product_category", "")
         
-        # AI ile pazar analizi
-        market_analysis = await self.market_analyzer.analyze_market(product_name, product_category)
+        cache_key = (product_name, product_category)
+        cached = self._analysis_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        return {
+        # AI ile pazar analizi (görev girdisinde yalnızca ad ve kategori var)
+        from app.services.agents.strategy_agent import ProductSnapshot
+        product = ProductSnapshot(
+            id=0,
+            name=product_name,
+            description="",
+            category=product_category,
+            cost_price=0.0,
+            target_profit_margin=None
+        )
+        market_analysis = await self.market_analyzer.analyze_market(product)
+        
+        result = self._analysis_cache[cache_key] = {
             "analysis_type": "comprehensive_market_analysis",
             "product_name": product_name,
             "product_category": product_category,
             "market_analysis": market_analysis,
-            "analyzed_at": datetime.now().isoformat(),
+            "analyzed_at": time_cache.now_iso(),
             "agent_id": self.agent_id
         }
+        return result
     
     async def _research_competitors(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Rakip araştırması yap"""
         product_name = input_data.get("product_name", "")
+        product_category = input_data.get("product_category") or None
+        
+        cache_key = (product_name, product_category)
+        cached = self._competitor_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # SerpAPI ile rakip araştırması
-        competitor_data = await self.serp_service.search_competitors(product_name)
+        competitor_data = await self.serp_service.analyze_competitors(product_name, product_category)
         
-        return {
+        result = self._competitor_cache[cache_key] = {
             "research_type": "competitor_analysis",
             "product_name": product_name,
             "competitor_data": competitor_data,
-            "researched_at": datetime.now().isoformat(),
+            "researched_at": time_cache.now_iso(),
             "agent_id": self.agent_id
         }
+        return result
     
     async def _default_research_task(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Varsayılan araştırma görevi"""
@@ -89,6 +129,6 @@ class MarketResearchAgent(A2AAgent):
             "status": "completed",
             "message": "Market Research Agent tarafından işlendi",
             "input_data": input_data,
-            "processed_at": datetime.now().isoformat(),
+            "processed_at": time_cache.now_iso(),
             "agent_id": self.agent_id
         } 
\ No newline at end of file
@@ -2,13 +2,10 @@
 Performance Analysis Agent - Performans analizi agent'ı
 """
 
-import asyncio
 from typing import Dict, List, Any
-from datetime import datetime
 import logging
 
-from app.services.a2a_network import A2AAgent, A2ATask, A2ATaskType
-from app.services.performance_analyzer import PerformanceAnalyzer
+from app.services.a2a_network import A2AAgent, A2ATask, A2ATaskType, time_cache
 
 logger = logging.getLogger(__name__)
 
@@ -26,25 +23,30 @@ class PerformanceAnalysisAgent(A2AAgent):
         super().__init__(agent_id, "PerformanceAnalysisAgent", capabilities)
         
         # Servisler
+        # Ağır AI/DB bağımlılıkları yalnızca agent oluşturulunca yüklenir
+        from app.services.performance_analyzer import PerformanceAnalyzer
         self.performance_analyzer = PerformanceAnalyzer()
         
         self.max_concurrent_tasks = 2
+        
+        # Görev türüne göre işleyici tablosu
+        self._task_dispatch = {
+            A2ATaskType.PERFORMANCE_ANALYSIS: self._analyze_performance
+        }
     
     async def _execute_task(self, task: A2ATask):
         """Görevi çalıştır"""
         try:
-            logger.info(f"📊 Performance Analysis Agent görevi başlıyor: {task.task_type.value}")
+            logger.info("📊 Performance Analysis Agent görevi başlıyor: %s", task.task_type.value)
             
-            if task.task_type == A2ATaskType.PERFORMANCE_ANALYSIS:
-                result = await self._analyze_performance(task.input_data)
-            else:
-                result = await self._default_performance_task(task.input_data)
+            handler = self._task_dispatch.get(task.task_type, self._default_performance_task)
+            result = await handler(task.input_data)
             
             await self._complete_task(task.task_id, result)
-            logger.info(f"✅ Performance Analysis Agent görevi tamamlandı: {task.task_id}")
+            logger.info("✅ Performance Analysis Agent görevi tamamlandı: %s", task.task_id)
             
         except Exception as e:
-            logger.error(f"❌ Performance Analysis Agent görev hatası: {e}")
+            logger.error("❌ Performance Analysis Agent görev hatası: %s", e)
             await self._fail_task(task.task_id, str(e))
     
     async def _analyze_performance(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -61,7 +63,7 @@ class PerformanceAnalysisAgent(A2AAgent):
             "analysis_type": "comprehensive_performance_analysis",
             "product_id": product_id,
             "performance_analysis": analysis_result,
-            "analyzed_at": datetime.now().isoformat(),
+            "analyzed_at": time_cache.now_iso(),
             "agent_id": self.agent_id
         }
     
@@ -71,6 +73,6 @@ class PerformanceAnalysisAgent(A2AAgent):
             "status": "completed",
             "message": "Performance Analysis Agent tarafından işlendi",
             "input_data": input_data,
-            "processed_at": datetime.now().isoformat(),
+            "processed_at": time_cache.now_iso(),
             "agent_id": self.agent_id
         } 
\ No newline at end of file
@@ -3,14 +3,27 @@ Strategy Agent - Strateji oluşturma ve analiz agent'ı
 """
 
 import asyncio
-import json
-from typing import Dict, List, Any, Optional
+import contextlib
+import hashlib
+import itertools
+import time
+import uuid
 from datetime import datetime
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
 import logging
 
-from app.services.a2a_network import A2AAgent, A2ATask, A2ATaskType
-from app.services.ai_services import StrategyBuilder, MarketAnalyzer, CustomerSegmenter, PricingAdvisor, MessagingGenerator
-from app.services.rag_engine import RAGEmbeddingEngine
+import numpy as np
+import orjson
+from cachetools import TTLCache
+
+from app.services.a2a_network import A2AAgent, A2ATask, A2ATaskType, time_cache
+from app.services.ai_services import (
+    StrategyResult, get_strategy_builder, get_market_analyzer, get_customer_segmenter,
+    get_pricing_advisor, get_messaging_generator
+)
+from app.services.rag_engine import get_rag_engine
+from app.services.mcp_service import mcp_service, MCPMessage, MCPMessageType
 from app.models.product import Product
 from app.models.strategy import Strategy
 from app.core.database import get_db
@@ -18,231 +31,531 @@ from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
+# Agent başına aynı anda yapılabilecek AI servis çağrısı sayısı (sağlayıcı limitine göre ayarlanır)
+MAX_CONCURRENT_AI_CALLS = 6
+
+# Görev girdisinde analiz verisi yoksa kullanılan temel varsayımlar (analyze_pricing_only ile aynı)
+_BASIC_MARKET_DATA = {"market_size": "Orta", "competition_level": "Orta", "demand_score": 0.7}
+_BASIC_AUDIENCE_DATA = {"primary_segment": "Genel Tüketici", "price_sensitivity": "Orta"}
+
+# Anahtar sırası sabit JSON (önbellek/istek anahtarları için); Decimal/datetime str'e çevrilir
+_CANONICAL_JSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+def _canonical_json(data: Any) -> bytes:
+    """Veriyi anahtar sırası sabit JSON byte'larına çevir"""
+    return orjson.dumps(data, default=str, option=_CANONICAL_JSON_OPTIONS)
+
+@dataclass(frozen=True, slots=True)
+class ProductSnapshot:
+    """Strateji üretiminde kullanılan ürün alanlarının salt okunur kopyası"""
+    id: int
+    name: str
+    description: str
+    category: str
+    cost_price: float
+    target_profit_margin: Optional[float]
+
+@dataclass(frozen=True, slots=True)
+class ProductInput:
+    """Ürün adı/kategorisi gerektiren görevlerin doğrulanmış girdisi"""
+    product_name: str
+    product_category: str
+    
+    @classmethod
+    def from_input(cls, input_data: Dict[str, Any]) -> 'ProductInput':
+        """Görev girdisini bir kez doğrula"""
+        product_name = input_data.get("product_name")
+        product_category = input_data.get("product_category")
+        if not product_name or not product_category:
+            raise ValueError("Product name ve category gerekli")
+        return cls(product_name, product_category)
+
+@dataclass(frozen=True, slots=True)
+class PricingInput:
+    """Fiyat optimizasyonu görevinin doğrulanmış girdisi"""
+    product_name: str
+    product_category: str
+    cost_price: float
+    target_margin: float = 0.2
+    
+    @classmethod
+    def from_input(cls, input_data: Dict[str, Any]) -> 'PricingInput':
+        """Görev girdisini bir kez doğrula (0 maliyet geçerli bir değerdir)"""
+        product_name = input_data.get("product_name")
+        product_category = input_data.get("product_category")
+        cost_price = input_data.get("cost_price")
+        if not product_name or not product_category or cost_price is None:
+            raise ValueError("Product name, category ve cost_price gerekli")
+        return cls(product_name, product_category, float(cost_price),
+                   float(input_data.get("target_margin", 0.2)))
+
+class ProximityCache:
+    """Embedding benzerliğine göre yaklaşık eşleşen LRU sonuç önbelleği (int8 nicemlenmiş vektörler)"""
+    
+    def __init__(self, capacity: int = 256, threshold: float = 0.05):
+        self.capacity = capacity
+        self.threshold = threshold  # En fazla kosinüs uzaklığı
+        # Vektörler ilk kayıtta boyut belli olunca (capacity, D) int8 matris olarak ayrılır
+        self._matrix: Optional[np.ndarray] = None
+        self._scales = np.zeros(capacity, dtype=np.float32)
+        self._scopes = np.empty(capacity, dtype=object)
+        self._values: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._used = np.zeros(capacity, dtype=bool)
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._clock = 0
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def normalize(vector: List[float]) -> np.ndarray:
+        """Vektörü birim uzunluğa getir"""
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+    
+    @staticmethod
+    def quantize(vector: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Vektörü vektör başına ölçekle int8'e nicemle"""
+        scale = float(np.max(np.abs(vector))) / 127.0
+        if not scale:
+            return np.zeros(vector.shape, dtype=np.int8), 0.0
+        return np.round(vector / scale).astype(np.int8), scale
+    
+    def _touch(self, slot: int):
+        """Slotu en son kullanılan olarak işaretle"""
+        self._clock += 1
+        self._last_used[slot] = self._clock
+    
+    def lookup(self, scope: Any, vector: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Aynı kapsamda (ör. kullanıcı) yeterince yakın bir kayıt varsa döndür"""
+        if self._matrix is not None and self._matrix.shape[1] == vector.shape[0]:
+            slots = np.flatnonzero(self._used & (self._scopes == scope))
+            if slots.size:
+                query, query_scale = self.quantize(vector)
+                similarities = (self._matrix[slots].astype(np.int32) @ query.astype(np.int32)).astype(np.float32)
+                similarities *= self._scales[slots] * query_scale
+                best = int(np.argmax(similarities))
+                if 1.0 - similarities[best] <= self.threshold:
+                    slot = int(slots[best])
+                    self._touch(slot)
+                    self.hits += 1
+                    return self._values[slot]
+        self.misses += 1
+        return None
+    
+    def store(self, scope: Any, vector: np.ndarray, value: Dict[str, Any]):
+        """Kaydı ekle, kapasite doluysa en az kullanılanın yerine yaz"""
+        if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+            # İlk kayıt ya da embedding modeli değişti: matrisi yeniden ayır
+            self._matrix = np.zeros((self.capacity, vector.shape[0]), dtype=np.int8)
+            self._used[:] = False
+            self._values = [None] * self.capacity
+        
+        free = np.flatnonzero(~self._used)
+        slot = int(free[0]) if free.size else int(np.argmin(self._last_used))
+        self._matrix[slot], self._scales[slot] = self.quantize(vector)
+        self._scopes[slot] = scope
+        self._values[slot] = value
+        self._used[slot] = True
+        self._touch(slot)
+
 class StrategyAgent(A2AAgent):
     """AI Strategy Agent - Gelişmiş strateji oluşturma agent'ı"""
     
-    def __init__(self, agent_id: str = "strategy_agent_001"):
-        capabilities = [
-            "strategy_generation",
-            "market_analysis", 
-            "customer_segmentation",
-            "price_optimization",
-            "messaging_strategy"
-        ]
-        
-        super().__init__(agent_id, "StrategyAgent", capabilities)
-        
-        # AI Servisleri
-        self.strategy_builder = StrategyBuilder()
-        self.market_analyzer = MarketAnalyzer()
-        self.customer_segmenter = CustomerSegmenter()
-        self.pricing_advisor = PricingAdvisor()
-        self.messaging_generator = MessagingGenerator()
+    # Değişmez yetenek listesi (tüm örnekler aynı tuple'ı paylaşır)
+    CAPABILITIES: Tuple[str, ...] = (
+        "strategy_generation",
+        "strategy_stream",
+        "market_analysis",
+        "customer_segmentation",
+        "price_optimization",
+        "messaging_strategy"
+    )
+    
+    def __init__(self, agent_id: str = "strategy_agent_001",
+                 cache_capacity: int = 256, cache_threshold: float = 0.05):
+        super().__init__(agent_id, "StrategyAgent", self.CAPABILITIES)
+        
+        # AI Servisleri (süreç genelinde paylaşılan örnekler)
+        self.strategy_builder = get_strategy_builder()
+        self.market_analyzer = get_market_analyzer()
+        self.customer_segmenter = get_customer_segmenter()
+        self.pricing_advisor = get_pricing_advisor()
+        self.messaging_generator = get_messaging_generator()
         
         # RAG Engine
-        self.rag_engine = RAGEmbeddingEngine()
+        self.rag_engine = get_rag_engine()
+        
+        # Neredeyse aynı ürün/gereksinimler için strateji önbelleği
+        self.strategy_cache = ProximityCache(capacity=cache_capacity, threshold=cache_threshold)
+        
+        # Aynı anda gelen aynı strateji isteklerini tek üretimde birleştir
+        self._inflight: Dict[str, asyncio.Task] = {}
+        
+        # Aynı milisaniyede üretilen strateji ID'lerini ayırmak için sayaç
+        self._id_counter = itertools.count()
+        
+        # Beklenmeden başlatılan arka plan işleri (GC'ye karşı referans tutulur)
+        self._background_tasks: set = set()
+        
+        # Ürün kayıtları için kısa süreli önbellek (product_id -> ProductSnapshot)
+        self._product_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+        
+        # Pazar analizi için (ürün adı, kategori) başına 6 saat önbellek
+        self._market_cache: TTLCache = TTLCache(maxsize=512, ttl=6 * 3600)
         
         self.max_concurrent_tasks = 2  # Strateji oluşturma resource-intensive
+        
+        # AI sağlayıcısına ani istek yığılmasını (429) önlemek için çağrı sınırı
+        self._llm_sem = asyncio.Semaphore(MAX_CONCURRENT_AI_CALLS)
+        
+        # Görev türüne göre işleyici tablosu
+        self._task_dispatch = {
+            A2ATaskType.STRATEGY_GENERATION: self._generate_comprehensive_strategy,
+            A2ATaskType.MARKET_ANALYSIS: self._perform_market_analysis,
+            A2ATaskType.CUSTOMER_SEGMENTATION: self._segment_customers,
+            A2ATaskType.PRICE_OPTIMIZATION: self._optimize_pricing
+        }
+    
+    async def _guarded(self, coro):
+        """AI servis çağrısını eşzamanlılık sınırı altında çalıştır"""
+        async with self._llm_sem:
+            return await coro
     
     async def _execute_task(self, task: A2ATask):
         """Görevi çalıştır"""
         try:
-            logger.info(f"🎯 Strategy Agent görevi başlıyor: {task.task_type.value}")
+            logger.info("🎯 Strategy Agent görevi başlıyor: %s", task.task_type.value)
             
-            if task.task_type == A2ATaskType.STRATEGY_GENERATION:
-                result = await self._generate_comprehensive_strategy(task.input_data)
-            elif task.task_type == A2ATaskType.MARKET_ANALYSIS:
-                result = await self._perform_market_analysis(task.input_data)
-            elif task.task_type == A2ATaskType.CUSTOMER_SEGMENTATION:
-                result = await self._segment_customers(task.input_data)
-            elif task.task_type == A2ATaskType.PRICE_OPTIMIZATION:
-                result = await self._optimize_pricing(task.input_data)
+            if task.task_type is A2ATaskType.STRATEGY_STREAM:
+                # Ara sonuçlar görevi talep eden agent'a gönderileceği için görevin kendisi gerekir
+                result = await self._stream_strategy_task(task)
             else:
-                result = await self._default_strategy_task(task.input_data)
+                handler = self._task_dispatch.get(task.task_type, self._default_strategy_task)
+                result = await handler(task.input_data)
             
             await self._complete_task(task.task_id, result)
-            logger.info(f"✅ Strategy Agent görevi tamamlandı: {task.task_id}")
+            logger.info("✅ Strategy Agent görevi tamamlandı: %s", task.task_id)
             
         except Exception as e:
-            logger.error(f"❌ Strategy Agent görev hatası: {e}")
+            logger.error("❌ Strategy Agent görev hatası: %s", e)
             await self._fail_task(task.task_id, str(e))
     
     async def _generate_comprehensive_strategy(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Kapsamlı strateji oluştur"""
+        """Kapsamlı strateji oluştur (devam eden aynı istek varsa onun sonucunu bekle)"""
+        product_id = input_data.get("product_id")
+        if not product_id:
+            raise ValueError("Product ID gerekli")
+        
+        key = hashlib.blake2b(
+            f"{product_id}:{input_data.get('user_id')}:".encode() + _canonical_json(input_data.get("requirements", {})),
+            digest_size=16
+        ).hexdigest()
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._build_comprehensive_strategy(input_data))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.info("🔗 Devam eden strateji üretimine bağlanıldı: %s", product_id)
+        
+        # Bir bekleyenin iptali ortak üretimi iptal etmesin
+        return await asyncio.shield(task)
+    
+    async def _build_comprehensive_strategy(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Kapsamlı strateji hattını çalıştır"""
         product_id = input_data.get("product_id")
         user_id = input_data.get("user_id")
         strategy_requirements = input_data.get("requirements", {})
         
-        if not product_id:
-            raise ValueError("Product ID gerekli")
+        # Ürün bilgilerini al (kısa süreli önbellekten ya da veritabanından)
+        product = await self._get_product(product_id)
+        if not product:
+            raise ValueError(f"Ürün bulunamadı: {product_id}")
         
-        # Database session
-        db: Session = next(get_db())
+        # Benzer bir istek için üretilmiş strateji varsa tüm AI hattını atla
+        cache_vector = None
+        if self.rag_engine.embeddings or self.rag_engine.fallback_model:
+            cache_text = f"{product.name} {product.category} {_canonical_json(strategy_requirements).decode()}"
+            cache_vector = ProximityCache.normalize(await self.rag_engine.embed_cached(cache_text))
+            cached = self.strategy_cache.lookup(user_id, cache_vector)
+            logger.info("🧠 Strateji önbelleği %s (hit=%s, miss=%s)", "hit" if cached else "miss",
+                        self.strategy_cache.hits, self.strategy_cache.misses)
+            if cached is not None:
+                return {
+                    **cached,
+                    "strategy_id": self._new_strategy_id(product_id),
+                    "product_id": product_id,
+                    "generated_at": time_cache.now_iso()
+                }
         
-        try:
-            # Ürün bilgilerini al
-            product = db.query(Product).filter(Product.id == product_id).first()
-            if not product:
-                raise ValueError(f"Ürün bulunamadı: {product_id}")
-            
-            # RAG ile benzer stratejileri ara
-            similar_strategies = await self.rag_engine.search_similar_strategies(
+        # RAG araması ile AI analizleri birbirinden bağımsız; birlikte çalıştır.
+        # Pazar, hedef kitle, fiyat ve mesajlaşma analizleri ile nihai strateji tek çağrıda
+        similar_strategies, comprehensive_strategy = await asyncio.gather(
+            self.rag_engine.search_similar_strategies(
                 query=f"{product.name} {product.category} satış stratejisi",
                 user_id=user_id,
                 top_k=3,
                 min_score=0.6
-            )
-            
-            # Context bilgilerini topla
-            context_data = {
-                "product": {
-                    "name": product.name,
-                    "description": product.description,
-                    "category": product.category,
-                    "cost_price": float(product.cost_price),
-                    "target_profit_margin": float(product.target_profit_margin or 0.2)
-                },
-                "similar_strategies": similar_strategies,
-                "requirements": strategy_requirements
-            }
-            
-            # MCP ile context paylaş
-            await self.network.network.context_store.share_context(
-                sender_id=self.agent_id,
-                context_key=f"strategy_context_{product_id}",
-                context_data=context_data,
-                ttl_minutes=60
-            )
-            
-            # Paralel AI analizi başlat
-            market_task = asyncio.create_task(
-                self.market_analyzer.analyze_market(product.name, product.category)
-            )
-            
-            customer_task = asyncio.create_task(
-                self.customer_segmenter.segment_customers(product.name, product.category)
-            )
-            
-            pricing_task = asyncio.create_task(
-                self.pricing_advisor.suggest_pricing(
-                    product.name, 
-                    product.category, 
-                    float(product.cost_price),
-                    float(product.target_profit_margin or 0.2)
-                )
-            )
-            
-            messaging_task = asyncio.create_task(
-                self.messaging_generator.generate_messaging(product.name, product.category)
-            )
-            
-            # Tüm analizleri bekle
-            market_analysis, customer_segments, pricing_recommendations, messaging_content = await asyncio.gather(
-                market_task, customer_task, pricing_task, messaging_task
-            )
-            
-            # Ana strateji oluştur
-            strategy_data = {
+            ),
+            self._guarded(self.strategy_builder.build_comprehensive_strategy(product))
+        )
+        market_analysis = comprehensive_strategy.market_analysis
+        customer_segments = comprehensive_strategy.audience_analysis
+        pricing_recommendations = comprehensive_strategy.pricing_analysis
+        messaging_content = comprehensive_strategy.messaging_analysis
+        
+        # Context bilgilerini topla
+        context_data = {
+            "product": {
+                "name": product.name,
+                "description": product.description,
+                "category": product.category,
+                "cost_price": float(product.cost_price),
+                "target_profit_margin": float(product.target_profit_margin or 0.2)
+            },
+            "similar_strategies": similar_strategies,
+            "requirements": strategy_requirements
+        }
+        
+        # MCP ile context paylaş (sonucu beklenmez, hata olursa loglanır)
+        share_task = asyncio.create_task(mcp_service.context_store.share_context(
+            sender_id=self.agent_id,
+            context_key=f"strategy_context_{product_id}",
+            context_data=context_data,
+            ttl_minutes=60
+        ))
+        self._background_tasks.add(share_task)
+        share_task.add_done_callback(self._on_context_shared)
+        
+        # Sonucu hazırla
+        result = {
+            "strategy_id": self._new_strategy_id(product_id),
+            "product_id": product_id,
+            "comprehensive_strategy": comprehensive_strategy,
+            "analysis_components": {
                 "market_analysis": market_analysis,
                 "customer_segments": customer_segments,
                 "pricing_recommendations": pricing_recommendations,
-                "messaging_content": messaging_content,
-                "similar_strategies_count": len(similar_strategies)
-            }
-            
-            comprehensive_strategy = await self.strategy_builder.build_strategy(
-                product_name=product.name,
-                product_category=product.category,
-                analysis_data=strategy_data
+                "messaging_content": messaging_content
+            },
+            "similar_strategies_used": len(similar_strategies),
+            "confidence_score": comprehensive_strategy.confidence_score,
+            "expected_roi": comprehensive_strategy.expected_roi,
+            "implementation_difficulty": comprehensive_strategy.implementation_difficulty,
+            "generated_at": time_cache.now_iso(),
+            "agent_id": self.agent_id
+        }
+        
+        if cache_vector is not None:
+            self.strategy_cache.store(user_id, cache_vector, result)
+        
+        return result
+    
+    async def _stream_comprehensive_strategy(self, input_data: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+        """Strateji hattını çalıştır; her analiz aşaması bittikçe (aşama, sonuç) üret"""
+        product_id = input_data.get("product_id")
+        if not product_id:
+            raise ValueError("Product ID gerekli")
+        
+        product = await self._get_product(product_id)
+        if not product:
+            raise ValueError(f"Ürün bulunamadı: {product_id}")
+        
+        async with self._llm_sem:
+            # Tüketici akışı erken bırakırsa üretecin finally bloğu hemen çalışsın
+            async with contextlib.aclosing(self.strategy_builder.stream_comprehensive_strategy(product)) as stages:
+                async for stage, data in stages:
+                    yield stage, data
+    
+    async def _stream_strategy_task(self, task: A2ATask) -> Dict[str, Any]:
+        """Ara sonuçları talep edene MCP ile gönderen strateji görevi"""
+        product_id = task.input_data.get("product_id")
+        comprehensive_strategy: Optional[StrategyResult] = None
+        stages_streamed = 0
+        
+        async with contextlib.aclosing(self._stream_comprehensive_strategy(task.input_data)) as stages:
+            async for stage, data in stages:
+                if stage == "comprehensive_strategy":
+                    comprehensive_strategy = data
+                    break
+                if stage == "strategy_chunk":
+                    # Metin parçaları mesaj olarak gönderilmez; tam metin nihai sonuçta yer alır
+                    continue
+                stages_streamed += 1
+                await mcp_service.context_store.send_message(MCPMessage(
+                    id=uuid.uuid4().hex,
+                    type=MCPMessageType.TASK_RESULT,
+                    sender_id=self.agent_id,
+                    receiver_id=task.requester_id,
+                    payload={
+                        "task_id": task.task_id,
+                        "partial": True,
+                        "stage": stage,
+                        "data": data
+                    },
+                    timestamp=datetime.now()
+                ))
+        
+        return {
+            "strategy_id": self._new_strategy_id(product_id),
+            "product_id": product_id,
+            "comprehensive_strategy": comprehensive_strategy,
+            "stages_streamed": stages_streamed,
+            "generated_at": time_cache.now_iso(),
+            "agent_id": self.agent_id
+        }
+    
+    def _new_strategy_id(self, product_id: int) -> str:
+        """Çakışmayan strateji ID'si üret (ms zaman damgası + sayaç)"""
+        return f"strategy_{product_id}_{time.time_ns() // 1_000_000:x}_{next(self._id_counter)}"
+    
+    def _on_context_shared(self, task: asyncio.Task):
+        """Arka planda yapılan context paylaşımının sonucunu işle"""
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("⚠️ Strateji context paylaşımı başarısız: %s", task.exception())
+    
+    async def _get_product(self, product_id: int) -> Optional[ProductSnapshot]:
+        """Ürünü önbellekten al; yoksa veritabanından event loop'u bloklamadan yükle"""
+        product = self._product_cache.get(product_id)
+        if product is None:
+            product = await asyncio.to_thread(self._load_product, product_id)
+            if product is not None:
+                self._product_cache[product_id] = product
+        return product
+    
+    @staticmethod
+    def _load_product(product_id: int) -> Optional[ProductSnapshot]:
+        """Ürünü veritabanından oku (senkron, thread içinde çalışır)"""
+        db: Session = next(get_db())
+        try:
+            # Yalnızca kullanılan kolonları seç (ORM nesnesi oluşturulmaz)
+            row = db.query(
+                Product.name,
+                Product.description,
+                Product.category,
+                Product.cost_price,
+                Product.target_profit_margin
+            ).filter(Product.id == product_id).first()
+            if row is None:
+                return None
+            name, description, category, cost_price, target_profit_margin = row
+            return ProductSnapshot(
+                id=product_id,
+                name=name,
+                description=description,
+                category=category,
+                cost_price=cost_price,
+                target_profit_margin=target_profit_margin
             )
-            
-            # Sonucu hazırla
-            result = {
-                "strategy_id": f"strategy_{product_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                "product_id": product_id,
-                "comprehensive_strategy": comprehensive_strategy,
-                "analysis_components": {
-                    "market_analysis": market_analysis,
-                    "customer_segments": customer_segments,
-                    "pricing_recommendations": pricing_recommendations,
-                    "messaging_content": messaging_content
-                },
-                "similar_strategies_used": len(similar_strategies),
-                "confidence_score": comprehensive_strategy.get("confidence_score", 0.8),
-                "expected_roi": comprehensive_strategy.get("expected_roi", 0.15),
-                "implementation_difficulty": comprehensive_strategy.get("implementation_difficulty", "medium"),
-                "generated_at": datetime.now().isoformat(),
-                "agent_id": self.agent_id
-            }
-            
-            return result
-            
         finally:
             db.close()
     
     async def _perform_market_analysis(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Pazar analizi yap"""
-        product_name = input_data.get("product_name")
-        product_category = input_data.get("product_category")
-        
-        if not product_name or not product_category:
-            raise ValueError("Product name ve category gerekli")
+        request = ProductInput.from_input(input_data)
         
-        # Detaylı pazar analizi
-        market_analysis = await self.market_analyzer.analyze_market(product_name, product_category)
+        # Detaylı pazar analizi (aynı ad ve kategorideki ürünler paylaşır)
+        market_analysis = await self._cached_market(request.product_name, request.product_category)
         
         return {
             "analysis_type": "market_analysis",
-            "product_name": product_name,
-            "product_category": product_category,
+            "product_name": request.product_name,
+            "product_category": request.product_category,
             "market_analysis": market_analysis,
-            "analyzed_at": datetime.now().isoformat(),
+            "analyzed_at": time_cache.now_iso(),
             "agent_id": self.agent_id
         }
     
+    async def _cached_market(self, product_name: str, product_category: str) -> Dict[str, Any]:
+        """(ürün adı, kategori) düzeyinde önbelleklenmiş pazar analizi"""
+        # Trends, rakipler ve Gemini istemi ürün adına bağlı; yalnızca kategoriyle anahtarlanamaz
+        cache_key = (product_name, product_category)
+        market_analysis = self._market_cache.get(cache_key)
+        if market_analysis is None:
+            # Görev girdisinde yalnızca ad ve kategori var; analiz bu iki alandan üretilir
+            product = ProductSnapshot(
+                id=0,
+                name=product_name,
+                description="",
+                category=product_category,
+                cost_price=0.0,
+                target_profit_margin=None
+            )
+            market_analysis = await self._guarded(self.market_analyzer.analyze_market(product))
+            self._market_cache[cache_key] = market_analysis
+        else:
+            logger.info("📦 Pazar analizi önbellekten: %s / %s", product_name, product_category)
+        return market_analysis
+    
+    async def _task_product(self, input_data: Dict[str, Any], pricing: bool = False) -> ProductSnapshot:
+        """Görevin ürünü: product_id varsa kayıttan, yoksa girdideki ad/kategori (ve maliyet) alanlarından"""
+        product_id = input_data.get("product_id")
+        if product_id:
+            product = await self._get_product(product_id)
+            if not product:
+                raise ValueError(f"Ürün bulunamadı: {product_id}")
+            return product
+        if pricing:
+            request = PricingInput.from_input(input_data)
+            return ProductSnapshot(
+                id=0,
+                name=request.product_name,
+                description="",
+                category=request.product_category,
+                cost_price=request.cost_price,
+                target_profit_margin=request.target_margin
+            )
+        request = ProductInput.from_input(input_data)
+        return ProductSnapshot(
+            id=0,
+            name=request.product_name,
+            description="",
+            category=request.product_category,
+            cost_price=0.0,
+            target_profit_margin=None
+        )
+    
     async def _segment_customers(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Müşteri segmentasyonu yap"""
-        product_name = input_data.get("product_name")
-        product_category = input_data.get("product_category")
+        product = await self._task_product(input_data)
+        market_data = input_data.get("market_data") or dict(_BASIC_MARKET_DATA)
         
-        if not product_name or not product_category:
-            raise ValueError("Product name ve category gerekli")
-        
-        # Müşteri segmentasyonu
-        customer_segments = await self.customer_segmenter.segment_customers(product_name, product_category)
+        # Müşteri segmentasyonu (hedef kitle analizi)
+        customer_segments = await self._guarded(
+            self.customer_segmenter.analyze_target_audience(product, market_data)
+        )
         
         return {
             "analysis_type": "customer_segmentation",
-            "product_name": product_name,
-            "product_category": product_category,
+            "product_name": product.name,
+            "product_category": product.category,
             "customer_segments": customer_segments,
-            "analyzed_at": datetime.now().isoformat(),
+            "analyzed_at": time_cache.now_iso(),
             "agent_id": self.agent_id
         }
     
     async def _optimize_pricing(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Fiyat optimizasyonu yap"""
-        product_name = input_data.get("product_name")
-        product_category = input_data.get("product_category")
-        cost_price = input_data.get("cost_price")
-        target_margin = input_data.get("target_margin", 0.2)
-        
-        if not all([product_name, product_category, cost_price]):
-            raise ValueError("Product name, category ve cost_price gerekli")
+        product = await self._task_product(input_data, pricing=True)
+        market_data = input_data.get("market_data") or dict(_BASIC_MARKET_DATA)
+        audience_data = input_data.get("audience_data") or dict(_BASIC_AUDIENCE_DATA)
         
         # Fiyat optimizasyonu
-        pricing_recommendations = await self.pricing_advisor.suggest_pricing(
-            product_name, product_category, cost_price, target_margin
+        pricing_recommendations = await self._guarded(
+            self.pricing_advisor.analyze_pricing(product, market_data, audience_data)
         )
         
         return {
             "analysis_type": "price_optimization",
-            "product_name": product_name,
-            "product_category": product_category,
-            "cost_price": cost_price,
-            "target_margin": target_margin,
+            "product_name": product.name,
+            "product_category": product.category,
+            "cost_price": product.cost_price,
+            "target_margin": product.target_profit_margin,
             "pricing_recommendations": pricing_recommendations,
-            "analyzed_at": datetime.now().isoformat(),
+            "analyzed_at": time_cache.now_iso(),
             "agent_id": self.agent_id
         }
     
@@ -252,7 +565,7 @@ class StrategyAgent(A2AAgent):
             "status": "completed",
             "message": "Strategy Agent tarafından işlendi",
             "input_data": input_data,
-            "processed_at": datetime.now().isoformat(),
+            "processed_at": time_cache.now_iso(),
             "agent_id": self.agent_id
         }
     
@@ -283,7 +596,7 @@ class StrategyAgent(A2AAgent):
             "agent_id": self.agent_id,
             "agent_type": self.agent_type,
             "status": self.status,
-            "capabilities": self.capabilities,
+            "capabilities": self.CAPABILITIES,
             "current_tasks": len(self.current_tasks),
             "max_concurrent_tasks": self.max_concurrent_tasks,
             "active_tasks": list(self.current_tasks)
@@ -4,44 +4,415 @@ Google Gemini API ve diğer veri kaynaklarını kullanarak gerçek analiz yapan
 """
 
 import asyncio
-import json
-from typing import Dict, List, Any, Optional
+import bisect
+import functools
+from dataclasses import asdict, dataclass, field
+import hashlib
+import logging
+import string
+import time
+from types import MappingProxyType
+from collections import Counter
+from contextvars import ContextVar
+from random import uniform as _uniform
+from typing import AsyncIterator, Callable, Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
+import orjson
+from cachetools import TTLCache
 
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from pytrends.request import TrendReq
-import requests
-from bs4 import BeautifulSoup
 
 from app.core.config import settings
+from app.core.database import async_redis_client
 from app.models.product import Product
-from app.services.rag_engine import RAGEmbeddingEngine
+from app.services.rag_engine import get_rag_engine
+from app.services.serp_service import serp_service
+from app.services.exchange_service import exchange_service
+
+logger = logging.getLogger(__name__)
+
+
+GEMINI_MODEL_NAME = 'gemini-1.5-flash'
+
+# Gemini istemlerinin sabit talimat kısımları (istemler bayt bayt aynı kalır, önbellek isabeti korunur)
+_MARKET_PROMPT_TAIL = """
+        
+        Bu ürün için Türkiye pazarında detaylı pazar analizi yap. Şu konulara odaklan:
+        1. Pazar fırsatları ve tehditler
+        2. Hedef müşteri profili
+        3. Pazara giriş stratejisi
+        4. Rekabet avantajları
+        5. Büyüme potansiyeli
+        
+        Analizi Türkçe olarak, somut ve eyleme dönük önerilerle sun.
+        """
+_AUDIENCE_PROMPT_TAIL = """
+        
+        Bu ürün için Türkiye'de detaylı hedef kitle analizi yap:
+        1. Ana hedef kitle demografik profili (yaş, cinsiyet, gelir, eğitim)
+        2. Satın alma motivasyonları ve ihtiyaçları
+        3. Dijital davranış kalıpları (hangi platformları kullanıyor)
+        4. Fiyat hassasiyeti ve satın alma gücü
+        5. İletişim tercih ettikleri dil ve ton
+        
+        Analizi Türkçe, somut ve pazarlama stratejisine yönelik sun.
+        """
+_PRICING_PROMPT_TAIL = """
+        
+        Bu ürün için kapsamlı fiyatlandırma stratejisi geliştir:
+        1. Fiyat pozisyonlama stratejisi
+        2. Pazar giriş fiyatı önerisi
+        3. Fiyat artış/azalış senaryoları
+        4. Rakiplere karşı avantajlar
+        5. Müşteri değer algısını artırma yöntemleri
+        
+        Stratejiyi Türkçe, uygulanabilir ve somut önerilerle sun.
+        """
+
+# Toplu (çok bölümlü) istemlerde JSON çıktı iste
+_JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+# Gemini yanıt önbelleği isabet/ıska sayaçları
+gemini_cache_stats: Counter = Counter()
+
+# Redis'in önünde süreç içi yanıt önbelleği (sık tekrarlanan istemler ağa hiç çıkmaz)
+_gemini_local_cache: TTLCache = TTLCache(maxsize=1024, ttl=settings.GEMINI_CACHE_TTL)
+
+# Eşzamanlı Gemini çağrılarını sınırla (thread havuzunun tükenmesini önler)
+_GEMINI_SEM = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENCY or 8)
+
+# Yeniden denenebilecek Gemini hataları (kota aşımı ve geçici sunucu hataları)
+_RETRYABLE_GEMINI_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded
+)
+
+
+class _TokenBucket:
+    """Dakikalık istek kotasını aşmamak için token bucket hız sınırlayıcı"""
+    
+    def __init__(self, rate_per_minute: int):
+        self.capacity = max(1, rate_per_minute)
+        self.refill_per_second = self.capacity / 60.0
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Bir token al; yoksa yenilenene kadar bekle"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.refill_per_second)
+
+
+# Tüm servisler aynı Gemini kotasını paylaşır
+_gemini_rate_limiter = _TokenBucket(settings.GEMINI_RATE_LIMIT_PER_MINUTE)
+_GEMINI_TIMEOUT_MESSAGE = "AI analizi zaman aşımına uğradı, lütfen daha sonra tekrar deneyin"
+
+
+class _GeminiErrorText(str):
+    """Gemini yanıtı yerine üretilen hata/zaman aşımı metni (akıştaki parçalardan ayırt etmek için)"""
+
+
+@dataclass(frozen=True, slots=True)
+class ProductContext:
+    """Gemini istemlerinde ortak kullanılan, önceden biçimlendirilmiş ürün bilgisi"""
+    name: str
+    category: str
+    description: str
+    cost_price_str: str
+    # Tüm istemlerin başına aynen eklenen ürün bloğu (ortak önek)
+    product_block: str
+    
+    @classmethod
+    def of(cls, product: Product) -> 'ProductContext':
+        """Ürünün bağlamını döndür (aynı ürün bilgisi için bir kez oluşturulur)"""
+        return _product_context(product.name, product.category, product.description, product.cost_price)
+
+
+@functools.lru_cache(maxsize=256)
+def _product_context(name: str, category: str, description: str, cost_price: float) -> ProductContext:
+    """Ürün alanlarından ProductContext oluştur"""
+    cost_price_str = f"{cost_price} TL"
+    product_block = f"""
+        Ürün: {name}
+        Kategori: {category}
+        Açıklama: {description}
+        Maliyet: {cost_price_str}"""
+    return ProductContext(name, category, description, cost_price_str, product_block)
+
+
+# Bir strateji üretimi boyunca tüm analizlerin paylaştığı zaman damgası
+_strategy_timestamp: ContextVar[Optional[str]] = ContextVar("strategy_timestamp", default=None)
+
+
+def _now_iso() -> str:
+    """Sürmekte olan stratejinin zaman damgası; strateji dışında anlık zaman"""
+    return _strategy_timestamp.get() or datetime.now().isoformat()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_gemini_model() -> Optional[genai.GenerativeModel]:
+    """Süreç genelinde tek Gemini modeli (SDK istemcisi ve bağlantıları tüm servislerce paylaşılır)"""
+    if not settings.GEMINI_API_KEY:
+        return None
+    genai.configure(api_key=settings.GEMINI_API_KEY)
+    return genai.GenerativeModel(GEMINI_MODEL_NAME)  # Yeni model adı
 
 
 class AIServiceBase:
     """AI servislerinin temel sınıfı"""
     
     def __init__(self):
-        # Gemini API'yi yapılandır
-        if settings.GEMINI_API_KEY:
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')  # Yeni model adı
-        else:
-            self.model = None
+        # Gemini API'yi yapılandır (yapılandırma ve model bir kez oluşturulur)
+        self.model = _get_gemini_model()
+    
+    @staticmethod
+    def _gemini_cache_key(prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
+        """(model, üretim ayarları, prompt) üçlüsünün önbellek anahtarı"""
+        # Yalnızca boşlukları farklı olan istemler aynı anahtara düşer
+        normalized = " ".join(prompt.split())
+        config = orjson.dumps(generation_config, option=orjson.OPT_SORT_KEYS).decode() if generation_config else ""
+        digest = hashlib.blake2b(f"{GEMINI_MODEL_NAME}\n{config}\n{normalized}".encode(), digest_size=16).hexdigest()
+        return f"gemini:{digest}"
+    
+    async def _call_gemini(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
+        """Gemini API'ye güvenli çağrı (tam metni döndürür)"""
+        chunks: List[str] = []
+        async for chunk in self._call_gemini_stream(prompt, generation_config):
+            if isinstance(chunk, _GeminiErrorText):
+                # Yarım kalan yanıt tam yanıt gibi döndürülmez; çağıran hata metniyle yedeğe düşer
+                return chunk
+            chunks.append(chunk)
+        return "".join(chunks)
     
-    async def _call_gemini(self, prompt: str) -> str:
-        """Gemini API'ye güvenli çağrı"""
+    async def _call_gemini_json(self, prompt_dict: Dict[str, str]) -> Dict[str, str]:
+        """Birden çok istemi tek Gemini isteğinde yanıtla; her anahtarın metin yanıtını döndür"""
         if not self.model:
-            return "Gemini API anahtarı yapılandırılmamış"
+            return {key: "Gemini API anahtarı yapılandırılmamış" for key in prompt_dict}
+        
+        sections = "".join(f"### {key}\n{prompt}\n\n" for key, prompt in prompt_dict.items())
+        prompt = (
+            f"Aşağıda başlıklarıyla verilen {len(prompt_dict)} ayrı görevi yanıtla. "
+            f"Yanıtı yalnızca şu anahtarlara sahip bir JSON nesnesi olarak döndür: {', '.join(prompt_dict)}. "
+            "Her anahtarın değeri ilgili görevin metin yanıtı olsun.\n\n" + sections
+        )
+        
+        text = await self._call_gemini(prompt, generation_config=_JSON_GENERATION_CONFIG)
+        if isinstance(text, _GeminiErrorText):
+            # Sağlayıcı hatası/zaman aşımında istemleri ayrı ayrı tekrar göndermek yükü katlar
+            return {key: text for key in prompt_dict}
+        try:
+            answers = orjson.loads(text)
+            if isinstance(answers, dict) and all(isinstance(answers.get(key), str) for key in prompt_dict):
+                return {key: answers[key] for key in prompt_dict}
+        except orjson.JSONDecodeError:
+            pass
+        
+        # Geçerli JSON gelmezse istemleri ayrı ayrı (paralel) gönder
+        logger.warning("⚠️ Toplu Gemini yanıtı ayrıştırılamadı, istemler ayrı gönderiliyor")
+        results = await asyncio.gather(*(self._call_gemini(prompt) for prompt in prompt_dict.values()))
+        return dict(zip(prompt_dict, results))
+    
+    async def _call_gemini_stream(self, prompt: str,
+                                  generation_config: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Gemini yanıtını geldikçe parça parça üret (yanıtlar Redis'te önbelleklenir)"""
+        if not self.model:
+            yield _GeminiErrorText("Gemini API anahtarı yapılandırılmamış")
+            return
+        
+        cache_key = self._gemini_cache_key(prompt, generation_config)
+        cached = _gemini_local_cache.get(cache_key)
+        if cached is None:
+            try:
+                cached = await async_redis_client.get(cache_key)
+            except Exception as e:
+                logger.warning("⚠️ Gemini önbelleği okunamadı: %s", e)
+            if cached is not None:
+                _gemini_local_cache[cache_key] = cached
+        
+        if cached is not None:
+            gemini_cache_stats["hit"] += 1
+            yield cached
+            return
+        gemini_cache_stats["miss"] += 1
+        
+        chunks: List[str] = []
+        loop = asyncio.get_running_loop()
+        try:
+            async with _GEMINI_SEM:
+                # Kota/geçici hatalarda yalnızca ilk parça gelmeden önce yeniden dene (üstel bekleme)
+                attempts = max(1, settings.GEMINI_MAX_RETRIES)
+                for attempt in range(attempts):
+                    await _gemini_rate_limiter.acquire()
+                    # Süre sınırı yalnızca çağrının kendisini kapsar (semafor ve kota beklemesi hariç)
+                    deadline = loop.time() + (settings.GEMINI_TIMEOUT or 20.0)
+                    try:
+                        response = await asyncio.wait_for(
+                            asyncio.to_thread(
+                                self.model.generate_content, prompt, stream=True, generation_config=generation_config
+                            ),
+                            timeout=max(0.0, deadline - loop.time())
+                        )
+                        chunk_iterator = iter(response)
+                        chunk = await asyncio.wait_for(
+                            asyncio.to_thread(next, chunk_iterator, None),
+                            timeout=max(0.0, deadline - loop.time())
+                        )
+                        break
+                    except _RETRYABLE_GEMINI_ERRORS as e:
+                        if attempt + 1 >= attempts:
+                            raise
+                        delay = min(4.0, 0.5 * 2 ** attempt) * _uniform(0.5, 1.0)
+                        logger.warning("⚠️ Gemini geçici hatası (%s), %.1f sn sonra yeniden denenecek", e, delay)
+                        await asyncio.sleep(delay)
+                
+                while chunk is not None:
+                    chunks.append(chunk.text)
+                    yield chunk.text
+                    # SDK üreteci bloklayıcı; her parçayı thread'de bekle (toplam süre sınırı içinde)
+                    chunk = await asyncio.wait_for(
+                        asyncio.to_thread(next, chunk_iterator, None),
+                        timeout=max(0.0, deadline - loop.time())
+                    )
+        except asyncio.TimeoutError:
+            logger.warning("⏱️ Gemini çağrısı %s sn içinde tamamlanmadı", settings.GEMINI_TIMEOUT)
+            # Parçalar gelmeye başladıysa da yanıt eksiktir; çağıranlar yedeğe düşebilsin
+            yield _GeminiErrorText(_GEMINI_TIMEOUT_MESSAGE)
+            return
+        except Exception as e:
+            logger.error("Gemini API hatası: %s", e)
+            yield _GeminiErrorText(f"AI analizi sırasında hata oluştu: {str(e)}")
+            return
         
+        text = "".join(chunks)
+        _gemini_local_cache[cache_key] = text
         try:
-            response = await asyncio.to_thread(self.model.generate_content, prompt)
-            return response.text
+            await async_redis_client.set(cache_key, text, ex=settings.GEMINI_CACHE_TTL)
         except Exception as e:
-            print(f"Gemini API hatası: {e}")
-            return f"AI analizi sırasında hata oluştu: {str(e)}"
+            logger.warning("⚠️ Gemini önbelleğine yazılamadı: %s", e)
+        
+        total = gemini_cache_stats["hit"] + gemini_cache_stats["miss"]
+        logger.info("🧠 Gemini önbellek isabet oranı: %.0f%% (%d çağrı)", 100 * gemini_cache_stats["hit"] / total, total)
+
+
+def _cache_default(obj: Any) -> Any:
+    """orjson'un doğrudan serileştiremediği pandas nesnelerini dönüştür"""
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(orient="records")
+    if isinstance(obj, pd.Series):
+        return obj.to_dict()
+    return str(obj)
+
+
+_CACHE_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def redis_cached(prefix: str, ttl: int, key: Callable[..., str],
+                 cache_if: Callable[[Any], bool] = lambda result: True,
+                 model: Optional[type] = None):
+    """Harici veri kaynağı sonuçlarını Redis'te önbellekle (TTL'e ±%10 sapma eklenir)"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            cache_key = f"{prefix}:{key(self, *args, **kwargs)}"
+            try:
+                cached = await async_redis_client.get(cache_key)
+                if cached is not None:
+                    data = orjson.loads(cached)
+                    return model(**data) if model is not None else data
+            except Exception as e:
+                logger.warning("⚠️ %s önbelleği okunamadı: %s", prefix, e)
+            
+            result = await func(self, *args, **kwargs)
+            
+            if cache_if(result):
+                try:
+                    # Aynı anda dolan anahtarların birlikte yenilenmesini önlemek için TTL'i dağıt
+                    expires_in = int(ttl * _uniform(0.9, 1.1))
+                    payload = orjson.dumps(result, default=_cache_default, option=_CACHE_JSON_OPTIONS)
+                    await async_redis_client.set(cache_key, payload, ex=expires_in)
+                except Exception as e:
+                    logger.warning("⚠️ %s önbelleğine yazılamadı: %s", prefix, e)
+            return result
+        return wrapper
+    return decorator
+
+
+def _is_live_data(result: Dict[str, Any]) -> bool:
+    """Fallback verileri önbelleğe yazılmaz"""
+    return result.get("data_source") != "Fallback"
+
+
+@dataclass(slots=True, frozen=True)
+class TrendData:
+    """Google Trends özet verisi"""
+    trend_score: float = 0.5
+    demand_score: float = 0.6
+    seasonal_data: Dict[str, Any] = field(default_factory=dict)
+    # None ise veri canlı değil (fallback) ve önbelleğe yazılmaz
+    regional_interest: Optional[Dict[str, Any]] = None
+    related_queries: Optional[Dict[str, Any]] = None
+
+
+@dataclass(slots=True, frozen=True)
+class CompetitionData:
+    """Rekabet analizi verisi"""
+    competition_level: str
+    competition_score: float
+    estimated_competitors: int
+    price_range: Dict[str, Any]
+    top_sellers: List[Any]
+    popular_features: List[Any]
+    data_source: str
+    analysis_timestamp: str
+    note: Optional[str] = None
+
+
+# Skor sınıflandırma eşikleri (artan sırada) ve etiketleri
+_LEVEL_LABELS = ("Düşük", "Orta", "Yüksek")
+_MARKET_SIZE_BINS = (0.4, 0.7)
+_MARKET_SIZE_LABELS = ("Küçük", "Orta", "Büyük")
+_GROWTH_POTENTIAL_BINS = (0.3, 0.6)
+_COMPETITION_LEVEL_BINS = (0.4, 0.7)
+
+
+def _classify_above(score: float, bins: Tuple[float, ...], labels: Tuple[str, ...]) -> str:
+    """Skoru, aştığı (eşit olmak yetmez) eşik sayısına göre etiketle"""
+    return labels[bisect.bisect_left(bins, score)]
+
+
+def _classify_batch(scores: np.ndarray, bins: Tuple[float, ...], labels: Tuple[str, ...],
+                    strictly_above: bool = True) -> np.ndarray:
+    """Skor dizisini tek np.digitize çağrısıyla etiketle (_classify_above'un toplu karşılığı)"""
+    # right=True: eşiğe eşit skor alt sınıfta kalır (bisect_left); False: üst sınıfa geçer (bisect_right)
+    indices = np.digitize(np.asarray(scores, dtype=np.float64), bins, right=strictly_above)
+    return np.asarray(labels)[indices]
+
+
+# Süreç genelinde tek TrendReq (Google çerezi ve yeniden deneme ayarları bir kez kurulur)
+_PYTRENDS_SINGLETON: Optional[TrendReq] = None
+_PYTRENDS_LOCK = asyncio.Lock()
+
+
+def _get_pytrends() -> TrendReq:
+    """Paylaşılan TrendReq örneğini döndür (ilk çağrıda oluşturulur)"""
+    global _PYTRENDS_SINGLETON
+    if _PYTRENDS_SINGLETON is None:
+        _PYTRENDS_SINGLETON = TrendReq(hl='tr-TR', tz=180, retries=2, backoff_factor=0.5)
+    return _PYTRENDS_SINGLETON
 
 
 class MarketAnalyzer(AIServiceBase):
@@ -50,223 +421,233 @@ class MarketAnalyzer(AIServiceBase):
     def __init__(self):
         super().__init__()
         
-        # TrendReq başlat (proxy olmadan)
-        self.pytrends = TrendReq(hl='tr-TR', tz=180)
+        # Paylaşılan TrendReq (proxy olmadan)
+        self.pytrends = _get_pytrends()
+        # TrendReq payload durumunu tutar: build_payload ve ona bağlı sorgular birlikte kilitlenir
+        self._pytrends_lock = _PYTRENDS_LOCK
         
-        # SerpAPI servisini başlat
-        from app.services.serp_service import SerpApiService
-        self.serp_service = SerpApiService()
+        # Paylaşılan SerpAPI servisini kullan
+        self.serp_service = serp_service
     
 
     
     async def analyze_market(self, product: Product) -> Dict[str, Any]:
         """Kapsamlı pazar analizi"""
+        market_data, prompt = await self.prepare_market_analysis(product)
+        if prompt is not None:
+            market_data["market_insights"] = await self._call_gemini(prompt)
+        return market_data
+    
+    async def prepare_market_analysis(self, product: Product) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Pazar verilerini topla; Gemini içgörüsü boş bırakılır ve istemi ayrıca döndürülür"""
         try:
-            # Google Trends analizi
-            trend_data = await self._get_trend_data(product.name, product.category)
-            
-            # Rekabet analizi (SerpAPI ile)
-            competition_data = await self._analyze_competition(product.name, product.category)
+            # Google Trends ve rekabet analizi (SerpAPI) birbirinden bağımsız; birlikte çalıştır
+            trend_data, competition_data = await asyncio.gather(
+                self._get_trend_data(product.name, product.category),
+                self._analyze_competition(product.name, product.category),
+                return_exceptions=True
+            )
+            if isinstance(trend_data, Exception):
+                logger.warning("⚠️ Trends veri alma hatası: %s", trend_data)
+                trend_data = TrendData()
+            if isinstance(competition_data, Exception):
+                logger.error("❌ Rekabet analizi hatası: %s", competition_data)
+                competition_data = self._get_fallback_competition_data(product.name)
             
             # Pazar büyüklüğü tahmini
-            market_size = await self._estimate_market_size(product, trend_data)
+            market_size = self._estimate_market_size(product, trend_data)
             
-            # Gemini ile pazar analizi
-            market_analysis = await self._generate_market_insights(product, trend_data, competition_data)
+            # Gemini pazar analizi istemi (çağrıyı yapan taraf gönderir)
+            prompt = self._market_insights_prompt(product, trend_data, competition_data)
             
             return {
                 "market_size": market_size,
-                "trend_score": trend_data.get("trend_score", 0.5),
-                "competition_level": competition_data.get("competition_level", "Orta"),
-                "demand_score": trend_data.get("demand_score", 0.6),
-                "seasonal_trends": trend_data.get("seasonal_data", {}),
-                "market_insights": market_analysis,
+                "trend_score": trend_data.trend_score,
+                "competition_level": competition_data.competition_level,
+                "demand_score": trend_data.demand_score,
+                "seasonal_trends": trend_data.seasonal_data,
+                "market_insights": None,
                 "growth_potential": self._calculate_growth_potential(trend_data, competition_data),
                 "entry_timing": self._suggest_entry_timing(trend_data),
-                "competitor_analysis": competition_data,
-                "analysis_timestamp": datetime.now().isoformat()
-            }
+                "competitor_analysis": asdict(competition_data),
+                "analysis_timestamp": _now_iso()
+            }, prompt
             
         except Exception as e:
-            print(f"❌ Pazar analizi genel hatası: {e}")
-            return self._get_fallback_market_data(product)
+            logger.error("❌ Pazar analizi genel hatası: %s", e)
+            return self._get_fallback_market_data(product), None
     
-    async def _get_trend_data(self, product_name: str, category: str) -> Dict[str, Any]:
+    @redis_cached(prefix="trends", ttl=24 * 60 * 60, key=lambda self, name, category: f"{name}|{category}",
+                  cache_if=lambda result: result.regional_interest is not None, model=TrendData)
+    async def _get_trend_data(self, product_name: str, category: str) -> TrendData:
         """Google Trends verilerini al"""
         try:
             # Anahtar kelimeler
             keywords = [product_name, category, f"{product_name} satış"]
             
-            # pytrends payload oluştur
-            await asyncio.to_thread(
-                self.pytrends.build_payload, 
-                keywords, 
-                cat=0, 
-                timeframe='today 12-m', 
-                geo='TR', 
-                gprop=''
-            )
-            
-            # Verileri al
-            interest_over_time = await asyncio.to_thread(self.pytrends.interest_over_time)
-            regional_interest = await asyncio.to_thread(self.pytrends.interest_by_region)
-            related_queries = await asyncio.to_thread(self.pytrends.related_queries)
+            async with self._pytrends_lock:
+                # pytrends payload oluştur
+                await asyncio.to_thread(
+                    self.pytrends.build_payload, 
+                    keywords, 
+                    cat=0, 
+                    timeframe='today 12-m', 
+                    geo='TR', 
+                    gprop=''
+                )
+                
+                # Payload hazır; üç sorgu birbirinden bağımsız, paralel al
+                interest_over_time, regional_interest, related_queries = await asyncio.gather(
+                    asyncio.to_thread(self.pytrends.interest_over_time),
+                    asyncio.to_thread(self.pytrends.interest_by_region),
+                    asyncio.to_thread(self.pytrends.related_queries)
+                )
             
             # Analiz yap
             if not interest_over_time.empty and product_name in interest_over_time.columns:
-                trend_score = interest_over_time[product_name].mean() / 100.0
+                # DataFrame'den bir kez numpy dizilerine geç; geri kalan hesaplar dizi üzerinde
+                values = interest_over_time[product_name].to_numpy(dtype=np.float64)
+                months = interest_over_time.index.month.to_numpy(dtype=np.int8)
+                trend_score = float(values.mean()) / 100.0
                 demand_score = min(1.0, trend_score * 1.2)
-                seasonal_data = self._analyze_seasonality(interest_over_time, product_name)
+                seasonal_data = self._analyze_seasonality(values, months)
             else:
                 trend_score = 0.5
                 demand_score = 0.6
                 seasonal_data = {}
             
-            return {
-                "trend_score": trend_score,
-                "demand_score": demand_score,
-                "seasonal_data": seasonal_data,
-                "regional_interest": regional_interest.to_dict() if not regional_interest.empty else {},
-                "related_queries": related_queries
-            }
+            return TrendData(
+                trend_score=trend_score,
+                demand_score=demand_score,
+                seasonal_data=seasonal_data,
+                regional_interest=regional_interest.to_dict() if not regional_interest.empty else {},
+                related_queries=related_queries
+            )
                 
         except Exception as e:
-            print(f"⚠️ Trends veri alma hatası: {e}")
+            logger.warning("⚠️ Trends veri alma hatası: %s", e)
             # Fallback veri döndür
-            return {"trend_score": 0.5, "demand_score": 0.6, "seasonal_data": {}}
+            return TrendData()
     
-    async def _analyze_competition(self, product_name: str, category: str) -> Dict[str, Any]:
+    @redis_cached(prefix="serp", ttl=6 * 60 * 60, key=lambda self, name, category: f"{name}|{category}",
+                  cache_if=lambda result: result.data_source != "Fallback", model=CompetitionData)
+    async def _analyze_competition(self, product_name: str, category: str) -> CompetitionData:
         """Rekabet analizi (SerpAPI ile)"""
         try:
-            print(f"🔍 SerpAPI ile rakip analizi başlatılıyor: {product_name}")
+            logger.info("🔍 SerpAPI ile rakip analizi başlatılıyor: %s", product_name)
             
             # SerpAPI ile rakip analizi
             competitor_analysis = await self.serp_service.analyze_competitors(product_name, category)
             
             if competitor_analysis["success"]:
-                print(f"✅ SerpAPI rakip analizi başarılı: {competitor_analysis['competitor_count']} rakip bulundu")
+                logger.info("✅ SerpAPI rakip analizi başarılı: %s rakip bulundu", competitor_analysis['competitor_count'])
                 
                 # Rekabet skorunu hesapla
                 competition_level = competitor_analysis["competition_level"]
                 if competition_level == "Yüksek":
-                    competition_score = np.random.uniform(0.7, 0.9)
+                    competition_score = _uniform(0.7, 0.9)
                 elif competition_level == "Orta":
-                    competition_score = np.random.uniform(0.4, 0.7)
+                    competition_score = _uniform(0.4, 0.7)
                 else:
-                    competition_score = np.random.uniform(0.2, 0.4)
+                    competition_score = _uniform(0.2, 0.4)
                 
-                return {
-                    "competition_level": competition_level,
-                    "competition_score": competition_score,
-                    "estimated_competitors": competitor_analysis["competitor_count"],
-                    "price_range": competitor_analysis["price_analysis"],
-                    "top_sellers": competitor_analysis.get("top_sellers", []),
-                    "popular_features": competitor_analysis.get("popular_features", []),
-                    "data_source": "SerpAPI",
-                    "analysis_timestamp": competitor_analysis["timestamp"]
-                }
+                return CompetitionData(
+                    competition_level=competition_level,
+                    competition_score=competition_score,
+                    estimated_competitors=competitor_analysis["competitor_count"],
+                    price_range=competitor_analysis["price_analysis"],
+                    top_sellers=competitor_analysis.get("top_sellers", []),
+                    popular_features=competitor_analysis.get("popular_features", []),
+                    data_source="SerpAPI",
+                    analysis_timestamp=competitor_analysis["timestamp"]
+                )
             else:
-                print(f"⚠️ SerpAPI başarısız, fallback kullanılıyor")
+                logger.warning("⚠️ SerpAPI başarısız, fallback kullanılıyor")
                 return self._get_fallback_competition_data(product_name)
                 
         except Exception as e:
-            print(f"❌ Rekabet analizi hatası: {e}")
+            logger.error("❌ Rekabet analizi hatası: %s", e)
             return self._get_fallback_competition_data(product_name)
     
-    def _get_fallback_competition_data(self, product_name: str) -> Dict[str, Any]:
+    def _get_fallback_competition_data(self, product_name: str) -> CompetitionData:
         """Fallback rekabet verisi"""
-        competition_score = np.random.uniform(0.3, 0.8)
-        competition_level = "Düşük" if competition_score < 0.4 else "Orta" if competition_score < 0.7 else "Yüksek"
-        
-        return {
-            "competition_level": competition_level,
-            "competition_score": competition_score,
-            "estimated_competitors": int(competition_score * 50),
-            "price_range": {
+        competition_score = _uniform(0.3, 0.8)
+        competition_level = _LEVEL_LABELS[bisect.bisect_right(_COMPETITION_LEVEL_BINS, competition_score)]
+        
+        return CompetitionData(
+            competition_level=competition_level,
+            competition_score=competition_score,
+            estimated_competitors=int(competition_score * 50),
+            price_range={
                 "min_price": 50,
                 "max_price": 500,
                 "avg_price": 200,
                 "price_range": 450
             },
-            "top_sellers": [],
-            "popular_features": [],
-            "data_source": "Fallback",
-            "analysis_timestamp": datetime.now().isoformat(),
-            "note": "API bağlantısı kurulamadı, tahmini veriler kullanılıyor"
-        }
+            top_sellers=[],
+            popular_features=[],
+            data_source="Fallback",
+            analysis_timestamp=_now_iso(),
+            note="API bağlantısı kurulamadı, tahmini veriler kullanılıyor"
+        )
     
-    async def _estimate_market_size(self, product: Product, trend_data: Dict) -> str:
+    def _estimate_market_size(self, product: Product, trend_data: TrendData) -> str:
         """Pazar büyüklüğü tahmini"""
-        trend_score = trend_data.get("trend_score", 0.5)
-        
-        if trend_score > 0.7:
-            return "Büyük"
-        elif trend_score > 0.4:
-            return "Orta"
-        else:
-            return "Küçük"
+        return _classify_above(trend_data.trend_score, _MARKET_SIZE_BINS, _MARKET_SIZE_LABELS)
     
-    async def _generate_market_insights(self, product: Product, trend_data: Dict, competition_data: Dict) -> str:
-        """Gemini ile pazar içgörüleri oluştur"""
-        prompt = f"""
-        Ürün: {product.name}
-        Kategori: {product.category}
-        Açıklama: {product.description}
-        Maliyet: {product.cost_price} TL
-        
-        Trend Skoru: {trend_data.get('trend_score')}
-        Talep Skoru: {trend_data.get('demand_score')}
-        Rekabet Seviyesi: {competition_data.get('competition_level')}
-        Rakip Sayısı: {competition_data.get('estimated_competitors')}
-        
-        Bu ürün için Türkiye pazarında detaylı pazar analizi yap. Şu konulara odaklan:
-        1. Pazar fırsatları ve tehditler
-        2. Hedef müşteri profili
-        3. Pazara giriş stratejisi
-        4. Rekabet avantajları
-        5. Büyüme potansiyeli
-        
-        Analizi Türkçe olarak, somut ve eyleme dönük önerilerle sun.
-        """
-        
-        return await self._call_gemini(prompt)
+    def _market_insights_prompt(self, product: Product, trend_data: TrendData, competition_data: CompetitionData) -> str:
+        """Pazar içgörüleri için Gemini istemi"""
+        return f"""{ProductContext.of(product).product_block}
+        
+        Trend Skoru: {trend_data.trend_score}
+        Talep Skoru: {trend_data.demand_score}
+        Rekabet Seviyesi: {competition_data.competition_level}
+        Rakip Sayısı: {competition_data.estimated_competitors}""" + _MARKET_PROMPT_TAIL
     
-    def _analyze_seasonality(self, data: pd.DataFrame, product_name: str) -> Dict[str, Any]:
-        """Mevsimsel trend analizi"""
-        if product_name not in data.columns:
-            return {}
-        
+    def _analyze_seasonality(self, values: np.ndarray, months: np.ndarray) -> Dict[str, Any]:
+        """Mevsimsel trend analizi (değerler ve ay numaraları dizileri üzerinden)"""
         try:
-            monthly_avg = data[product_name].groupby(data.index.month).mean()
-            peak_month = monthly_avg.idxmax()
-            low_month = monthly_avg.idxmin()
+            # 12 aylık ortalama: pandas groupby yerine bincount (küçük seride çok daha hızlı)
+            sums = np.bincount(months, weights=values, minlength=13)[1:13]
+            counts = np.bincount(months, minlength=13)[1:13]
+            observed = counts > 0
+            monthly_avg = sums[observed] / counts[observed]
+            observed_months = np.flatnonzero(observed) + 1
+            mean = monthly_avg.mean()
             
             return {
-                "peak_month": int(peak_month),
-                "low_month": int(low_month),
-                "seasonality_strength": float(monthly_avg.std() / monthly_avg.mean()) if monthly_avg.mean() > 0 else 0
+                "peak_month": int(observed_months[np.argmax(monthly_avg)]),
+                "low_month": int(observed_months[np.argmin(monthly_avg)]),
+                "seasonality_strength": float(monthly_avg.std(ddof=1) / mean) if mean > 0 else 0
             }
         except Exception:
             return {}
     
-    def _calculate_growth_potential(self, trend_data: Dict, competition_data: Dict) -> str:
+    def _calculate_growth_potential(self, trend_data: TrendData, competition_data: CompetitionData) -> str:
         """Büyüme potansiyeli hesapla"""
-        trend_score = trend_data.get("trend_score")
-        competition_score = competition_data.get("competition_score")
-        
         # Yüksek trend, düşük rekabet = yüksek potansiyel
-        potential_score = trend_score * (1 - competition_score)
-        
-        if potential_score > 0.6:
-            return "Yüksek"
-        elif potential_score > 0.3:
-            return "Orta"
-        else:
-            return "Düşük"
+        potential_score = trend_data.trend_score * (1 - competition_data.competition_score)
+        return _classify_above(potential_score, _GROWTH_POTENTIAL_BINS, _LEVEL_LABELS)
+    
+    @staticmethod
+    def classify_competition_batch(scores: np.ndarray) -> np.ndarray:
+        """Rekabet skorlarını toplu olarak Düşük/Orta/Yüksek seviyelerine ayır"""
+        return _classify_batch(scores, _COMPETITION_LEVEL_BINS, _LEVEL_LABELS, strictly_above=False)
+    
+    @staticmethod
+    def classify_market_size_batch(trend_scores: np.ndarray) -> np.ndarray:
+        """Trend skorlarından toplu pazar büyüklüğü tahmini"""
+        return _classify_batch(trend_scores, _MARKET_SIZE_BINS, _MARKET_SIZE_LABELS)
+    
+    @staticmethod
+    def classify_growth_potential_batch(trend_scores: np.ndarray, competition_scores: np.ndarray) -> np.ndarray:
+        """Trend ve rekabet skoru dizilerinden toplu büyüme potansiyeli"""
+        potential_scores = np.asarray(trend_scores, dtype=np.float64) * (1 - np.asarray(competition_scores, dtype=np.float64))
+        return _classify_batch(potential_scores, _GROWTH_POTENTIAL_BINS, _LEVEL_LABELS)
     
-    def _suggest_entry_timing(self, trend_data: Dict) -> str:
+    def _suggest_entry_timing(self, trend_data: TrendData) -> str:
         """Pazara giriş zamanlaması öner"""
-        seasonal_data = trend_data.get("seasonal_data", {})
+        seasonal_data = trend_data.seasonal_data
         current_month = datetime.now().month
         
         if seasonal_data and "peak_month" in seasonal_data:
@@ -289,157 +670,163 @@ class MarketAnalyzer(AIServiceBase):
             "market_insights": f"{product.name} için pazar analizi yapılırken teknik bir sorun oluştu. Genel olarak {product.category} kategorisinde orta seviyede bir pazar potansiyeli görünmektedir.",
             "growth_potential": "YOK",
             "entry_timing": "YOK",
-            "analysis_timestamp": datetime.now().isoformat()
+            "analysis_timestamp": _now_iso()
         }
 
 
+# Kategoriye göre demografik tahminler (anahtarlar küçük harf; salt okunur, yanıtlara kopyalanır)
+_CATEGORY_DEMOGRAPHICS: Dict[str, MappingProxyType] = {
+    "elektronik": MappingProxyType({
+        "primary_segment": "18-35 yaş arası teknoloji meraklıları",
+        "age_groups": ("18-25", "26-35", "36-45"),
+        "gender_distribution": MappingProxyType({"erkek": 0.6, "kadın": 0.4}),
+        "income_level": "orta-üst"
+    }),
+    "giyim": MappingProxyType({
+        "primary_segment": "20-40 yaş arası moda takipçileri",
+        "age_groups": ("20-30", "31-40", "41-50"),
+        "gender_distribution": MappingProxyType({"erkek": 0.3, "kadın": 0.7}),
+        "income_level": "orta"
+    }),
+    "ev": MappingProxyType({
+        "primary_segment": "25-45 yaş arası ev sahipleri",
+        "age_groups": ("25-35", "36-45", "46-55"),
+        "gender_distribution": MappingProxyType({"erkek": 0.4, "kadın": 0.6}),
+        "income_level": "orta"
+    })
+}
+_CATEGORY_TOKENS = tuple(_CATEGORY_DEMOGRAPHICS.items())
+_DEFAULT_DEMOGRAPHICS = MappingProxyType({
+    "primary_segment": "25-40 yaş arası tüketiciler",
+    "age_groups": ("25-35", "36-45"),
+    "gender_distribution": MappingProxyType({"erkek": 0.5, "kadın": 0.5}),
+    "income_level": "orta"
+})
+
+# Ürüne göre değişmeyen hedef kitle şablonları (salt okunur, her çağrıda yeniden oluşturulmaz)
+_PSYCHOGRAPHICS_TEMPLATE = MappingProxyType({
+    "lifestyle": ("teknoloji odaklı", "sosyal medya aktif", "online alışveriş"),
+    "values": ("kalite", "güvenilirlik", "uygun fiyat"),
+    "buying_behavior": "araştırma yapan, karşılaştırmalı"
+})
+_CONTENT_PREFERENCES_TEMPLATE = MappingProxyType({
+    "content_types": ("video", "görsel", "blog yazısı"),
+    "tone": "samimi ve bilgilendirici",
+    "formats": ("nasıl yapılır", "ürün incelemesi", "müşteri yorumları")
+})
+_ENGAGEMENT_STRATEGIES = (
+    "Influencer işbirlikleri",
+    "Kullanıcı yorumları ve referanslar",
+    "Sosyal medya yarışmaları",
+    "Ürün deneme kampanyaları",
+    "Müşteri hikayelerini paylaşma"
+)
+
+
 class CustomerSegmenter(AIServiceBase):
     """Hedef kitle analizi ve segmentasyon modülü"""
     
     async def analyze_target_audience(self, product: Product, market_data: Dict) -> Dict[str, Any]:
         """Hedef kitle analizi"""
+        audience_data, prompt = self.prepare_target_audience(product, market_data)
+        if prompt is not None:
+            audience_data["audience_insights"] = await self._call_gemini(prompt)
+        return audience_data
+    
+    def prepare_target_audience(self, product: Product, market_data: Dict) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Hedef kitle verilerini hazırla; Gemini içgörüsü boş bırakılır ve istemi ayrıca döndürülür"""
         try:
-            # Gemini ile hedef kitle analizi
-            audience_analysis = await self._generate_audience_insights(product, market_data)
+            # Gemini hedef kitle analizi istemi (çağrıyı yapan taraf gönderir)
+            prompt = self._audience_insights_prompt(product, market_data)
             
             # Demografik segmentasyon
-            demographics = await self._analyze_demographics(product)
+            demographics = self._analyze_demographics(product.category.lower())
             
             # Kanal önerileri
-            channels = await self._suggest_marketing_channels(product, demographics)
+            channels = self._suggest_marketing_channels(demographics)
             
             return {
                 "primary_segment": demographics.get("primary_segment", "25-40 yaş arası profesyoneller"),
                 "secondary_segments": demographics.get("secondary_segments", []),
-                "demographics": demographics,
-                "psychographics": await self._analyze_psychographics(product),
+                # Önbellekteki salt okunur şablonlar yanıta kopyalanarak konur
+                "demographics": {
+                    **demographics,
+                    "gender_distribution": dict(demographics["gender_distribution"])
+                },
+                "psychographics": dict(self._analyze_psychographics(product.category)),
                 "marketing_channels": channels,
-                "content_preferences": await self._analyze_content_preferences(product),
-                "audience_insights": audience_analysis,
-                "engagement_strategies": await self._suggest_engagement_strategies(product),
-                "analysis_timestamp": datetime.now().isoformat()
-            }
+                "content_preferences": self._analyze_content_preferences(product),
+                "audience_insights": None,
+                "engagement_strategies": self._suggest_engagement_strategies(product),
+                "analysis_timestamp": _now_iso()
+            }, prompt
         except Exception as e:
-            print(f"Hedef kitle analizi hatası: {e}")
-            return self._get_fallback_audience_data(product)
+            logger.error("Hedef kitle analizi hatası: %s", e)
+            return self._get_fallback_audience_data(product), None
     
-    async def _generate_audience_insights(self, product: Product, market_data: Dict) -> str:
-        """Gemini ile hedef kitle içgörüleri"""
-        prompt = f"""
-        Ürün: {product.name}
-        Kategori: {product.category}
-        Açıklama: {product.description}
-        Fiyat Aralığı: {product.cost_price} TL (maliyet)
+    def _audience_insights_prompt(self, product: Product, market_data: Dict) -> str:
+        """Hedef kitle içgörüleri için Gemini istemi"""
+        return f"""{ProductContext.of(product).product_block}
         
         Pazar Büyüklüğü: {market_data.get('market_size', 'Orta')}
-        Rekabet Seviyesi: {market_data.get('competition_level', 'Orta')}
-        
-        Bu ürün için Türkiye'de detaylı hedef kitle analizi yap:
-        1. Ana hedef kitle demografik profili (yaş, cinsiyet, gelir, eğitim)
-        2. Satın alma motivasyonları ve ihtiyaçları
-        3. Dijital davranış kalıpları (hangi platformları kullanıyor)
-        4. Fiyat hassasiyeti ve satın alma gücü
-        5. İletişim tercih ettikleri dil ve ton
-        
-        Analizi Türkçe, somut ve pazarlama stratejisine yönelik sun.
-        """
-        
-        return await self._call_gemini(prompt)
-    
-    async def _analyze_demographics(self, product: Product) -> Dict[str, Any]:
-        """Demografik analiz"""
-        # Ürün kategorisine göre demografik tahminler
-        category_demographics = {
-            "elektronik": {
-                "primary_segment": "18-35 yaş arası teknoloji meraklıları",
-                "age_groups": ["18-25", "26-35", "36-45"],
-                "gender_distribution": {"erkek": 0.6, "kadın": 0.4},
-                "income_level": "orta-üst"
-            },
-            "giyim": {
-                "primary_segment": "20-40 yaş arası moda takipçileri",
-                "age_groups": ["20-30", "31-40", "41-50"],
-                "gender_distribution": {"erkek": 0.3, "kadın": 0.7},
-                "income_level": "orta"
-            },
-            "ev": {
-                "primary_segment": "25-45 yaş arası ev sahipleri",
-                "age_groups": ["25-35", "36-45", "46-55"],
-                "gender_distribution": {"erkek": 0.4, "kadın": 0.6},
-                "income_level": "orta"
-            }
-        }
-        
-        # Kategori eşleştirme
-        category_key = next((key for key in category_demographics.keys() 
-                           if key.lower() in product.category.lower()), "genel")
-        
-        if category_key == "genel":
-            return {
-                "primary_segment": "25-40 yaş arası tüketiciler",
-                "age_groups": ["25-35", "36-45"],
-                "gender_distribution": {"erkek": 0.5, "kadın": 0.5},
-                "income_level": "orta"
-            }
-        
-        return category_demographics[category_key]
+        Rekabet Seviyesi: {market_data.get('competition_level', 'Orta')}""" + _AUDIENCE_PROMPT_TAIL
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _analyze_demographics(category: str) -> MappingProxyType:
+        """Demografik analiz (küçük harfli kategoriye göre önbelleklenir; salt okunur)"""
+        # Kategori eşleştirme (ürün kategorisine göre demografik tahminler)
+        for category_key, demographics in _CATEGORY_TOKENS:
+            if category_key in category:
+                return demographics
+        return _DEFAULT_DEMOGRAPHICS
     
-    async def _suggest_marketing_channels(self, product: Product, demographics: Dict) -> List[Dict[str, Any]]:
+    def _suggest_marketing_channels(self, demographics: Dict) -> List[Dict[str, Any]]:
         """Pazarlama kanalı önerileri"""
-        channels = []
-        
         # Yaş grubuna göre kanal önerileri
         primary_age = demographics.get("age_groups", ["25-35"])[0]
         age_start = int(primary_age.split("-")[0])
-        
-        if age_start <= 25:
-            channels.extend([
-                {"platform": "Instagram", "priority": "yüksek", "content_type": "stories, reels"},
-                {"platform": "TikTok", "priority": "yüksek", "content_type": "short videos"},
-                {"platform": "YouTube", "priority": "orta", "content_type": "product reviews"}
-            ])
-        elif age_start <= 35:
-            channels.extend([
-                {"platform": "Instagram", "priority": "yüksek", "content_type": "posts, stories"},
-                {"platform": "Facebook", "priority": "orta", "content_type": "ads, groups"},
-                {"platform": "Google Ads", "priority": "yüksek", "content_type": "search ads"}
-            ])
-        else:
-            channels.extend([
-                {"platform": "Facebook", "priority": "yüksek", "content_type": "ads, posts"},
-                {"platform": "Google Ads", "priority": "yüksek", "content_type": "search ads"},
-                {"platform": "E-posta", "priority": "orta", "content_type": "newsletters"}
-            ])
-        
-        return channels
+        age_bucket = 0 if age_start <= 25 else 1 if age_start <= 35 else 2
+        return [dict(channel) for channel in self._channels_for_age_bucket(age_bucket)]
     
-    async def _analyze_psychographics(self, product: Product) -> Dict[str, Any]:
-        """Psikografik analiz"""
-        return {
-            "lifestyle": ["teknoloji odaklı", "sosyal medya aktif", "online alışveriş"],
-            "values": ["kalite", "güvenilirlik", "uygun fiyat"],
-            "interests": [product.category, "yenilikler", "trendler"],
-            "buying_behavior": "araştırma yapan, karşılaştırmalı"
-        }
+    @staticmethod
+    @functools.lru_cache(maxsize=4)
+    def _channels_for_age_bucket(age_bucket: int) -> Tuple[MappingProxyType, ...]:
+        """Yaş grubu dilimine göre kanal listesi (dilim başına bir kez oluşturulur; salt okunur)"""
+        if age_bucket == 0:
+            return (
+                MappingProxyType({"platform": "Instagram", "priority": "yüksek", "content_type": "stories, reels"}),
+                MappingProxyType({"platform": "TikTok", "priority": "yüksek", "content_type": "short videos"}),
+                MappingProxyType({"platform": "YouTube", "priority": "orta", "content_type": "product reviews"})
+            )
+        elif age_bucket == 1:
+            return (
+                MappingProxyType({"platform": "Instagram", "priority": "yüksek", "content_type": "posts, stories"}),
+                MappingProxyType({"platform": "Facebook", "priority": "orta", "content_type": "ads, groups"}),
+                MappingProxyType({"platform": "Google Ads", "priority": "yüksek", "content_type": "search ads"})
+            )
+        return (
+            MappingProxyType({"platform": "Facebook", "priority": "yüksek", "content_type": "ads, posts"}),
+            MappingProxyType({"platform": "Google Ads", "priority": "yüksek", "content_type": "search ads"}),
+            MappingProxyType({"platform": "E-posta", "priority": "orta", "content_type": "newsletters"})
+        )
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _analyze_psychographics(category: str) -> MappingProxyType:
+        """Psikografik analiz (kategoriye göre önbelleklenir; salt okunur)"""
+        return MappingProxyType({**_PSYCHOGRAPHICS_TEMPLATE, "interests": (category, "yenilikler", "trendler")})
     
-    async def _analyze_content_preferences(self, product: Product) -> Dict[str, Any]:
+    def _analyze_content_preferences(self, product: Product) -> Dict[str, Any]:
         """İçerik tercihleri analizi"""
         return {
-            "content_types": ["video", "görsel", "blog yazısı"],
-            "tone": "samimi ve bilgilendirici",
-            "topics": [f"{product.name} kullanımı", "ipuçları", "karşılaştırmalar"],
-            "formats": ["nasıl yapılır", "ürün incelemesi", "müşteri yorumları"]
+            **_CONTENT_PREFERENCES_TEMPLATE,
+            "topics": (f"{product.name} kullanımı", "ipuçları", "karşılaştırmalar")
         }
     
-    async def _suggest_engagement_strategies(self, product: Product) -> List[str]:
+    def _suggest_engagement_strategies(self, product: Product) -> Tuple[str, ...]:
         """Etkileşim stratejileri"""
-        return [
-            "Influencer işbirlikleri",
-            "Kullanıcı yorumları ve referanslar",
-            "Sosyal medya yarışmaları",
-            "Ürün deneme kampanyaları",
-            "Müşteri hikayelerini paylaşma"
-        ]
+        return _ENGAGEMENT_STRATEGIES
     
     def _get_fallback_audience_data(self, product: Product) -> Dict[str, Any]:
         """Varsayılan hedef kitle verisi"""
@@ -455,78 +842,105 @@ class CustomerSegmenter(AIServiceBase):
                 {"platform": "Google Ads", "priority": "yüksek"}
             ],
             "audience_insights": f"{product.name} için hedef kitle analiz edilirken teknik sorun oluştu.",
-            "analysis_timestamp": datetime.now().isoformat()
+            "analysis_timestamp": _now_iso()
         }
 
 
+# Fiyat aralığı çarpanları (minimum %20, maksimum %80 kar)
+MIN_PRICE_MULTIPLIER = 1.2
+MAX_PRICE_MULTIPLIER = 1.8
+
+
+def _price_points(cost_price: float, margin: float) -> tuple:
+    """Maliyet ve kar marjından (önerilen, minimum, maksimum) fiyatları hesapla"""
+    return (
+        round(cost_price * (1 + margin), 2),
+        round(cost_price * MIN_PRICE_MULTIPLIER, 2),
+        round(cost_price * MAX_PRICE_MULTIPLIER, 2),
+    )
+
+
 class PricingAdvisor(AIServiceBase):
     """Fiyatlandırma ve promosyon stratejisi modülü"""
     
     def __init__(self):
         super().__init__()
-        # Exchange Rate servisini başlat
-        from app.services.exchange_service import ExchangeRateService
-        self.exchange_service = ExchangeRateService()
+        # Paylaşılan Exchange Rate servisini kullan (kur önbelleği ve HTTP oturumu ortak)
+        self.exchange_service = exchange_service
     
     async def analyze_pricing(self, product: Product, market_data: Dict, audience_data: Dict) -> Dict[str, Any]:
         """Fiyatlandırma analizi"""
         try:
             # Temel fiyat hesaplamaları
-            base_pricing = await self._calculate_base_pricing(product)
+            base_pricing = self._calculate_base_pricing(product)
             
             # Rekabetçi fiyatlandırma
-            competitive_pricing = await self._analyze_competitive_pricing(product, market_data)
-            
-            # Döviz kuru etkisi (Exchange Rate API ile)
-            currency_impact = await self._analyze_currency_impact()
+            competitive_pricing = self._analyze_competitive_pricing(product, market_data)
             
-            # Gemini ile fiyat stratejisi
-            pricing_strategy = await self._generate_pricing_strategy(product, base_pricing, competitive_pricing, market_data)
-            
-            # Promosyon önerileri
-            promotion_strategy = await self._suggest_promotions(product, base_pricing, audience_data)
+            # Döviz kuru etkisi (Exchange Rate API) ve Gemini fiyat stratejisi bağımsız; birlikte çalıştır
+            currency_impact, pricing_strategy = await asyncio.gather(
+                self._analyze_currency_impact(),
+                self._call_gemini(self._pricing_strategy_prompt(product, base_pricing, competitive_pricing, market_data))
+            )
             
-            return {
-                "recommended_price": base_pricing.get("recommended_price"),
-                "price_range": base_pricing.get("price_range"),
-                "profit_margin": base_pricing.get("profit_margin"),
-                "competitive_position": competitive_pricing.get("position"),
-                "pricing_strategy": pricing_strategy,
-                "promotion_recommendations": promotion_strategy,
-                "price_elasticity": await self._estimate_price_elasticity(product, market_data),
-                "seasonal_pricing": await self._suggest_seasonal_pricing(product, market_data),
-                "currency_recommendations": currency_impact,
-                "analysis_timestamp": datetime.now().isoformat()
-            }
+            return self._build_pricing_result(
+                product, market_data, audience_data, base_pricing, competitive_pricing, currency_impact, pricing_strategy
+            )
         except Exception as e:
-            print(f"❌ Fiyatlandırma analizi hatası: {e}")
+            logger.error("❌ Fiyatlandırma analizi hatası: %s", e)
             return self._get_fallback_pricing_data(product)
     
-    async def _calculate_base_pricing(self, product: Product) -> Dict[str, Any]:
+    async def prepare_pricing(self, product: Product, market_data: Dict, audience_data: Dict) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Fiyat verilerini hazırla; Gemini stratejisi boş bırakılır ve istemi ayrıca döndürülür"""
+        try:
+            base_pricing = self._calculate_base_pricing(product)
+            competitive_pricing = self._analyze_competitive_pricing(product, market_data)
+            prompt = self._pricing_strategy_prompt(product, base_pricing, competitive_pricing, market_data)
+            currency_impact = await self._analyze_currency_impact()
+            
+            return self._build_pricing_result(
+                product, market_data, audience_data, base_pricing, competitive_pricing, currency_impact, None
+            ), prompt
+        except Exception as e:
+            logger.error("❌ Fiyatlandırma analizi hatası: %s", e)
+            return self._get_fallback_pricing_data(product), None
+    
+    def _build_pricing_result(self, product: Product, market_data: Dict, audience_data: Dict, base_pricing: Dict,
+                              competitive_pricing: Dict, currency_impact: Dict, pricing_strategy: Optional[str]) -> Dict[str, Any]:
+        """Fiyatlandırma analizi sonucunu oluştur"""
+        return {
+            "recommended_price": base_pricing.get("recommended_price"),
+            "price_range": base_pricing.get("price_range"),
+            "profit_margin": base_pricing.get("profit_margin"),
+            "competitive_position": competitive_pricing.get("position"),
+            "pricing_strategy": pricing_strategy,
+            "promotion_recommendations": self._suggest_promotions(product, base_pricing, audience_data),
+            "price_elasticity": self._estimate_price_elasticity(product, market_data),
+            "seasonal_pricing": self._suggest_seasonal_pricing(product, market_data),
+            "currency_recommendations": currency_impact,
+            "analysis_timestamp": _now_iso()
+        }
+    
+    def _calculate_base_pricing(self, product: Product) -> Dict[str, Any]:
         """Temel fiyat hesaplamaları"""
         cost_price = float(product.cost_price)
         
         # Hedef kar marjı (eğer belirtilmişse kullan, yoksa %40 varsayılan)
         target_margin = float(product.target_profit_margin) if product.target_profit_margin else 0.4
         
-        # Önerilen fiyat hesaplama
-        recommended_price = cost_price * (1 + target_margin)
-        
-        # Fiyat aralığı
-        min_price = cost_price * 1.2  # Minimum %20 kar
-        max_price = cost_price * 1.8  # Maksimum %80 kar
+        recommended_price, min_price, max_price = _price_points(cost_price, target_margin)
         
         return {
-            "recommended_price": round(recommended_price, 2),
+            "recommended_price": recommended_price,
             "price_range": {
-                "min": round(min_price, 2),
-                "max": round(max_price, 2)
+                "min": min_price,
+                "max": max_price
             },
             "profit_margin": target_margin,
             "cost_price": cost_price
         }
     
-    async def _analyze_competitive_pricing(self, product: Product, market_data: Dict) -> Dict[str, Any]:
+    def _analyze_competitive_pricing(self, product: Product, market_data: Dict) -> Dict[str, Any]:
         """Rekabetçi fiyat analizi"""
         # Market data'dan rakip fiyat bilgilerini al
         competition_level = market_data.get("competition_level", "Orta")
@@ -581,10 +995,11 @@ class PricingAdvisor(AIServiceBase):
                 "note": "Rakip fiyat verisi bulunamadı, genel strateji uygulandı"
             }
     
+    @redis_cached(prefix="fx", ttl=60 * 60, key=lambda self: "USD", cache_if=_is_live_data)
     async def _analyze_currency_impact(self) -> Dict[str, Any]:
         """Döviz kuru etkisi analizi (Exchange Rate API ile)"""
         try:
-            print("💱 Exchange Rate API ile döviz kuru analizi başlatılıyor")
+            logger.info("💱 Exchange Rate API ile döviz kuru analizi başlatılıyor")
             
             # Exchange Rate API'den güncel kurları al
             rates_data = await self.exchange_service.get_latest_rates("USD")
@@ -593,7 +1008,7 @@ class PricingAdvisor(AIServiceBase):
                 usd_to_try = rates_data["conversion_rates"].get("TRY", 30.0)
                 eur_to_try = rates_data["conversion_rates"].get("EUR", 33.0)
                 
-                print(f"✅ Güncel kurlar alındı: USD/TRY={usd_to_try}, EUR/TRY={eur_to_try}")
+                logger.info("✅ Güncel kurlar alındı: USD/TRY=%s, EUR/TRY=%s", usd_to_try, eur_to_try)
                 
                 # Kur etkisi analizi
                 if usd_to_try > 32:
@@ -623,11 +1038,11 @@ class PricingAdvisor(AIServiceBase):
                     "data_source": "Exchange Rate API"
                 }
             else:
-                print("⚠️ Exchange Rate API başarısız, fallback kullanılıyor")
+                logger.warning("⚠️ Exchange Rate API başarısız, fallback kullanılıyor")
                 return self._get_fallback_currency_data()
                 
         except Exception as e:
-            print(f"❌ Döviz kuru analizi hatası: {e}")
+            logger.error("❌ Döviz kuru analizi hatası: %s", e)
             return self._get_fallback_currency_data()
     
     def _get_fallback_currency_data(self) -> Dict[str, Any]:
@@ -642,12 +1057,9 @@ class PricingAdvisor(AIServiceBase):
             "note": "API bağlantısı kurulamadı, varsayılan veriler kullanılıyor"
         }
     
-    async def _generate_pricing_strategy(self, product: Product, base_pricing: Dict, competitive_pricing: Dict, market_data: Dict) -> str:
-        """Gemini ile fiyat stratejisi oluştur"""
-        prompt = f"""
-        Ürün: {product.name}
-        Kategori: {product.category}
-        Maliyet Fiyatı: {product.cost_price} TL
+    def _pricing_strategy_prompt(self, product: Product, base_pricing: Dict, competitive_pricing: Dict, market_data: Dict) -> str:
+        """Fiyat stratejisi için Gemini istemi"""
+        return f"""{ProductContext.of(product).product_block}
         Önerilen Fiyat: {base_pricing.get('recommended_price')} TL
         Kar Marjı: %{base_pricing.get('profit_margin', 0.4) * 100}
         
@@ -656,21 +1068,9 @@ class PricingAdvisor(AIServiceBase):
         - Rekabet Seviyesi: {market_data.get('competition_level', 'Orta')}
         - Talep Skoru: {market_data.get('demand_score', 0.6)}
         
-        Rekabet Pozisyonu: {competitive_pricing.get('position', 'competitive')}
-        
-        Bu ürün için kapsamlı fiyatlandırma stratejisi geliştir:
-        1. Fiyat pozisyonlama stratejisi
-        2. Pazar giriş fiyatı önerisi
-        3. Fiyat artış/azalış senaryoları
-        4. Rakiplere karşı avantajlar
-        5. Müşteri değer algısını artırma yöntemleri
-        
-        Stratejiyi Türkçe, uygulanabilir ve somut önerilerle sun.
-        """
-        
-        return await self._call_gemini(prompt)
+        Rekabet Pozisyonu: {competitive_pricing.get('position', 'competitive')}""" + _PRICING_PROMPT_TAIL
     
-    async def _suggest_promotions(self, product: Product, base_pricing: Dict, audience_data: Dict) -> List[Dict[str, Any]]:
+    def _suggest_promotions(self, product: Product, base_pricing: Dict, audience_data: Dict) -> List[Dict[str, Any]]:
         """Promosyon önerileri"""
         recommended_price = base_pricing.get("recommended_price", 100)
         
@@ -700,7 +1100,7 @@ class PricingAdvisor(AIServiceBase):
         
         return promotions
     
-    async def _estimate_price_elasticity(self, product: Product, market_data: Dict) -> Dict[str, Any]:
+    def _estimate_price_elasticity(self, product: Product, market_data: Dict) -> Dict[str, Any]:
         """Fiyat elastikiyeti tahmini"""
         competition_level = market_data.get("competition_level", "Orta")
         
@@ -720,7 +1120,7 @@ class PricingAdvisor(AIServiceBase):
             "recommendation": f"Fiyat değişikliklerinde {elasticity} hassasiyet beklenir"
         }
     
-    async def _suggest_seasonal_pricing(self, product: Product, market_data: Dict) -> Dict[str, Any]:
+    def _suggest_seasonal_pricing(self, product: Product, market_data: Dict) -> Dict[str, Any]:
         """Mevsimsel fiyatlandırma önerileri"""
         seasonal_trends = market_data.get("seasonal_trends", {})
         
@@ -738,62 +1138,146 @@ class PricingAdvisor(AIServiceBase):
             "recommendation": "Sabit fiyat stratejisi uygulayın"
         }
     
+    @staticmethod
+    def fallback_price_points_batch(cost_prices: np.ndarray) -> Dict[str, np.ndarray]:
+        """Çok sayıda ürün için varsayılan (%40 marjlı) fiyat noktalarını vektörel hesapla"""
+        cost_prices = np.asarray(cost_prices, dtype=np.float64)
+        return {
+            "recommended_price": np.round(cost_prices * 1.4, 2),
+            "min": np.round(cost_prices * MIN_PRICE_MULTIPLIER, 2),
+            "max": np.round(cost_prices * MAX_PRICE_MULTIPLIER, 2)
+        }
+    
     def _get_fallback_pricing_data(self, product: Product) -> Dict[str, Any]:
         """Varsayılan fiyatlandırma verisi"""
-        cost_price = float(product.cost_price)
-        recommended_price = cost_price * 1.4
+        recommended_price, min_price, max_price = _price_points(float(product.cost_price), 0.4)
         
         return {
-            "recommended_price": round(recommended_price, 2),
+            "recommended_price": recommended_price,
             "price_range": {
-                "min": round(cost_price * 1.2, 2),
-                "max": round(cost_price * 1.8, 2)
+                "min": min_price,
+                "max": max_price
             },
             "profit_margin": 0.4,
             "pricing_strategy": f"{product.name} için fiyat analizi yapılırken teknik sorun oluştu. Genel olarak %40 kar marjı önerilir.",
-            "analysis_timestamp": datetime.now().isoformat()
+            "analysis_timestamp": _now_iso()
         }
 
 
+def _instagram_content(name: str, name_nospaces: str, category: str) -> Dict[str, Any]:
+    """Instagram içerik önerileri"""
+    return {
+        "post_ideas": [
+            f"{name} kullanım ipuçları",
+            "Müşteri yorumları ve fotoğrafları",
+            "Ürün detay görselleri",
+            "Behind the scenes içerik"
+        ],
+        "hashtags": [f"#{name_nospaces}", f"#{category}", "#kalite", "#türkiye"],
+        "story_ideas": ["Günün ürünü", "Müşteri deneyimleri", "Hızlı ipuçları"]
+    }
+
+
+def _facebook_content(name: str, name_nospaces: str, category: str) -> Dict[str, Any]:
+    """Facebook içerik önerileri"""
+    return {
+        "post_types": ["Bilgilendirici yazılar", "Müşteri hikayeleri", "Ürün tanıtımları"],
+        "ad_formats": ["Carousel ads", "Video ads", "Collection ads"]
+    }
+
+
+# Ürüne göre değişmeyen mesajlaşma içerikleri
+_KEY_MESSAGES = (
+    "Kalite ve güvenilirlik",
+    "Uygun fiyat avantajı",
+    "Müşteri memnuniyeti odaklı",
+    "Hızlı ve güvenli teslimat"
+)
+_CONTENT_CALENDAR = MappingProxyType({
+    "haftalık": (
+        "Pazartesi: Ürün tanıtımı",
+        "Çarşamba: Müşteri yorumu",
+        "Cuma: İpucu ve trick",
+        "Pazar: Behind the scenes"
+    ),
+    "aylık": (
+        "Ayın ilk haftası: Yeni ürün lansmanı",
+        "İkinci hafta: Eğitici içerik",
+        "Üçüncü hafta: Müşteri hikayeleri",
+        "Dördüncü hafta: Promosyon kampanyası"
+    )
+})
+# {name} alanı ürün adıyla doldurulur
+_AB_TESTS_TEMPLATE = (
+    MappingProxyType({
+        "test_type": "Başlık testi",
+        "variant_a": "{name} - En İyi Seçim",
+        "variant_b": "Kaliteli {name} Burada",
+        "metric": "Tıklama oranı"
+    }),
+    MappingProxyType({
+        "test_type": "CTA testi",
+        "variant_a": "Hemen Satın Al",
+        "variant_b": "Sepete Ekle",
+        "metric": "Dönüşüm oranı"
+    }),
+    MappingProxyType({
+        "test_type": "Görsel testi",
+        "variant_a": "Ürün tek başına",
+        "variant_b": "Ürün kullanım halinde",
+        "metric": "Engagement oranı"
+    })
+)
+
+# Platform adı → (içerik anahtarı, içerik oluşturucu)
+_PLATFORM_CONTENT_BUILDERS: Dict[str, Tuple[str, Callable[[str, str, str], Dict[str, Any]]]] = {
+    "Instagram": ("instagram", _instagram_content),
+    "Facebook": ("facebook", _facebook_content)
+}
+
+
 class MessagingGenerator(AIServiceBase):
     """İçerik ve mesajlaşma stratejisi modülü"""
     
     async def generate_messaging_strategy(self, product: Product, market_data: Dict, audience_data: Dict, pricing_data: Dict) -> Dict[str, Any]:
         """Mesajlaşma stratejisi oluştur"""
         try:
-            # SEO optimized içerik
-            seo_content = await self._generate_seo_content(product, market_data)
-            
-            # Pazarlama mesajları
-            marketing_messages = await self._generate_marketing_messages(product, audience_data, pricing_data)
+            # SEO ve pazarlama metinleri aynı ürün bağlamını paylaşır; tek Gemini isteğinde al
+            responses = await self._call_gemini_json({
+                "seo_content": self._seo_content_prompt(product),
+                "marketing_messages": self._marketing_messages_prompt(product, audience_data, pricing_data)
+            })
             
-            # Sosyal medya içeriği
-            social_content = await self._generate_social_media_content(product, audience_data)
-            
-            # E-posta kampanya içeriği
-            email_content = await self._generate_email_content(product, pricing_data)
+            # Bölümler G/Ç yapmaz (Gemini yanıtları yukarıda alındı); doğrudan oluşturulur
+            sections = (
+                ("seo_content", lambda: self._generate_seo_content(product, responses["seo_content"])),
+                ("marketing_messages", lambda: self._generate_marketing_messages(product, responses["marketing_messages"])),
+                ("social_media_content", lambda: self._generate_social_media_content(product, audience_data)),
+                ("email_campaigns", lambda: self._generate_email_content(product, pricing_data)),
+                ("key_messages", lambda: self._extract_key_messages(product, audience_data)),
+                ("tone_of_voice", lambda: self._define_tone_of_voice(product, audience_data)),
+                ("content_calendar", lambda: self._suggest_content_calendar(product)),
+                ("ab_test_recommendations", lambda: self._suggest_ab_tests(product))
+            )
             
-            return {
-                "seo_content": seo_content,
-                "marketing_messages": marketing_messages,
-                "social_media_content": social_content,
-                "email_campaigns": email_content,
-                "key_messages": await self._extract_key_messages(product, audience_data),
-                "tone_of_voice": await self._define_tone_of_voice(product, audience_data),
-                "content_calendar": await self._suggest_content_calendar(product),
-                "ab_test_recommendations": await self._suggest_ab_tests(product),
-                "analysis_timestamp": datetime.now().isoformat()
-            }
+            # Hata veren bölüm tüm stratejiyi düşürmez; yerine varsayılan değeri konur
+            fallback = self._get_fallback_messaging_data(product)
+            messaging = {}
+            for key, build in sections:
+                try:
+                    messaging[key] = build()
+                except Exception as e:
+                    logger.warning("⚠️ Mesajlaşma bölümü oluşturulamadı (%s): %s", key, e)
+                    messaging[key] = fallback.get(key)
+            messaging["analysis_timestamp"] = _now_iso()
+            return messaging
         except Exception as e:
-            print(f"Mesajlaşma stratejisi hatası: {e}")
+            logger.error("Mesajlaşma stratejisi hatası: %s", e)
             return self._get_fallback_messaging_data(product)
     
-    async def _generate_seo_content(self, product: Product, market_data: Dict) -> Dict[str, Any]:
-        """SEO optimized içerik oluştur"""
-        prompt = f"""
-        Ürün: {product.name}
-        Kategori: {product.category}
-        Açıklama: {product.description}
+    def _seo_content_prompt(self, product: Product) -> str:
+        """SEO içeriği için Gemini istemi"""
+        return f"""{ProductContext.of(product).product_block}
         
         Bu ürün için SEO optimized içerik oluştur:
         1. Ana başlık (H1) - 60 karakter altında
@@ -804,9 +1288,9 @@ class MessagingGenerator(AIServiceBase):
         
         İçeriği Türkçe, doğal ve kullanıcı dostu şekilde yaz.
         """
-        
-        seo_response = await self._call_gemini(prompt)
-        
+    
+    def _generate_seo_content(self, product: Product, seo_response: str) -> Dict[str, Any]:
+        """SEO optimized içerik oluştur"""
         return {
             "optimized_title": f"{product.name} - Kaliteli {product.category}",
             "meta_description": f"{product.name} satın al. {product.category} kategorisinde en iyi fiyatlar ve kalite garantisi.",
@@ -819,13 +1303,12 @@ class MessagingGenerator(AIServiceBase):
             ]
         }
     
-    async def _generate_marketing_messages(self, product: Product, audience_data: Dict, pricing_data: Dict) -> Dict[str, Any]:
-        """Pazarlama mesajları oluştur"""
+    def _marketing_messages_prompt(self, product: Product, audience_data: Dict, pricing_data: Dict) -> str:
+        """Pazarlama mesajları için Gemini istemi"""
         primary_segment = audience_data.get("primary_segment", "hedef kitle")
         recommended_price = pricing_data.get("recommended_price", 100)
         
-        prompt = f"""
-        Ürün: {product.name}
+        return f"""{ProductContext.of(product).product_block}
         Hedef Kitle: {primary_segment}
         Fiyat: {recommended_price} TL
         
@@ -838,9 +1321,9 @@ class MessagingGenerator(AIServiceBase):
         
         Mesajları Türkçe, ikna edici ve hedef kitleye uygun şekilde yaz.
         """
-        
-        marketing_response = await self._call_gemini(prompt)
-        
+    
+    def _generate_marketing_messages(self, product: Product, marketing_response: str) -> Dict[str, Any]:
+        """Pazarlama mesajları oluştur"""
         return {
             "value_proposition": f"{product.name} ile {product.category} ihtiyaçlarınızı karşılayın",
             "selling_points": [
@@ -863,35 +1346,24 @@ class MessagingGenerator(AIServiceBase):
             "detailed_messages": marketing_response
         }
     
-    async def _generate_social_media_content(self, product: Product, audience_data: Dict) -> Dict[str, Any]:
+    def _generate_social_media_content(self, product: Product, audience_data: Dict) -> Dict[str, Any]:
         """Sosyal medya içeriği oluştur"""
         channels = audience_data.get("marketing_channels", [])
         
-        content = {}
+        # Döngü boyunca değişmeyen ürün alanları bir kez hazırlanır
+        name, category = product.name, product.category
+        name_nospaces = name.replace(' ', '')
         
+        content = {}
         for channel in channels:
-            platform = channel.get("platform", "Instagram")
-            
-            if platform == "Instagram":
-                content["instagram"] = {
-                    "post_ideas": [
-                        f"{product.name} kullanım ipuçları",
-                        "Müşteri yorumları ve fotoğrafları",
-                        "Ürün detay görselleri",
-                        "Behind the scenes içerik"
-                    ],
-                    "hashtags": [f"#{product.name.replace(' ', '')}", f"#{product.category}", "#kalite", "#türkiye"],
-                    "story_ideas": ["Günün ürünü", "Müşteri deneyimleri", "Hızlı ipuçları"]
-                }
-            elif platform == "Facebook":
-                content["facebook"] = {
-                    "post_types": ["Bilgilendirici yazılar", "Müşteri hikayeleri", "Ürün tanıtımları"],
-                    "ad_formats": ["Carousel ads", "Video ads", "Collection ads"]
-                }
+            builder = _PLATFORM_CONTENT_BUILDERS.get(channel.get("platform", "Instagram"))
+            if builder is not None:
+                key, build = builder
+                content[key] = build(name, name_nospaces, category)
         
         return content
     
-    async def _generate_email_content(self, product: Product, pricing_data: Dict) -> Dict[str, Any]:
+    def _generate_email_content(self, product: Product, pricing_data: Dict) -> Dict[str, Any]:
         """E-posta kampanya içeriği"""
         return {
             "welcome_series": {
@@ -908,71 +1380,39 @@ class MessagingGenerator(AIServiceBase):
             }
         }
     
-    async def _extract_key_messages(self, product: Product, audience_data: Dict) -> List[str]:
+    def _extract_key_messages(self, product: Product, audience_data: Dict) -> Tuple[str, ...]:
         """Anahtar mesajları çıkar"""
-        return [
-            "Kalite ve güvenilirlik",
-            "Uygun fiyat avantajı",
-            "Müşteri memnuniyeti odaklı",
-            "Hızlı ve güvenli teslimat"
-        ]
+        return _KEY_MESSAGES
     
-    async def _define_tone_of_voice(self, product: Product, audience_data: Dict) -> Dict[str, str]:
+    def _define_tone_of_voice(self, product: Product, audience_data: Dict) -> Dict[str, str]:
         """Ses tonu tanımla"""
-        primary_segment = audience_data.get("primary_segment", "")
-        
-        if "genç" in primary_segment.lower() or "18-25" in primary_segment:
-            return {
+        return dict(self._tone_for_segment(audience_data.get("primary_segment", "").lower()))
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _tone_for_segment(primary_segment: str) -> MappingProxyType:
+        """Ses tonu (küçük harfli ana segmente göre önbelleklenir; salt okunur)"""
+        if "genç" in primary_segment or "18-25" in primary_segment:
+            return MappingProxyType({
                 "tone": "Samimi ve enerjik",
                 "style": "Günlük dil, emoji kullanımı",
                 "personality": "Arkadaş canlısı, trend takipçisi"
-            }
+            })
         else:
-            return {
+            return MappingProxyType({
                 "tone": "Profesyonel ve güvenilir",
                 "style": "Resmi ama sıcak dil",
                 "personality": "Uzman, güvenilir, çözüm odaklı"
-            }
+            })
     
-    async def _suggest_content_calendar(self, product: Product) -> Dict[str, List[str]]:
+    def _suggest_content_calendar(self, product: Product) -> Dict[str, Tuple[str, ...]]:
         """İçerik takvimi öner"""
-        return {
-            "haftalık": [
-                "Pazartesi: Ürün tanıtımı",
-                "Çarşamba: Müşteri yorumu",
-                "Cuma: İpucu ve trick",
-                "Pazar: Behind the scenes"
-            ],
-            "aylık": [
-                "Ayın ilk haftası: Yeni ürün lansmanı",
-                "İkinci hafta: Eğitici içerik",
-                "Üçüncü hafta: Müşteri hikayeleri",
-                "Dördüncü hafta: Promosyon kampanyası"
-            ]
-        }
+        return dict(_CONTENT_CALENDAR)
     
-    async def _suggest_ab_tests(self, product: Product) -> List[Dict[str, str]]:
+    def _suggest_ab_tests(self, product: Product) -> List[Dict[str, str]]:
         """A/B test önerileri"""
-        return [
-            {
-                "test_type": "Başlık testi",
-                "variant_a": f"{product.name} - En İyi Seçim",
-                "variant_b": f"Kaliteli {product.name} Burada",
-                "metric": "Tıklama oranı"
-            },
-            {
-                "test_type": "CTA testi",
-                "variant_a": "Hemen Satın Al",
-                "variant_b": "Sepete Ekle",
-                "metric": "Dönüşüm oranı"
-            },
-            {
-                "test_type": "Görsel testi",
-                "variant_a": "Ürün tek başına",
-                "variant_b": "Ürün kullanım halinde",
-                "metric": "Engagement oranı"
-            }
-        ]
+        fields = {"name": product.name}
+        return [{key: value.format_map(fields) for key, value in test.items()} for test in _AB_TESTS_TEMPLATE]
     
     def _get_fallback_messaging_data(self, product: Product) -> Dict[str, Any]:
         """Varsayılan mesajlaşma verisi"""
@@ -985,121 +1425,326 @@ class MessagingGenerator(AIServiceBase):
             "marketing_messages": {
                 "value_proposition": f"{product.name} ile ihtiyaçlarınızı karşılayın"
             },
-            "analysis_timestamp": datetime.now().isoformat()
+            "analysis_timestamp": _now_iso()
         }
 
 
+@dataclass(frozen=True, slots=True)
+class StrategyResult:
+    """Kapsamlı strateji sonucu (API'de orjson ile doğrudan serileştirilir)"""
+    strategy_content: str
+    market_analysis: Dict[str, Any]
+    audience_analysis: Dict[str, Any]
+    pricing_analysis: Dict[str, Any]
+    messaging_analysis: Dict[str, Any]
+    confidence_score: float
+    expected_roi: float
+    implementation_difficulty: str
+    created_at: str
+
+
+# ROI, güven ve zorluk hesaplarının tabloları (tekil ve toplu hesap aynı değerleri kullanır)
+# Etiket kodları: bilinen etiketler 0-2, tanınmayan etiketler (ör. "YOK") 3
+_MARKET_SIZE_CODES = {label: code for code, label in enumerate(_MARKET_SIZE_LABELS)}
+_LEVEL_CODES = {label: code for code, label in enumerate(_LEVEL_LABELS)}
+_UNKNOWN_CODE = 3
+# [pazar büyüklüğü kodu, rekabet kodu] → ROI çarpanı (Küçük/Orta/Büyük/? × Düşük/Orta/Yüksek/?)
+_ROI_MULT_ARR = np.outer((0.8, 1.0, 1.2, 1.0), (1.3, 1.0, 0.8, 1.0))
+_ROI_MULT = tuple(map(tuple, _ROI_MULT_ARR.tolist()))
+MAX_EXPECTED_ROI = 0.6
+_CONFIDENCE_WEIGHTS = ((0.9, 0.6), (0.85, 0.7), (0.9, 0.75))  # (veri var, veri yok): pazar, hedef kitle, fiyat
+_DIFFICULTY_LABELS = ("easy", "easy", "medium", "hard")  # zorluk puanı (0-3) → etiket
+_DIFFICULTY_COMPETITION_POINTS = (0, 1, 2, 0)  # rekabet kodu → puan
+# [rekabet kodu, kanal sayısı 3'ü aşıyor mu] → zorluk etiketi
+_DIFFICULTY_LUT = tuple(
+    tuple(_DIFFICULTY_LABELS[points + many_channels] for many_channels in (0, 1))
+    for points in _DIFFICULTY_COMPETITION_POINTS
+)
+
+
+def _label_codes(labels: np.ndarray, codes: Dict[str, int]) -> np.ndarray:
+    """Etiket dizisini LUT indekslerine vektörel olarak çevir"""
+    labels = np.asarray(labels)
+    result = np.full(labels.shape, _UNKNOWN_CODE, dtype=np.intp)
+    for label, code in codes.items():
+        result[labels == label] = code
+    return result
+
+
+# Nihai strateji bölümleri ve çıktı sınırı (uzun yanıt gecikmeyi doğrusal artırır)
+_FINAL_STRATEGY_SECTIONS = "; ".join((
+    "1. Yönetici Özeti (2-3 cümle)",
+    "2. Pazar Pozisyonlama",
+    "3. Hedef Kitle ve Pazarlama Yaklaşımı",
+    "4. Fiyatlandırma ve Rekabet",
+    "5. Pazarlama ve İletişim Planı",
+    "6. Uygulama Adımları (öncelik sırasıyla)",
+    "7. Başarı Metrikleri",
+    "8. Riskler ve Önlemler",
+    "9. İlk 90 Günlük Eylem Planı"
+))
+_FINAL_STRATEGY_GENERATION_CONFIG = {"max_output_tokens": 1800, "temperature": 0.3, "top_p": 0.9}
+
+# Gemini yanıt veremediğinde kullanılan strateji metinleri (içe aktarımda bir kez derlenir)
+_FALLBACK_STRATEGY_TEMPLATE = string.Template("""
+        # $name Satış Stratejisi
+        
+        ## 1. Yönetici Özeti
+        $name için geliştirilen bu strateji, $market_size büyüklükteki pazarda 
+        $segment hedef kitleye odaklanarak $rec_price TL fiyat noktasında konumlanmayı hedeflemektedir.
+        
+        ## 2. Pazar Pozisyonlama
+        - **Pazar Konumu**: $competition rekabet ortamında kalite odaklı konumlanma
+        - **Değer Önerisi**: Kaliteli $category ürünü, uygun fiyat garantisi ile
+        - **Rekabet Avantajı**: Müşteri odaklı yaklaşım ve güvenilir hizmet
+        
+        ## 3. Hedef Kitle Stratejisi
+        - **Ana Hedef**: $segment
+        - **Pazarlama Kanalları**: Online platformlar (Instagram, Google Ads, Facebook)
+        - **Mesajlaşma**: Kalite, güvenilirlik ve uygun fiyat vurgusu
+        
+        ## 4. Fiyatlandırma Stratejisi
+        - **Ana Fiyat**: $rec_price TL
+        - **Kar Marjı**: %$margin_pct
+        - **Promosyon**: İlk müşterilere %15 indirim
+        
+        ## 5. Pazarlama Planı
+        - **Dijital Pazarlama**: Sosyal medya reklamları ve Google Ads
+        - **İçerik Stratejisi**: Ürün tanıtım videoları ve müşteri yorumları
+        - **Influencer İşbirliği**: Sektör influencerları ile çalışma
+        
+        ## 6. Uygulama Adımları
+        1. Ürün fiyatını $rec_price TL olarak belirle
+        2. Sosyal medya hesaplarını optimize et
+        3. Google Ads kampanyası başlat
+        4. Müşteri geri bildirim sistemi kur
+        5. Performans takip sistemini aktive et
+        
+        ## 7. Başarı Metrikleri
+        - **Satış Hedefi**: İlk 3 ayda 100 adet satış
+        - **Dönüşüm Oranı**: %2-3 hedefi
+        - **Müşteri Memnuniyeti**: %85+ hedefi
+        - **ROI**: %$margin_pct kar marjı
+        
+        ## 8. Risk Analizi
+        - **Yüksek Rekabet**: Fiyat avantajı ve kalite ile karşıla
+        - **Düşük Talep**: Pazarlama bütçesini artır
+        - **Maliyet Artışı**: Tedarikçi alternatiflerini değerlendir
+        
+        ## 9. İlk 90 Günlük Plan
+        **1-30 Gün**: Ürün lansmanı ve ilk pazarlama kampanyaları
+        **31-60 Gün**: Müşteri geri bildirimlerine göre optimizasyon
+        **61-90 Gün**: Performans değerlendirmesi ve strateji güncellemesi
+        """)
+_SIMPLE_FALLBACK_STRATEGY_TEMPLATE = string.Template("""
+        # $name Basit Satış Stratejisi
+        
+        ## Genel Bakış
+        $name ürününüz için temel satış stratejisi hazırlanmıştır.
+        
+        ## Fiyatlandırma
+        - Önerilen satış fiyatı: $rec_price TL
+        - Hedef kar marjı: %40
+        
+        ## Pazarlama
+        - Online satış kanallarına odaklanın
+        - Sosyal medya reklamları yapın
+        - Müşteri yorumlarını toplayın
+        
+        ## Uygulama
+        1. Fiyatı belirleyin
+        2. Online mağaza açın
+        3. Pazarlama kampanyası başlatın
+        4. Satış sonuçlarını takip edin
+        """)
+
+
 class StrategyBuilder(AIServiceBase):
     """Merkezi strateji oluşturma motoru"""
     
     def __init__(self):
         super().__init__()
-        self.market_analyzer = MarketAnalyzer()
-        self.customer_segmenter = CustomerSegmenter()
-        self.pricing_advisor = PricingAdvisor()
-        self.messaging_generator = MessagingGenerator()
-        self.rag_engine = RAGEmbeddingEngine()
+        # Alt servisler süreç genelinde paylaşılır (HTTP oturumları ve modeller tek kez yüklenir)
+        self.market_analyzer = get_market_analyzer()
+        self.customer_segmenter = get_customer_segmenter()
+        self.pricing_advisor = get_pricing_advisor()
+        self.messaging_generator = get_messaging_generator()
+        self.rag_engine = get_rag_engine()
+        # Aynı (kategori, ürün) için PDF bağlamı: sonuçlar kısa süre saklanır, eşzamanlı aramalar birleştirilir
+        self._rag_cache: TTLCache = TTLCache(maxsize=512, ttl=300)
+        self._rag_inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+    
+    async def _get_pdf_context(self, category: str, product_name: str) -> str:
+        """PDF kütüphanesi bağlamını al (önbellekli, aynı anda gelen özdeş istekler tek aramaya düşer)"""
+        key = (category, product_name)
+        cached = self._rag_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        future = self._rag_inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self.rag_engine.get_pdf_context_for_strategy(category, product_name))
+            self._rag_inflight[key] = future
+            future.add_done_callback(functools.partial(self._on_pdf_context_done, key))
+        # Bekleyenlerden biri iptal edilirse ortak arama sürmeye devam eder
+        return await asyncio.shield(future)
+    
+    def _on_pdf_context_done(self, key: Tuple[str, str], future: asyncio.Future):
+        """Tamamlanan PDF aramasını bekleyenlerden çıkar, bağlam bulunduysa önbelleğe yaz"""
+        self._rag_inflight.pop(key, None)
+        # RAG hataları boş metin olarak döner; geçici bir hata 5 dk "bağlam yok" diye önbelleklenmesin
+        if not future.cancelled() and future.exception() is None and future.result():
+            self._rag_cache[key] = future.result()
     
-    async def build_comprehensive_strategy(self, product: Product) -> Dict[str, Any]:
+    async def build_comprehensive_strategy(self, product: Product) -> StrategyResult:
         """Kapsamlı satış stratejisi oluştur"""
+        strategy = None
+        async for stage, data in self.stream_comprehensive_strategy(product):
+            strategy = data
+        return strategy
+    
+    async def stream_comprehensive_strategy(self, product: Product) -> AsyncIterator[Tuple[str, Any]]:
+        """Kapsamlı strateji oluştur; her aşama bittikçe (aşama, sonuç), nihai metni ise geldikçe
+        ("strategy_chunk", parça) olarak üret, en son tam stratejiyi ver"""
+        # 0. PDF Kütüphanesinden ilgili stratejileri al (analizlere bağımlı değil; arka planda çalışır)
+        logger.info("📚 PDF kütüphanesinden ilgili stratejiler aranıyor...")
+        pdf_task = asyncio.create_task(self._get_pdf_context(product.category, product.name))
+        # Tüm aşamalar ve nihai sonuç aynı zaman damgasını kullanır
+        timestamp_token = _strategy_timestamp.set(datetime.now().isoformat())
         try:
-            print(f"🔄 {product.name} için AI analizi başlatılıyor...")
-            
-            # 0. PDF Kütüphanesinden ilgili stratejileri al
-            print("📚 PDF kütüphanesinden ilgili stratejiler aranıyor...")
-            pdf_context = await self.rag_engine.get_pdf_context_for_strategy(
-                product.category, 
-                product.name
-            )
-            if pdf_context:
-                print(f"✅ {len(pdf_context.split('Kaynak'))} PDF kaynağından bilgi alındı")
-            else:
-                print("ℹ️ PDF kütüphanesinde ilgili strateji bulunamadı")
+            logger.info("🔄 %s için AI analizi başlatılıyor...", product.name)
             
             # 1. Pazar analizi
-            print("📊 Pazar analizi yapılıyor...")
-            market_data = await self.market_analyzer.analyze_market(product)
+            logger.info("📊 Pazar analizi yapılıyor...")
+            market_data, market_prompt = await self.market_analyzer.prepare_market_analysis(product)
             
             # 2. Hedef kitle analizi
-            print("🎯 Hedef kitle analizi yapılıyor...")
-            audience_data = await self.customer_segmenter.analyze_target_audience(product, market_data)
+            logger.info("🎯 Hedef kitle analizi yapılıyor...")
+            audience_data, audience_prompt = self.customer_segmenter.prepare_target_audience(product, market_data)
             
             # 3. Fiyatlandırma analizi
-            print("💰 Fiyatlandırma analizi yapılıyor...")
-            pricing_data = await self.pricing_advisor.analyze_pricing(product, market_data, audience_data)
+            logger.info("💰 Fiyatlandırma analizi yapılıyor...")
+            pricing_data, pricing_prompt = await self.pricing_advisor.prepare_pricing(product, market_data, audience_data)
+            
+            # Üç analizin Gemini içgörüleri tek istekte
+            pending = [
+                (market_data, "market_insights", market_prompt),
+                (audience_data, "audience_insights", audience_prompt),
+                (pricing_data, "pricing_strategy", pricing_prompt)
+            ]
+            prompts = {key: prompt for _, key, prompt in pending if prompt is not None}
+            if prompts:
+                logger.info("🧠 Pazar, hedef kitle ve fiyat içgörüleri tek Gemini isteğiyle alınıyor...")
+                insights = await self._call_gemini_json(prompts)
+                for data, key, prompt in pending:
+                    if prompt is not None:
+                        data[key] = insights[key]
+            
+            yield "market_analysis", market_data
+            yield "audience_analysis", audience_data
+            yield "pricing_analysis", pricing_data
             
             # 4. Mesajlaşma stratejisi
-            print("✍️ Mesajlaşma stratejisi oluşturuluyor...")
+            logger.info("✍️ Mesajlaşma stratejisi oluşturuluyor...")
             messaging_data = await self.messaging_generator.generate_messaging_strategy(
                 product, market_data, audience_data, pricing_data
             )
+            yield "messaging_analysis", messaging_data
             
-            # 5. Nihai strateji oluşturma
-            print("🧠 Nihai strateji oluşturuluyor...")
-            final_strategy = await self._generate_final_strategy(
+            pdf_context = await pdf_task
+            if pdf_context:
+                logger.info("✅ %s PDF kaynağından bilgi alındı", len(pdf_context.split('Kaynak')))
+            else:
+                logger.info("ℹ️ PDF kütüphanesinde ilgili strateji bulunamadı")
+            
+            # 5. Nihai strateji oluşturma (metin geldikçe parça parça iletilir)
+            logger.info("🧠 Nihai strateji oluşturuluyor...")
+            prompt = self._final_strategy_prompt(
                 product, market_data, audience_data, pricing_data, messaging_data, pdf_context
             )
+            chunks: List[str] = []
+            error_text: Optional[str] = None
+            async for chunk in self._call_gemini_stream(prompt, _FINAL_STRATEGY_GENERATION_CONFIG):
+                if isinstance(chunk, _GeminiErrorText):
+                    # Hata/zaman aşımı metni akışa verilmez; nihai strateji yedek şablondan gelir
+                    error_text = chunk
+                    continue
+                chunks.append(chunk)
+                yield "strategy_chunk", chunk
+            final_strategy = self._finalize_strategy_text(
+                error_text if error_text is not None else "".join(chunks),
+                product, market_data, audience_data, pricing_data
+            )
             
-            print("✅ AI analizi tamamlandı!")
+            logger.info("✅ AI analizi tamamlandı!")
             
-            return {
-                "strategy_content": final_strategy,
-                "market_analysis": market_data,
-                "audience_analysis": audience_data,
-                "pricing_analysis": pricing_data,
-                "messaging_analysis": messaging_data,
-                "confidence_score": self._calculate_confidence_score(market_data, audience_data, pricing_data),
-                "expected_roi": self._estimate_roi(pricing_data, market_data),
-                "implementation_difficulty": self._assess_difficulty(market_data, audience_data),
-                "created_at": datetime.now().isoformat()
-            }
+            yield "comprehensive_strategy", StrategyResult(
+                strategy_content=final_strategy,
+                market_analysis=market_data,
+                audience_analysis=audience_data,
+                pricing_analysis=pricing_data,
+                messaging_analysis=messaging_data,
+                confidence_score=self._calculate_confidence_score(market_data, audience_data, pricing_data),
+                expected_roi=self._estimate_roi(pricing_data, market_data),
+                implementation_difficulty=self._assess_difficulty(market_data, audience_data),
+                created_at=_now_iso()
+            )
             
         except Exception as e:
-            print(f"❌ Strateji oluşturma hatası: {e}")
+            logger.error("❌ Strateji oluşturma hatası: %s", e)
             raise e
+        finally:
+            # Erken çıkışta (hata ya da tüketicinin akışı bırakması) arka plandaki PDF aramasını durdur
+            if not pdf_task.done():
+                pdf_task.cancel()
+            try:
+                _strategy_timestamp.reset(timestamp_token)
+            except ValueError:
+                # Akış başka bir bağlamda kapatıldıysa (ör. çöp toplayıcı) sıfırlanacak değer yok
+                pass
 
     async def analyze_market_only(self, product):
         """Sadece pazar analizi yap"""
         try:
-            print(f"📊 Pazar analizi başlatılıyor: {product.name}")
+            logger.info("📊 Pazar analizi başlatılıyor: %s", product.name)
             market_data = await self.market_analyzer.analyze_market(product)
-            print(f"✅ Pazar analizi tamamlandı: {product.name}")
+            logger.info("✅ Pazar analizi tamamlandı: %s", product.name)
             return market_data
         except Exception as e:
-            print(f"❌ Pazar analizi hatası: {e}")
+            logger.error("❌ Pazar analizi hatası: %s", e)
             raise e
 
     async def analyze_customer_only(self, product):
         """Sadece hedef kitle analizi yap"""
         try:
-            print(f"🎯 Hedef kitle analizi başlatılıyor: {product.name}")
+            logger.info("🎯 Hedef kitle analizi başlatılıyor: %s", product.name)
             # Basit pazar verisi oluştur (tam analiz için gerekli)
             basic_market_data = {"market_size": "Orta", "competition_level": "Orta", "demand_score": 0.7}
             audience_data = await self.customer_segmenter.analyze_target_audience(product, basic_market_data)
-            print(f"✅ Hedef kitle analizi tamamlandı: {product.name}")
+            logger.info("✅ Hedef kitle analizi tamamlandı: %s", product.name)
             return audience_data
         except Exception as e:
-            print(f"❌ Hedef kitle analizi hatası: {e}")
+            logger.error("❌ Hedef kitle analizi hatası: %s", e)
             raise e
 
     async def analyze_pricing_only(self, product):
         """Sadece fiyatlandırma analizi yap"""
         try:
-            print(f"💰 Fiyatlandırma analizi başlatılıyor: {product.name}")
+            logger.info("💰 Fiyatlandırma analizi başlatılıyor: %s", product.name)
             # Basit veriler oluştur
             basic_market_data = {"market_size": "Orta", "competition_level": "Orta", "demand_score": 0.7}
             basic_audience_data = {"primary_segment": "Genel Tüketici", "price_sensitivity": "Orta"}
             pricing_data = await self.pricing_advisor.analyze_pricing(product, basic_market_data, basic_audience_data)
-            print(f"✅ Fiyatlandırma analizi tamamlandı: {product.name}")
+            logger.info("✅ Fiyatlandırma analizi tamamlandı: %s", product.name)
             return pricing_data
         except Exception as e:
-            print(f"❌ Fiyatlandırma analizi hatası: {e}")
+            logger.error("❌ Fiyatlandırma analizi hatası: %s", e)
             raise e
 
     async def analyze_messaging_only(self, product):
         """Sadece mesajlaşma stratejisi analizi yap"""
         try:
-            print(f"✍️ Mesajlaşma analizi başlatılıyor: {product.name}")
+            logger.info("✍️ Mesajlaşma analizi başlatılıyor: %s", product.name)
             # Basit veriler oluştur
             basic_market_data = {"market_size": "Orta", "competition_level": "Orta", "demand_score": 0.7}
             basic_audience_data = {"primary_segment": "Genel Tüketici", "interests": ["Teknoloji"]}
@@ -1107,24 +1752,21 @@ class StrategyBuilder(AIServiceBase):
             messaging_data = await self.messaging_generator.generate_messaging_strategy(
                 product, basic_market_data, basic_audience_data, basic_pricing_data
             )
-            print(f"✅ Mesajlaşma analizi tamamlandı: {product.name}")
+            logger.info("✅ Mesajlaşma analizi tamamlandı: %s", product.name)
             return messaging_data
         except Exception as e:
-            print(f"❌ Mesajlaşma analizi hatası: {e}")
+            logger.error("❌ Mesajlaşma analizi hatası: %s", e)
             raise e
 
     async def generate_final_strategy(self, product, combined_data):
         """Analiz sonuçlarından nihai stratejiyi oluştur"""
         try:
-            print(f"🚀 Nihai strateji oluşturuluyor: {product.name}")
+            logger.info("🚀 Nihai strateji oluşturuluyor: %s", product.name)
             
             # PDF context al
             pdf_context = ""
             if hasattr(self, 'rag_engine') and self.rag_engine:
-                pdf_context = await self.rag_engine.get_pdf_context_for_strategy(
-                    product.category, 
-                    product.name
-                )
+                pdf_context = await self._get_pdf_context(product.category, product.name)
             
             final_strategy = await self._generate_final_strategy(
                 product, 
@@ -1135,7 +1777,7 @@ class StrategyBuilder(AIServiceBase):
                 pdf_context
             )
             
-            print(f"✅ Nihai strateji oluşturuldu: {product.name}")
+            logger.info("✅ Nihai strateji oluşturuldu: %s", product.name)
             
             return {
                 "strategy_content": final_strategy,
@@ -1152,66 +1794,53 @@ class StrategyBuilder(AIServiceBase):
                     combined_data.get("market_analysis", {}),
                     combined_data.get("customer_analysis", {})
                 ),
-                "created_at": datetime.now().isoformat()
+                "created_at": _now_iso()
             }
             
         except Exception as e:
-            print(f"❌ Nihai strateji oluşturma hatası: {e}")
+            logger.error("❌ Nihai strateji oluşturma hatası: %s", e)
             raise e
     
     async def _generate_final_strategy(self, product: Product, market_data: Dict, audience_data: Dict, 
                                      pricing_data: Dict, messaging_data: Dict, pdf_context: str = "") -> str:
         """Gemini ile nihai strateji metni oluştur"""
-        
-        prompt = f"""
-        ÜRÜN BİLGİLERİ:
-        - Ürün Adı: {product.name}
-        - Kategori: {product.category}
-        - Açıklama: {product.description}
-        - Maliyet Fiyatı: {product.cost_price} TL
-        
-        PAZAR ANALİZİ:
-        - Pazar Büyüklüğü: {market_data.get('market_size', 'Orta')}
-        - Rekabet Seviyesi: {market_data.get('competition_level', 'Orta')}
-        - Talep Skoru: {market_data.get('demand_score', 0.6)}
-        - Büyüme Potansiyeli: {market_data.get('growth_potential', 'Orta')}
-        
-        HEDEF KİTLE:
-        - Ana Segment: {audience_data.get('primary_segment', 'Genel tüketiciler')}
-        - Pazarlama Kanalları: {', '.join([ch.get('platform', '') for ch in audience_data.get('marketing_channels', [])])}
-        
-        FİYATLANDIRMA:
-        - Önerilen Fiyat: {pricing_data.get('recommended_price', 100)} TL
-        - Kar Marjı: %{(pricing_data.get('profit_margin', 0.4) * 100):.0f}
-        - Rekabet Pozisyonu: {pricing_data.get('competitive_position', 'competitive')}
-        
-        MESAJLAŞMA:
-        - Ana Mesajlar: {', '.join(messaging_data.get('key_messages', ['Kalite', 'Güvenilirlik']))}
-        - Ses Tonu: {messaging_data.get('tone_of_voice', {}).get('tone', 'Profesyonel')}
-        
-        {'ÖNCEDEN YÜKLENMIŞ STRATEJİ BİLGİLERİ (PDF KÜTÜPHANE):' if pdf_context else ''}
-        {pdf_context if pdf_context else ''}
-        {'Yukarıdaki kaynaklardan elde ettiğin bilgileri de dikkate alarak,' if pdf_context else ''} Bu verilere dayanarak {product.name} için kapsamlı ve uygulanabilir bir satış stratejisi oluştur. 
-        Strateji şu bölümleri içermeli:
-        
-        1. **Yönetici Özeti** (2-3 cümle)
-        2. **Pazar Pozisyonlama Stratejisi**
-        3. **Hedef Kitle ve Pazarlama Yaklaşımı**
-        4. **Fiyatlandırma ve Rekabet Stratejisi**
-        5. **Pazarlama ve İletişim Planı**
-        6. **Uygulama Adımları** (öncelik sırasına göre)
-        7. **Başarı Metrikleri ve Takip**
-        8. **Risk Analizi ve Önlemler**
-        9. **İlk 90 Günlük Eylem Planı**
-        
-        Stratejiyi Türkçe, profesyonel, somut ve hemen uygulanabilir şekilde yaz. 
-        Her bölümde spesifik öneriler ve sayısal hedefler ver.
-        """
-        
-        strategy_text = await self._call_gemini(prompt)
-        
-        # Eğer Gemini yanıt veremezse fallback strateji
-        if not strategy_text or "hata" in strategy_text.lower():
+        prompt = self._final_strategy_prompt(
+            product, market_data, audience_data, pricing_data, messaging_data, pdf_context
+        )
+        strategy_text = await self._call_gemini(prompt, generation_config=_FINAL_STRATEGY_GENERATION_CONFIG)
+        return self._finalize_strategy_text(strategy_text, product, market_data, audience_data, pricing_data)
+    
+    def _final_strategy_prompt(self, product: Product, market_data: Dict, audience_data: Dict,
+                               pricing_data: Dict, messaging_data: Dict, pdf_context: str = "") -> str:
+        """Nihai strateji için Gemini istemi"""
+        # Birleştirme ve yüzde hesapları istem metninden önce bir kez yapılır
+        channels = ', '.join(ch.get('platform', '') for ch in audience_data.get('marketing_channels', ()))
+        key_messages = ', '.join(messaging_data.get('key_messages') or ('Kalite', 'Güvenilirlik'))
+        margin_pct = round(pricing_data.get('profit_margin', 0.4) * 100)
+        tone = messaging_data.get('tone_of_voice', {}).get('tone', 'Profesyonel')
+        # PDF kaynak bloğu yalnızca bağlam varsa eklenir
+        pdf_block = f"""
+        
+        PDF KÜTÜPHANESİ KAYNAKLARI (dikkate al):
+        {pdf_context}""" if pdf_context else ""
+        
+        return f"""{ProductContext.of(product).product_block}
+        
+        PAZAR: büyüklük {market_data.get('market_size', 'Orta')}, rekabet {market_data.get('competition_level', 'Orta')}, talep {market_data.get('demand_score', 0.6)}, büyüme {market_data.get('growth_potential', 'Orta')}
+        HEDEF KİTLE: {audience_data.get('primary_segment', 'Genel tüketiciler')}; kanallar: {channels}
+        FİYAT: {pricing_data.get('recommended_price', 100)} TL, marj %{margin_pct}, pozisyon {pricing_data.get('competitive_position', 'competitive')}
+        MESAJ: {key_messages}; ton: {tone}{pdf_block}
+        
+        {product.name} için bu verilere dayalı satış stratejisi yaz. Bölümler:
+        {_FINAL_STRATEGY_SECTIONS}
+        
+        Türkçe, somut ve uygulanabilir yaz; her bölümde sayısal hedef ver."""
+    
+    def _finalize_strategy_text(self, strategy_text: str, product: Product, market_data: Dict,
+                                audience_data: Dict, pricing_data: Dict) -> str:
+        """Gemini metnini doğrula; kullanılamazsa fallback strateji metnini döndür"""
+        # Eğer Gemini yanıt veremezse (hata ya da zaman aşımı) fallback strateji
+        if not strategy_text or "hata" in strategy_text.lower() or strategy_text == _GEMINI_TIMEOUT_MESSAGE:
             return self._create_fallback_strategy_text(product, market_data, audience_data, pricing_data)
         
         return strategy_text
@@ -1222,154 +1851,116 @@ class StrategyBuilder(AIServiceBase):
         recommended_price = pricing_data.get('recommended_price', product.cost_price * 1.4)
         primary_segment = audience_data.get('primary_segment', 'hedef kitle')
         
-        return f"""
-        # {product.name} Satış Stratejisi
-        
-        ## 1. Yönetici Özeti
-        {product.name} için geliştirilen bu strateji, {market_data.get('market_size', 'orta')} büyüklükteki pazarda 
-        {primary_segment} hedef kitleye odaklanarak {recommended_price} TL fiyat noktasında konumlanmayı hedeflemektedir.
-        
-        ## 2. Pazar Pozisyonlama
-        - **Pazar Konumu**: {market_data.get('competition_level', 'Orta')} rekabet ortamında kalite odaklı konumlanma
-        - **Değer Önerisi**: Kaliteli {product.category} ürünü, uygun fiyat garantisi ile
-        - **Rekabet Avantajı**: Müşteri odaklı yaklaşım ve güvenilir hizmet
-        
-        ## 3. Hedef Kitle Stratejisi
-        - **Ana Hedef**: {primary_segment}
-        - **Pazarlama Kanalları**: Online platformlar (Instagram, Google Ads, Facebook)
-        - **Mesajlaşma**: Kalite, güvenilirlik ve uygun fiyat vurgusu
-        
-        ## 4. Fiyatlandırma Stratejisi
-        - **Ana Fiyat**: {recommended_price} TL
-        - **Kar Marjı**: %{(pricing_data.get('profit_margin', 0.4) * 100):.0f}
-        - **Promosyon**: İlk müşterilere %15 indirim
-        
-        ## 5. Pazarlama Planı
-        - **Dijital Pazarlama**: Sosyal medya reklamları ve Google Ads
-        - **İçerik Stratejisi**: Ürün tanıtım videoları ve müşteri yorumları
-        - **Influencer İşbirliği**: Sektör influencerları ile çalışma
-        
-        ## 6. Uygulama Adımları
-        1. Ürün fiyatını {recommended_price} TL olarak belirle
-        2. Sosyal medya hesaplarını optimize et
-        3. Google Ads kampanyası başlat
-        4. Müşteri geri bildirim sistemi kur
-        5. Performans takip sistemini aktive et
-        
-        ## 7. Başarı Metrikleri
-        - **Satış Hedefi**: İlk 3 ayda 100 adet satış
-        - **Dönüşüm Oranı**: %2-3 hedefi
-        - **Müşteri Memnuniyeti**: %85+ hedefi
-        - **ROI**: %{(pricing_data.get('profit_margin', 0.4) * 100):.0f} kar marjı
-        
-        ## 8. Risk Analizi
-        - **Yüksek Rekabet**: Fiyat avantajı ve kalite ile karşıla
-        - **Düşük Talep**: Pazarlama bütçesini artır
-        - **Maliyet Artışı**: Tedarikçi alternatiflerini değerlendir
-        
-        ## 9. İlk 90 Günlük Plan
-        **1-30 Gün**: Ürün lansmanı ve ilk pazarlama kampanyaları
-        **31-60 Gün**: Müşteri geri bildirimlerine göre optimizasyon
-        **61-90 Gün**: Performans değerlendirmesi ve strateji güncellemesi
-        """
+        return _FALLBACK_STRATEGY_TEMPLATE.substitute(
+            name=product.name,
+            category=product.category,
+            market_size=market_data.get('market_size', 'orta'),
+            competition=market_data.get('competition_level', 'Orta'),
+            segment=primary_segment,
+            rec_price=recommended_price,
+            margin_pct=f"{pricing_data.get('profit_margin', 0.4) * 100:.0f}"
+        )
     
     def _calculate_confidence_score(self, market_data: Dict, audience_data: Dict, pricing_data: Dict) -> float:
         """Strateji güven skorunu hesapla"""
-        scores = []
-        
-        # Pazar verisi kalitesi
-        if market_data.get('trend_score', 0) > 0:
-            scores.append(0.9)
-        else:
-            scores.append(0.6)
-        
-        # Hedef kitle verisi
-        if audience_data.get('primary_segment'):
-            scores.append(0.85)
-        else:
-            scores.append(0.7)
-        
-        # Fiyat verisi
-        if pricing_data.get('recommended_price'):
-            scores.append(0.9)
-        else:
-            scores.append(0.75)
-        
+        # Pazar verisi kalitesi, hedef kitle verisi ve fiyat verisi
+        available = (
+            market_data.get('trend_score', 0) > 0,
+            bool(audience_data.get('primary_segment')),
+            bool(pricing_data.get('recommended_price'))
+        )
+        scores = [present if has_data else missing
+                  for has_data, (present, missing) in zip(available, _CONFIDENCE_WEIGHTS)]
         return round(sum(scores) / len(scores), 2)
     
     def _estimate_roi(self, pricing_data: Dict, market_data: Dict) -> float:
         """ROI tahmini"""
         base_roi = pricing_data.get('profit_margin', 0.4)
         
-        # Pazar büyüklüğüne göre ayarlama
-        market_size = market_data.get('market_size', 'Orta')
-        if market_size == 'Büyük':
-            base_roi *= 1.2
-        elif market_size == 'Küçük':
-            base_roi *= 0.8
-        
-        # Rekabet seviyesine göre ayarlama
-        competition_level = market_data.get('competition_level', 'Orta')
-        if competition_level == 'Yüksek':
-            base_roi *= 0.8
-        elif competition_level == 'Düşük':
-            base_roi *= 1.3
+        # Pazar büyüklüğüne ve rekabet seviyesine göre ayarlama (önceden hesaplanmış 2B tablo)
+        size_code = _MARKET_SIZE_CODES.get(market_data.get('market_size', 'Orta'), _UNKNOWN_CODE)
+        competition_code = _LEVEL_CODES.get(market_data.get('competition_level', 'Orta'), _UNKNOWN_CODE)
+        base_roi *= _ROI_MULT[size_code][competition_code]
         
-        return round(min(base_roi, 0.6), 2)  # Maksimum %60 ROI
+        return round(min(base_roi, MAX_EXPECTED_ROI), 2)  # Maksimum %60 ROI
     
     def _assess_difficulty(self, market_data: Dict, audience_data: Dict) -> str:
         """Uygulama zorluğu değerlendirmesi"""
-        difficulty_score = 0
-        
-        # Rekabet seviyesi
-        competition_level = market_data.get('competition_level', 'Orta')
-        if competition_level == 'Yüksek':
-            difficulty_score += 2
-        elif competition_level == 'Orta':
-            difficulty_score += 1
-        
-        # Hedef kitle karmaşıklığı
-        channels = len(audience_data.get('marketing_channels', []))
-        if channels > 3:
-            difficulty_score += 1
-        
-        if difficulty_score <= 1:
-            return 'easy'
-        elif difficulty_score <= 2:
-            return 'medium'
-        else:
-            return 'hard'
+        # Rekabet seviyesi ve hedef kitle karmaşıklığı (kanal sayısı)
+        competition_code = _LEVEL_CODES.get(market_data.get('competition_level', 'Orta'), _UNKNOWN_CODE)
+        many_channels = len(audience_data.get('marketing_channels', [])) > 3
+        return _DIFFICULTY_LUT[competition_code][many_channels]
+    
+    @staticmethod
+    def score_batch(market_sizes: np.ndarray, competition_levels: np.ndarray, profit_margins: np.ndarray,
+                    trend_scores: np.ndarray, has_primary_segment: np.ndarray,
+                    has_recommended_price: np.ndarray, channel_counts: np.ndarray) -> Dict[str, np.ndarray]:
+        """Çok sayıda ürünün güven skoru, ROI ve zorluk değerlendirmesini tek seferde vektörel hesapla"""
+        # Güven skoru: üç veri kaynağının (var/yok) ağırlıklarının ortalaması
+        available = (np.asarray(trend_scores) > 0, np.asarray(has_primary_segment, dtype=bool),
+                     np.asarray(has_recommended_price, dtype=bool))
+        confidence = sum(np.where(has_data, present, missing)
+                         for has_data, (present, missing) in zip(available, _CONFIDENCE_WEIGHTS)) / len(available)
+        
+        # ROI: kar marjı × 2B çarpan tablosu, üstten sınırlı
+        competition_codes = _label_codes(competition_levels, _LEVEL_CODES)
+        roi = (np.asarray(profit_margins, dtype=np.float64)
+               * _ROI_MULT_ARR[_label_codes(market_sizes, _MARKET_SIZE_CODES), competition_codes])
+        np.minimum(roi, MAX_EXPECTED_ROI, out=roi)
+        
+        # Zorluk: rekabet puanı + kanal sayısı 3'ü aşarsa 1 puan
+        difficulty_scores = (np.asarray(_DIFFICULTY_COMPETITION_POINTS)[competition_codes]
+                             + (np.asarray(channel_counts) > 3))
+        
+        return {
+            "confidence_score": np.round(confidence, 2),
+            "expected_roi": np.round(roi, 2),
+            "implementation_difficulty": np.asarray(_DIFFICULTY_LABELS)[difficulty_scores]
+        }
     
     async def _generate_fallback_strategy(self, product: Product) -> Dict[str, Any]:
         """Hata durumunda basit strateji"""
         recommended_price = float(product.cost_price) * 1.4
         
-        fallback_content = f"""
-        # {product.name} Basit Satış Stratejisi
-        
-        ## Genel Bakış
-        {product.name} ürününüz için temel satış stratejisi hazırlanmıştır.
-        
-        ## Fiyatlandırma
-        - Önerilen satış fiyatı: {recommended_price:.2f} TL
-        - Hedef kar marjı: %40
-        
-        ## Pazarlama
-        - Online satış kanallarına odaklanın
-        - Sosyal medya reklamları yapın
-        - Müşteri yorumlarını toplayın
-        
-        ## Uygulama
-        1. Fiyatı belirleyin
-        2. Online mağaza açın
-        3. Pazarlama kampanyası başlatın
-        4. Satış sonuçlarını takip edin
-        """
+        fallback_content = _SIMPLE_FALLBACK_STRATEGY_TEMPLATE.substitute(
+            name=product.name, rec_price=f"{recommended_price:.2f}"
+        )
         
         return {
             "strategy_content": fallback_content,
             "confidence_score": 0.6,
             "expected_roi": 0.3,
             "implementation_difficulty": "medium",
-            "created_at": datetime.now().isoformat()
-        } 
\ No newline at end of file
+            "created_at": _now_iso()
+        } 
+
+
+# Süreç genelinde paylaşılan servis örnekleri (ilk kullanımda oluşturulur)
+@functools.lru_cache(maxsize=1)
+def get_market_analyzer() -> MarketAnalyzer:
+    """Paylaşılan MarketAnalyzer örneği"""
+    return MarketAnalyzer()
+
+
+@functools.lru_cache(maxsize=1)
+def get_customer_segmenter() -> CustomerSegmenter:
+    """Paylaşılan CustomerSegmenter örneği"""
+    return CustomerSegmenter()
+
+
+@functools.lru_cache(maxsize=1)
+def get_pricing_advisor() -> PricingAdvisor:
+    """Paylaşılan PricingAdvisor örneği"""
+    return PricingAdvisor()
+
+
+@functools.lru_cache(maxsize=1)
+def get_messaging_generator() -> MessagingGenerator:
+    """Paylaşılan MessagingGenerator örneği"""
+    return MessagingGenerator()
+
+
+@functools.lru_cache(maxsize=1)
+def get_strategy_builder() -> StrategyBuilder:
+    """Paylaşılan StrategyBuilder örneği"""
+    return StrategyBuilder()
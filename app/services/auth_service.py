@@ -2,12 +2,15 @@
 Authentication Service
 """
 
+import asyncio
+import hashlib
+import hmac
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+from cachetools import TLRUCache
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-import warnings
-warnings.filterwarnings("ignore", category=UserWarning, module="passlib")
+import bcrypt
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -17,10 +20,24 @@ from app.core.database import get_db
 from app.models.user import User
 from app.schemas.auth import UserCreate, TokenData
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing (passlib'in varsayılanıyla aynı maliyet; mevcut hash'ler geçerli kalır)
+_BCRYPT_ROUNDS = 12
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
+# Doğrulanmış token içerikleri: blake2b(token) -> (kullanıcı adı, kullanıcı id, exp)
+# Kayıt en fazla 30 sn, her durumda token'ın süresi dolana kadar tutulur
+_TOKEN_CACHE_TTL = 30
+_token_cache: TLRUCache = TLRUCache(
+    maxsize=10_000,
+    ttu=lambda _key, value, now: min(now + _TOKEN_CACHE_TTL, value[2]),
+    timer=time.time
+)
+
+
+def _token_digest(token: str) -> str:
+    """Token'ın önbellek anahtarı (ham token bellekte tutulmaz)"""
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
 
 class AuthService:
     """Authentication business logic"""
@@ -30,11 +47,11 @@ class AuthService:
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Şifre doğrulama"""
-        return pwd_context.verify(plain_password, hashed_password)
+        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
     
     def get_password_hash(self, password: str) -> str:
         """Şifre hash'leme"""
-        return pwd_context.hash(password)
+        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=_BCRYPT_ROUNDS)).decode()
     
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Kullanıcı adına göre kullanıcı getir"""
@@ -49,7 +66,8 @@ class AuthService:
         user = self.get_user_by_username(username)
         if not user:
             return None
-        if not self.verify_password(password, user.hashed_password):
+        # bcrypt bilinçli olarak yavaştır; event loop'u bloklamaması için thread'de çalışır
+        if not await asyncio.to_thread(self.verify_password, password, user.hashed_password):
             return None
         return user
     
@@ -64,7 +82,7 @@ class AuthService:
             raise ValueError("Bu e-posta adresi zaten kullanılıyor")
         
         # Yeni kullanıcı oluştur
-        hashed_password = self.get_password_hash(user_data.password)
+        hashed_password = await asyncio.to_thread(self.get_password_hash, user_data.password)
         db_user = User(
             email=user_data.email,
             username=user_data.username,
@@ -102,17 +120,36 @@ class AuthService:
             headers={"WWW-Authenticate": "Bearer"},
         )
         
-        try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-            username: str = payload.get("sub")
-            if username is None:
+        token_key = _token_digest(token)
+        cached: Optional[Tuple[str, Optional[int], float]] = _token_cache.get(token_key)
+        if cached is not None:
+            token_data = TokenData(username=cached[0], user_id=cached[1])
+        else:
+            try:
+                payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+                username: str = payload.get("sub")
+                if username is None:
+                    raise credentials_exception
+                token_data = TokenData(username=username, user_id=payload.get("uid"))
+            except JWTError:
                 raise credentials_exception
-            token_data = TokenData(username=username)
-        except JWTError:
-            raise credentials_exception
+            # Süresiz token'lar önbelleğe alınmaz
+            exp = payload.get("exp")
+            if exp is not None:
+                _token_cache[token_key] = (username, token_data.user_id, float(exp))
         
-        auth_service = AuthService(db)
-        user = auth_service.get_user_by_username(username=token_data.username)
+        if token_data.user_id is not None:
+            # Birincil anahtarla doğrudan erişim (oturumun identity map'i üzerinden)
+            user = db.get(User, token_data.user_id)
+            if user is not None and not hmac.compare_digest(
+                user.username.encode("utf-8"), token_data.username.encode("utf-8")
+            ):
+                # Token alındıktan sonra kullanıcı adı değişmiş (sabit zamanlı karşılaştırma)
+                user = None
+        else:
+            # uid içermeyen eski token'lar
+            auth_service = AuthService(db)
+            user = auth_service.get_user_by_username(username=token_data.username)
         if user is None:
             raise credentials_exception
         
@@ -0,0 +1,63 @@
+"""
+Embedding Cache Service
+Aynı metinler için embedding API'sine tekrar gidilmesini önleyen önbellek
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """SHA-256 anahtarlı, süreli (TTL) LRU embedding önbelleği"""
+
+    def __init__(self, capacity: int = 10_000, ttl_seconds: float = 24 * 60 * 60):
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[list[float], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        """Metnin önbellek anahtarı"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """Süresi dolmamış embedding'i döndür"""
+        key = self.make_key(text)
+        entry = self._entries.get(key)
+        if entry is not None:
+            vector, expires_at = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, text: str, vector: List[float]):
+        """Embedding'i önbelleğe yaz, kapasite aşılırsa en az kullanılanı çıkar"""
+        key = self.make_key(text)
+        self._entries[key] = (vector, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def get_stats(self) -> dict:
+        """Önbellek istatistikleri"""
+        return {
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# Global embedding cache instance (tüm RAG engine örnekleri paylaşır)
+embedding_cache = EmbeddingCache()
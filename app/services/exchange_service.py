@@ -3,19 +3,21 @@ Exchange Rate API Servisi
 Döviz kuru bilgilerini almak için kullanılır
 """
 
-import requests
-import asyncio
+import httpx
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
 from app.core.config import settings
+from app.core.http_session import async_http_client
 
 
 class ExchangeRateService:
     """Exchange Rate API ile döviz kuru servisi"""
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.api_key = settings.EXCHANGERATE_API_KEY
+        # Paylaşılan async HTTP istemcisi (bağlantılar tüm Exchange Rate API çağrılarında yeniden kullanılır)
+        self.client = client or async_http_client
         self.base_url = "https://v6.exchangerate-api.com/v6"
         self.cache = {}  # Basit in-memory cache
         self.cache_ttl = 3600  # 1 saat
@@ -32,7 +34,7 @@ class ExchangeRateService:
         
         try:
             url = f"{self.base_url}/{self.api_key}/latest/{base_currency}"
-            response = await asyncio.to_thread(requests.get, url, timeout=10)
+            response = await self.client.get(url)
             
             if response.status_code == 200:
                 data = response.json()
@@ -95,7 +97,7 @@ class ExchangeRateService:
         """Desteklenen para birimlerini getir"""
         try:
             url = f"{self.base_url}/{self.api_key}/codes"
-            response = await asyncio.to_thread(requests.get, url, timeout=10)
+            response = await self.client.get(url)
             
             if response.status_code == 200:
                 data = response.json()
@@ -144,4 +146,8 @@ class ExchangeRateService:
             {"code": "AUD", "name": "Australian Dollar"},
             {"code": "CAD", "name": "Canadian Dollar"},
             {"code": "CHF", "name": "Swiss Franc"}
-        ] 
\ No newline at end of file
+        ] 
+
+
+# Global exchange rate service instance
+exchange_service = ExchangeRateService()
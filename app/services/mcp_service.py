@@ -4,7 +4,6 @@ Agent'lar arası context paylaşımı ve iletişim protokolü
 """
 
 import asyncio
-import json
 import uuid
 from typing import Dict, List, Any, Optional, Callable
 from datetime import datetime, timedelta
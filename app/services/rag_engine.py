@@ -4,6 +4,7 @@ Vector tabanlı strateji arama ve retrieval sistemi
 """
 
 import asyncio
+import functools
 import json
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
@@ -47,6 +48,7 @@ except ImportError as e:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
 
 from app.core.config import settings
+from app.services.embedding_cache import embedding_cache
 from app.models.strategy import Strategy
 from app.models.pdf_document import PDFDocument, PDFChunk
 from app.models.product import Product
@@ -171,36 +173,48 @@ class RAGEmbeddingEngine:
     async def embed_text(self, text: str) -> List[float]:
         """Metni vector'e dönüştür"""
         try:
-            if self.embeddings:
-                # Google Gemini embeddings kullan
-                embedding = await asyncio.to_thread(
-                    self.embeddings.embed_query, text
-                )
+            embedding = await self._embed_with_model(text)
+            if embedding is not None:
                 return embedding
-            elif self.fallback_model:
-                # Sentence Transformers fallback
-                embedding = await asyncio.to_thread(
-                    self.fallback_model.encode, text
-                )
-                return embedding.tolist()
-            else:
-                logger.warning("⚠️ Embedding modeli yok - demo vector döndürülüyor")
-                # Son çare: normalize edilmiş rastgele vector (sadece test için)
-                import random
-                import math
-                vector = [random.gauss(0, 1) for _ in range(self.dimension)]
-                # Normalize et
-                magnitude = math.sqrt(sum(x*x for x in vector))
-                return [x/magnitude for x in vector]
-                
+            logger.warning("⚠️ Embedding modeli yok - demo vector döndürülüyor")
+        except Exception as e:
+            logger.error(f"❌ Embedding hatası: {e}")
+        return self._random_unit_vector()
+    
+    async def embed_cached(self, text: str) -> List[float]:
+        """Metni vector'e dönüştür (aynı metin için önbellekteki vector kullanılır)"""
+        embedding = embedding_cache.get(text)
+        if embedding is not None:
+            return embedding
+        try:
+            embedding = await self._embed_with_model(text)
         except Exception as e:
             logger.error(f"❌ Embedding hatası: {e}")
-            # Son çare: normalize edilmiş rastgele vector
-            import random
-            import math
-            vector = [random.gauss(0, 1) for _ in range(self.dimension)]
-            magnitude = math.sqrt(sum(x*x for x in vector))
-            return [x/magnitude for x in vector]
+            embedding = None
+        if embedding is None:
+            # Rastgele fallback vector'ler önbelleğe alınmaz
+            return self._random_unit_vector()
+        embedding_cache.set(text, embedding)
+        return embedding
+    
+    async def _embed_with_model(self, text: str) -> Optional[List[float]]:
+        """Yüklü embedding modeliyle vector üret (model yoksa None)"""
+        if self.embeddings:
+            # Google Gemini embeddings kullan
+            return await asyncio.to_thread(self.embeddings.embed_query, text)
+        if self.fallback_model:
+            # Sentence Transformers fallback
+            embedding = await asyncio.to_thread(self.fallback_model.encode, text)
+            return embedding.tolist()
+        return None
+    
+    def _random_unit_vector(self) -> List[float]:
+        """Son çare: normalize edilmiş rastgele vector (sadece test için)"""
+        import random
+        import math
+        vector = [random.gauss(0, 1) for _ in range(self.dimension)]
+        magnitude = math.sqrt(sum(x*x for x in vector))
+        return [x/magnitude for x in vector]
     
     async def _embed_text(self, text: str) -> List[float]:
         """Private method for embedding text (alias for embed_text)"""
@@ -292,16 +306,18 @@ class RAGEmbeddingEngine:
         user_id: int,
         product_category: str = None,
         top_k: int = 5,
-        min_score: float = 0.7
+        min_score: float = 0.7,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
-        """Benzer stratejileri ara"""
+        """Benzer stratejileri ara (önceden hesaplanmış query embedding verilebilir)"""
         try:
             if not self.pinecone_index:
                 logger.warning("❌ Pinecone index mevcut değil - fallback sonuçlar döndürülüyor")
                 return self._get_fallback_search_results(query, top_k)
             
             # Query embedding'i oluştur
-            query_embedding = await self.embed_text(query)
+            if query_embedding is None:
+                query_embedding = await self.embed_cached(query)
             
             # Filter oluştur
             filter_dict = {"user_id": user_id}
@@ -772,4 +788,10 @@ Demo modunda çalışıyorsunuz.""",
                 "filename": "demo_strategy.pdf",
                 "score": 0.7
             }
-        ] 
\ No newline at end of file
+        ] 
+
+
+@functools.lru_cache(maxsize=1)
+def get_rag_engine() -> RAGEmbeddingEngine:
+    """Süreç genelinde paylaşılan RAGEmbeddingEngine örneği (ilk kullanımda oluşturulur)"""
+    return RAGEmbeddingEngine()
@@ -3,19 +3,21 @@ SerpAPI Servisi
 Google arama sonuçları ve Google Shopping verilerini almak için kullanılır
 """
 
-import requests
-import asyncio
+import httpx
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
 from app.core.config import settings
+from app.core.http_session import async_http_client
 
 
 class SerpApiService:
     """SerpAPI ile Google arama ve shopping verileri"""
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.api_key = settings.SERPAPI_KEY
+        # Paylaşılan async HTTP istemcisi (bağlantılar tüm SerpAPI çağrılarında yeniden kullanılır)
+        self.client = client or async_http_client
         self.base_url = "https://serpapi.com/search"
         self.cache = {}  # Basit in-memory cache
         self.cache_ttl = 86400  # 24 saat
@@ -41,7 +43,7 @@ class SerpApiService:
                 "google_domain": "google.com.tr"
             }
             
-            response = await asyncio.to_thread(requests.get, self.base_url, params=params, timeout=15)
+            response = await self.client.get(self.base_url, params=params, timeout=15)
             
             if response.status_code == 200:
                 data = response.json()
@@ -164,7 +166,7 @@ class SerpApiService:
                 "google_domain": "google.com.tr"
             }
             
-            response = await asyncio.to_thread(requests.get, self.base_url, params=params, timeout=15)
+            response = await self.client.get(self.base_url, params=params, timeout=15)
             
             if response.status_code == 200:
                 data = response.json()
@@ -236,4 +238,7 @@ class SerpApiService:
             "raw_results": [],
             "timestamp": datetime.now().isoformat(),
             "error": "Rakip analizi yapılamadı - API bağlantısı kurulamadı"
-        } 
\ No newline at end of file
+        }
+
+# Global SerpAPI service instance (cache ve bağlantılar agent'lar arasında paylaşılır)
+serp_service = SerpApiService()